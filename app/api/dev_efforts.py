@@ -6,15 +6,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
-import json
-from pathlib import Path
+from app.infra.data_repository import get_dev_efforts_repository
 
 router = APIRouter(prefix="/api/dev-efforts", tags=["Dev Efforts"])
 
-# Data file path
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-DEV_EFFORTS_FILE = DATA_DIR / "dev_efforts_data.json"
-
 
 class DevEffortsData(BaseModel):
     month: str  # Format: "2025-12"
@@ -23,36 +18,37 @@ class DevEffortsData(BaseModel):
     carry_forward: float
 
 
-def ensure_data_file():
-    """Ensure data directory and file exist"""
-    DATA_DIR.mkdir(exist_ok=True)
-    if not DEV_EFFORTS_FILE.exists():
-        with open(DEV_EFFORTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump({"monthly_data": {}}, f, ensure_ascii=False, indent=2)
-
-
-def load_data() -> dict:
-    """Load JSON data"""
-    ensure_data_file()
-    try:
-        with open(DEV_EFFORTS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return {"monthly_data": {}}
+@router.get("/year/{year}")
+async def get_year_dev_efforts(year: int):
+    """Get Development Efforts data for all months of a year, with totals"""
+    year_data = get_dev_efforts_repository().get_year(year)
 
+    months = {
+        m: {
+            "month": f"{year}-{str(m).zfill(2)}",
+            "me_hours": data.get("me_hours", 0),
+            "sow_planned": data.get("sow_planned", 16.0),
+            "carry_forward": data.get("carry_forward", 0)
+        }
+        for m, data in year_data.items()
+    }
 
-def save_data(data: dict):
-    """Save JSON data"""
-    ensure_data_file()
-    with open(DEV_EFFORTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    return {
+        "year": year,
+        "months": months,
+        "totals": {
+            "me_hours": sum(float(d["me_hours"] or 0) for d in months.values()),
+            # Months without saved data count as the default 16h plan
+            "sow_planned": sum(float(months[m]["sow_planned"]) if m in months else 16.0 for m in range(1, 13)),
+            "carry_forward": sum(float(d["carry_forward"] or 0) for d in months.values())
+        }
+    }
 
 
 @router.get("/{month}")
 async def get_dev_efforts(month: str):
     """Get Development Efforts data for specified month"""
-    data = load_data()
-    month_data = data["monthly_data"].get(month)
+    month_data = get_dev_efforts_repository().get(month)
     
     if month_data:
         return {
@@ -67,8 +63,6 @@ async def get_dev_efforts(month: str):
 @router.post("")
 async def save_dev_efforts(dev_data: DevEffortsData):
     """Save Development Efforts data"""
-    data = load_data()
-    
     # Calculate carry forward
     carry_forward = dev_data.sow_planned - dev_data.me_hours
     
@@ -79,8 +73,7 @@ async def save_dev_efforts(dev_data: DevEffortsData):
         "last_updated": datetime.now().isoformat()
     }
     
-    data["monthly_data"][dev_data.month] = month_data
-    save_data(data)
+    get_dev_efforts_repository().save(dev_data.month, month_data)
     
     return {
         "status": "success",
@@ -94,11 +87,7 @@ async def save_dev_efforts(dev_data: DevEffortsData):
 @router.delete("/{month}")
 async def delete_dev_efforts(month: str):
     """Delete Development Efforts data for specified month"""
-    data = load_data()
-    
-    if month in data["monthly_data"]:
-        del data["monthly_data"][month]
-        save_data(data)
+    if get_dev_efforts_repository().delete(month):
         return {"status": "deleted", "month": month}
     
     raise HTTPException(status_code=404, detail="Data not found")
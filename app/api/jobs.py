@@ -0,0 +1,157 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from typing import Optional
+import io
+from app.infra.job_queue import get_job_queue, JobQueueFull, Job, DONE, FAILED, CANCELLED
+from app.api.report import (
+    validate_request, weekly_pdf_key, build_weekly_pdf, weekly_pdf_filename, parse_bundle_outputs, bundle_filename
+)
+from app.api.monthly_report import (
+    build_monthly_result, monthly_pdf_inputs, build_monthly_pdf, monthly_pdf_filename, validate_pdf_profile
+)
+
+# Background report jobs: POST enqueues and returns a job id, clients poll
+# GET /jobs/{id} and download GET /jobs/{id}/result when the job is done.
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _enqueue(kind: str, fn, filename: str = None, media_type: str = "application/json"):
+    try:
+        job = get_job_queue().submit(kind, fn, filename=filename, media_type=media_type)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error_code": "JOB_QUEUE_FULL", "message": str(e)}
+        )
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=_job_status(job))
+
+
+def _job_status(job: Job) -> dict:
+    result = job.to_dict()
+    result["status_url"] = f"/jobs/{job.id}"
+    result["result_url"] = f"/jobs/{job.id}/result"
+    return result
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error_code": "JOB_NOT_FOUND", "message": "Unknown or expired job"}
+        )
+    return job
+
+
+@router.post("/pdf")
+async def enqueue_pdf_report(
+    begin_date: str = Form(...),
+    end_date: str = Form(...),
+    file: UploadFile = File(...)
+):
+    """Enqueue a weekly PDF report (same inputs as POST /pdf)."""
+    begin_dt, end_dt = validate_request(file, begin_date, end_date)
+    content = await file.read()
+
+    def run():
+        return build_weekly_pdf(content, begin_dt, end_dt, weekly_pdf_key(content, begin_dt, end_dt))
+
+    return _enqueue("weekly_pdf", run, filename=weekly_pdf_filename(end_date), media_type="application/pdf")
+
+
+@router.post("/bundle")
+async def enqueue_report_bundle(
+    begin_date: str = Form(...),
+    end_date: str = Form(...),
+    file: UploadFile = File(...),
+    template: Optional[UploadFile] = File(None),
+    outputs: Optional[str] = Form(None)
+):
+    """Enqueue a JSON/PDF/Excel bundle (same inputs as POST /bundle)."""
+    begin_dt, end_dt = validate_request(file, begin_date, end_date)
+    requested = parse_bundle_outputs(outputs, template is not None)
+    content = await file.read()
+    template_content = await template.read() if template is not None else None
+    basename = bundle_filename(end_date)
+
+    def run():
+        from app.services.bundle_service import build_report_bundle
+        return build_report_bundle(
+            io.BytesIO(content), begin_dt, end_dt, requested,
+            io.BytesIO(template_content) if template_content is not None else None, basename
+        )
+
+    return _enqueue("bundle", run, filename=f"{basename}.zip", media_type="application/zip")
+
+
+@router.post("/monthly/process")
+async def enqueue_monthly_process(
+    file: UploadFile = File(...),
+    year: int = Form(...),
+    month: int = Form(...),
+    chart_mode: str = Form("image")
+):
+    """月報データ処理をジョブとして登録する（POST /monthly/process と同じ入力）。"""
+    if chart_mode not in ("image", "data"):
+        raise HTTPException(status_code=400, detail="chart_mode must be 'image' or 'data'")
+    content = await file.read()
+
+    def run():
+        result = build_monthly_result(content, year, month, chart_mode)
+        if "error" in result:
+            raise HTTPException(status_code=404, detail=result["error"])
+        return result
+
+    return _enqueue("monthly_process", run)
+
+
+@router.post("/monthly/pdf")
+async def enqueue_monthly_pdf(
+    file: UploadFile = File(...),
+    year: int = Form(...),
+    month: int = Form(...),
+    profile: str = Form("standard")
+):
+    """月報PDFの生成をジョブとして登録する（POST /monthly/pdf と同じ入力）。"""
+    validate_pdf_profile(profile)
+    content = await file.read()
+
+    def run():
+        sla_data, dev_efforts_data = monthly_pdf_inputs(year, month)
+        pdf_bytes, _ = build_monthly_pdf(content, year, month, sla_data, dev_efforts_data, profile)
+        return pdf_bytes
+
+    return _enqueue("monthly_pdf", run, filename=monthly_pdf_filename(year, month), media_type="application/pdf")
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str):
+    return _job_status(_get_job(job_id))
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    job = _get_job(job_id)
+
+    if job.status == FAILED:
+        raise HTTPException(status_code=job.status_code or 500, detail=job.error)
+    if job.status == CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error_code": "JOB_CANCELLED", "message": "Job was cancelled"}
+        )
+    if job.status != DONE:
+        # Still queued / running: keep polling
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=_job_status(job))
+
+    if isinstance(job.result, bytes):
+        headers = {"Content-Disposition": f'attachment; filename="{job.filename}"'} if job.filename else None
+        return Response(content=job.result, media_type=job.media_type, headers=headers)
+    return JSONResponse(content=jsonable_encoder(job.result))
+
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str):
+    _get_job(job_id)
+    return _job_status(get_job_queue().cancel(job_id))
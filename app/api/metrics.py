@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.infra import metrics
+
+# Prometheus text exposition of this worker process (latency histograms per route
+# and stage, cache hit ratios, job counts, RSS). Scrape every worker separately.
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def get_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
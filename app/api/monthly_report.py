@@ -1,105 +1,188 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
-import pandas as pd
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException
+from fastapi.responses import JSONResponse, Response
+from functools import lru_cache
 import io
 import os
-import json
 from pathlib import Path
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, KeepTogether, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from app.services.monthly_report_service import MonthlyReportService
-from app.infra.chart_renderer import ChartRenderer
+from typing import Optional, Tuple, TYPE_CHECKING
+from app.infra.artifact_store import get_artifact_store
+from app.infra.data_repository import get_monthly_context
+from app.infra.pdf_cache import get_pdf_cache, content_hash, data_hash
+from app.infra.stage_executor import run_blocking, stage
+from app.infra.timing import span
+from app.utils.http_cache import make_etag, etag_matches
+from app.utils.static_assets import versioned_url
+
+# pandas / matplotlib / ReportLab は初回利用時に読み込む（API起動・/health を軽くするため）
+if TYPE_CHECKING:
+    import pandas as pd
+    from app.services.monthly_report_service import MonthlyReportService
+    from app.infra.chart_renderer import ChartRenderer
 
 router = APIRouter(prefix="/monthly", tags=["monthly"])
 
-report_service = MonthlyReportService()
-# static/charts への書き出しを想定
-chart_renderer = ChartRenderer(output_dir="static/charts")
+@lru_cache(maxsize=None)
+def get_report_service() -> "MonthlyReportService":
+    from app.services.monthly_report_service import MonthlyReportService
+    return MonthlyReportService()
+
+
+@lru_cache(maxsize=None)
+def get_chart_renderer() -> "ChartRenderer":
+    from app.infra.chart_renderer import ChartRenderer
+    # static/charts への書き出しを想定
+    return ChartRenderer(output_dir="static/charts", artifact_store=get_artifact_store())
+
+
+def chart_url(path: str) -> str:
+    """描画済みグラフの URL（内容のハッシュ付き。ブラウザは長期キャッシュできる）"""
+    return versioned_url(f"/static/charts/{os.path.basename(path)}", path)
+
+
+def _read_ticket_sheets(content: bytes) -> Optional["pd.DataFrame"]:
+    """
+    年別のチケットシート（2024, 2025, 2026）を統合したデータ。該当シートが無ければ None。
+    パース結果はワーカープロセス間で共有されるデータセットキャッシュに保存する。
+    """
+    from app.infra.dataset_cache import get_dataset_cache
+
+    frames = get_dataset_cache().get_or_load(
+        f"tickets-{content_hash(content)}", lambda: _parse_ticket_sheets(content)
+    )
+    return frames.get("tickets")
+
+
+def _parse_ticket_sheets(content: bytes) -> dict:
+    import pandas as pd
+
+    xls = pd.ExcelFile(io.BytesIO(content))
+
+    all_dfs = []
+    for sheet_name in xls.sheet_names:
+        if sheet_name in ["2024", "2025", "2026"]:
+            df_tmp = pd.read_excel(xls, sheet_name=sheet_name)
+            df_tmp.columns = df_tmp.columns.astype(str).str.strip()
+            all_dfs.append(df_tmp)
+
+    if not all_dfs:
+        return {}
+    return {"tickets": pd.concat(all_dfs, ignore_index=True).drop_duplicates()}
+
+
+def _load_monthly_data(year: int, month: int) -> Tuple[list, dict]:
+    """
+    指定年月のSLA Breachデータと指定年のDevelopment Effortsデータ
+    （チェックボックス状態に関わらず自動読み込み。/monthly/context と同じリポジトリから1回で取得）
+    """
+    with span("data.context", year=year, month=month) as timing:
+        context = get_monthly_context(year, month)
+        sla_data, dev_efforts_data = context["sla_breaches"], context["dev_efforts"]
+        timing["sla_breaches"] = len(sla_data)
+        timing["dev_effort_months"] = len(dev_efforts_data)
+    return sla_data, dev_efforts_data
+
+
+def _aggregate_month(df: "pd.DataFrame", year: int, month: int) -> dict:
+    with span("aggregate.monthly", rows=len(df)) as timing:
+        monthly_stats = get_report_service().aggregate_monthly_data(df, year, month)
+        timing["month_rows"] = monthly_stats.get("summary", {}).get("total_tickets", 0)
+    return monthly_stats
+
+
+def _aggregate_year_summary(df: "pd.DataFrame", year: int, month: int) -> dict:
+    with span("aggregate.annual", rows=len(df)):
+        return get_report_service().get_annual_summary_data(df, year, target_month=month)
+
+
+def build_monthly_result(content: bytes, year: int, month: int, chart_mode: str = "image") -> dict:
+    """
+    月報データを処理する（ブロッキング。/process とジョブの両方から呼ばれる）。
+    対象月のデータが無い場合は集計サービスの {"error": ...} をそのまま返す。
+    """
+    # 月報の集計に使用するのはチケットデータが載っている年別のシートのみ
+    with stage("parse") as timing:
+        df = _read_ticket_sheets(content)
+        timing["rows"] = 0 if df is None else len(df)
+    if df is None:
+        raise HTTPException(status_code=400, detail="Required ticket sheets (2024, 2025, or 2026) not found in Excel.")
+
+    with stage("aggregate"):
+        # 1. 月間集計 (Pivot Table用)
+        monthly_stats = _aggregate_month(df, year, month)
+        if "error" in monthly_stats:
+            return monthly_stats
+
+        # 2. 年間サマリー集計 (Stacked Bar Chart用)
+        # 選択された月までのデータのみを表示（未来の月は表示しない）
+        annual_summary = _aggregate_year_summary(df, year, month)
+
+    # 3. グラフ描画
+    # クライアント側描画用のシリーズは常に返す（軽量）
+    from app.infra.chart_renderer import ChartRenderer
+    chart_data = ChartRenderer.build_chart_data(monthly_stats["pivot_data"], annual_summary, year, month)
+
+    # 集計結果を元に画像ファイルを作成（chart_mode="image" の場合のみ）
+    charts = None
+    if chart_mode == "image":
+        with stage("chart"):
+            pie_path = get_chart_renderer().render_monthly_pie(monthly_stats["pivot_data"], year, month)
+            bar_path = get_chart_renderer().render_annual_summary(annual_summary, year)
+        charts = {
+            "pie": chart_url(pie_path),
+            "bar": chart_url(bar_path)
+        }
+
+    # 4. SLAデータ / 5. Development Effortsデータ
+    sla_data, dev_efforts_data = _load_monthly_data(year, month)
+
+    # レスポンス構築
+    return {
+        "success": True,
+        "year": year,
+        "month": month,
+        "summary": monthly_stats["summary"],
+        "pivot_data": monthly_stats["pivot_data"],
+        "annual_summary": annual_summary, # UIでのテーブル表示用
+        "charts": charts,
+        "chart_data": chart_data,
+        "sla_data": sla_data,
+        "dev_efforts_data": dev_efforts_data
+    }
+
+
+@router.get("/context/{year}/{month}")
+async def get_month_context(year: int, month: int):
+    """
+    画面用: 指定月のSLA Breach・指定年のDevelopment Efforts・データ有無を1回で返す
+    （/api/sla と /api/dev-efforts を個別に呼ばずに済むように）。
+    """
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="month must be between 1 and 12")
+    return get_monthly_context(year, month)
+
 
 @router.post("/process")
 async def process_monthly_report(
     file: UploadFile = File(...),
     year: int = Form(...),
-    month: int = Form(...)
+    month: int = Form(...),
+    chart_mode: str = Form("image")
 ):
+    """
+    月報データを処理する。
+    chart_mode="data" の場合はPNGを生成せず、クライアント側描画用の chart_data のみ返す。
+    """
+    if chart_mode not in ("image", "data"):
+        raise HTTPException(status_code=400, detail="chart_mode must be 'image' or 'data'")
+
     try:
         # Excelファイルの読み込み
         content = await file.read()
-        # すべてのシートを読み込む（2025, 2026, New Usersなどを統合するため）
-        xls = pd.ExcelFile(io.BytesIO(content))
-        
-        all_dfs = []
-        for sheet_name in xls.sheet_names:
-            # 月報の集計に使用するのはチケットデータが載っている年別のシートのみ
-            if sheet_name in ["2024", "2025", "2026"]:
-                df_tmp = pd.read_excel(xls, sheet_name=sheet_name)
-                df_tmp.columns = df_tmp.columns.astype(str).str.strip()
-                all_dfs.append(df_tmp)
-        
-        if not all_dfs:
-            raise HTTPException(status_code=400, detail="Required ticket sheets (2024, 2025, or 2026) not found in Excel.")
-            
-        df = pd.concat(all_dfs, ignore_index=True).drop_duplicates()
-        print(f"DEBUG: Combined ticket data rows: {len(df)}")
-        
-        # 1. 月間集計 (Pivot Table用)
-        monthly_stats = report_service.aggregate_monthly_data(df, year, month)
-        if "error" in monthly_stats:
-            return JSONResponse(status_code=404, content=monthly_stats)
-            
-        # 2. 年間サマリー集計 (Stacked Bar Chart用)
-        # 選択された月までのデータのみを表示（未来の月は表示しない）
-        annual_summary = report_service.get_annual_summary_data(df, year, target_month=month)
-
-        # 3. グラフ描画
-        # 集計結果を元に画像ファイルを作成
-        pie_path = chart_renderer.render_monthly_pie(monthly_stats["pivot_data"], year, month)
-        bar_path = chart_renderer.render_annual_summary(annual_summary, year)
-
-        # 4. SLAデータ読み込み（チェックボックス状態に関わらず自動読み込み）
-        sla_data = []
-        sla_file = Path(__file__).parent.parent.parent / "data" / "sla_breach_data.json"
-        if sla_file.exists():
-            with open(sla_file, "r", encoding="utf-8") as f:
-                all_sla = json.load(f)
-                month_key = f"{year}-{str(month).zfill(2)}"
-                if month_key in all_sla.get("monthly_data", {}):
-                    sla_data = all_sla["monthly_data"][month_key].get("breaches", [])
-        
-        print(f"DEBUG: Auto-loaded SLA data for {year}-{month:02d}: {len(sla_data)} breaches")
-
-        # 5. Development Effortsデータ読み込み（年間・チェックボックス状態に関わらず自動読み込み）
-        dev_efforts_data = {}
-        dev_efforts_file = Path(__file__).parent.parent.parent / "data" / "dev_efforts_data.json"
-        if dev_efforts_file.exists():
-            with open(dev_efforts_file, "r", encoding="utf-8") as f:
-                all_dev = json.load(f)
-                # 年間の全月データを取得
-                for m in range(1, 13):
-                    mk = f"{year}-{str(m).zfill(2)}"
-                    if mk in all_dev.get("monthly_data", {}):
-                        dev_efforts_data[m] = all_dev["monthly_data"][mk]
-        
-        print(f"DEBUG: Auto-loaded Dev Efforts data for {year}: {len(dev_efforts_data)} months")
-
-        # レスポンス構築
-        return {
-            "success": True,
-            "year": year,
-            "month": month,
-            "summary": monthly_stats["summary"],
-            "pivot_data": monthly_stats["pivot_data"],
-            "annual_summary": annual_summary, # UIでのテーブル表示用
-            "charts": {
-                "pie": f"/static/charts/{os.path.basename(pie_path)}",
-                "bar": f"/static/charts/{os.path.basename(bar_path)}"
-            },
-            "sla_data": sla_data,
-            "dev_efforts_data": dev_efforts_data
-        }
+        # 集計・グラフ描画はイベントループの外で実行する
+        result = await run_blocking(build_monthly_result, content, year, month, chart_mode)
+        if "error" in result:
+            return JSONResponse(status_code=404, content=result)
+        return result
 
     except Exception as e:
         import traceback
@@ -107,261 +190,187 @@ async def process_monthly_report(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def monthly_pdf_inputs(year: int, month: int) -> Tuple[list, dict]:
+    """レポートに含めるSLA/Dev Effortsデータ（指定年月のデータが存在すれば、常にレポートに含める）"""
+    return _load_monthly_data(year, month)
+
+
+def monthly_pdf_key(content: bytes, year: int, month: int, sla_data: list, dev_efforts_data: dict,
+                    profile: str) -> str:
+    """
+    PDFキャッシュキー（ETagとしても使う）。
+    ワークブック・対象年月・SLA/Dev Effortsデータ・出力プロファイル・レンダラーのバージョンで決まる。
+    """
+    from app.infra.monthly_pdf_renderer import RENDERER_VERSION
+
+    return get_pdf_cache().make_key(
+        "monthly", RENDERER_VERSION, profile, content_hash(content), year, month,
+        data_hash(sla_data), data_hash(dev_efforts_data)
+    )
+
+
+def validate_pdf_profile(profile: str) -> str:
+    from app.infra.monthly_pdf_renderer import PDF_PROFILES
+
+    if profile not in PDF_PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(PDF_PROFILES)}")
+    return profile
+
+
+def monthly_pdf_filename(year: int, month: int) -> str:
+    return f"Monthly_Report_{year}_{month:02d}.pdf"
+
+
+def build_monthly_pdf(content: bytes, year: int, month: int, sla_data: list, dev_efforts_data: dict,
+                      profile: str = "standard") -> Tuple[bytes, Optional[int]]:
+    """
+    月報PDFを生成する（ブロッキング。/monthly/pdf とジョブの両方から呼ばれる）。
+    standard 以外のプロファイルでは、比較用に standard 版のサイズも返す（standard 版もキャッシュする）。
+    戻り値: (PDFバイト列, standard 版のバイト数 または None)
+    """
+    from app.infra.monthly_pdf_renderer import DEFAULT_PROFILE, render_monthly_report
+    from app.services.monthly_pdf_service import build_monthly_sections
+
+    cache = get_pdf_cache()
+    cache_key = monthly_pdf_key(content, year, month, sla_data, dev_efforts_data, profile)
+    baseline_key = None
+    if profile != DEFAULT_PROFILE:
+        baseline_key = monthly_pdf_key(content, year, month, sla_data, dev_efforts_data, DEFAULT_PROFILE)
+
+    pdf_bytes = cache.get(cache_key)
+    if pdf_bytes is not None:
+        return pdf_bytes, cache.size(baseline_key) if baseline_key else None
+
+    # まずJSONデータを処理
+    with stage("parse") as timing:
+        df = _read_ticket_sheets(content)
+        timing["rows"] = 0 if df is None else len(df)
+    if df is None:
+        raise HTTPException(status_code=400, detail="Required sheets not found")
+
+    with stage("aggregate"):
+        # 月間集計
+        monthly_stats = _aggregate_month(df, year, month)
+        if "error" in monthly_stats:
+            raise HTTPException(status_code=404, detail=monthly_stats["error"])
+
+        # 年間サマリー集計
+        # 選択された月までのデータのみを表示（未来の月は表示しない）
+        annual_summary = _aggregate_year_summary(df, year, month)
+
+    # PDF生成（レイアウト・スタイルは infra の月報レンダラーが担当）
+    with stage("chart"):
+        sections = build_monthly_sections(
+            monthly_stats, annual_summary, sla_data, dev_efforts_data, year, month, get_chart_renderer()
+        )
+    output_dir = Path("static")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = str(output_dir / monthly_pdf_filename(year, month))
+    with stage("pdf"):
+        pdf_bytes = render_monthly_report(**sections, path=pdf_path, profile=profile)
+    get_artifact_store().register(pdf_path)
+    cache.put(cache_key, pdf_bytes)
+
+    baseline_size = None
+    if baseline_key:
+        # 削減量の比較用（同じグラフ・表から standard 版を描画してキャッシュ）
+        baseline_size = cache.size(baseline_key)
+        if baseline_size is None:
+            with stage("pdf"):
+                baseline = render_monthly_report(**sections, profile=DEFAULT_PROFILE)
+            cache.put(baseline_key, baseline)
+            baseline_size = len(baseline)
+    return pdf_bytes, baseline_size
+
+
+def pdf_size_headers(profile: str, pdf_bytes: bytes, baseline_size: Optional[int]) -> dict:
+    """出力プロファイルとサイズ（standard 版との差分）を示すレスポンスヘッダー"""
+    headers = {"X-PDF-Profile": profile, "X-PDF-Bytes": str(len(pdf_bytes))}
+    if baseline_size is not None:
+        headers["X-PDF-Baseline-Bytes"] = str(baseline_size)
+        headers["X-PDF-Bytes-Saved"] = str(baseline_size - len(pdf_bytes))
+    return headers
+
+
 @router.post("/pdf")
 async def generate_monthly_pdf(
     file: UploadFile = File(...),
     year: int = Form(...),
-    month: int = Form(...)
+    month: int = Form(...),
+    profile: str = Form("standard"),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Generate PDF for Monthly Report including SLA Breach data"""
+    """
+    Generate PDF for Monthly Report including SLA Breach data.
+    profile="compact" はメール配布向けの小さいPDF（削減量は X-PDF-Bytes-Saved ヘッダーで返す）。
+    """
+    validate_pdf_profile(profile)
     try:
-        # まずJSONデータを処理
         content = await file.read()
-        xls = pd.ExcelFile(io.BytesIO(content))
 
-        all_dfs = []
-        for sheet_name in xls.sheet_names:
-            if sheet_name in ["2024", "2025", "2026"]:
-                df_tmp = pd.read_excel(xls, sheet_name=sheet_name)
-                df_tmp.columns = df_tmp.columns.astype(str).str.strip()
-                all_dfs.append(df_tmp)
+        sla_data, dev_efforts_data = monthly_pdf_inputs(year, month)
+        etag = make_etag(monthly_pdf_key(content, year, month, sla_data, dev_efforts_data, profile))
+
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
 
-        if not all_dfs:
-            raise HTTPException(status_code=400, detail="Required sheets not found")
+        pdf_bytes, baseline_size = await run_blocking(
+            build_monthly_pdf, content, year, month, sla_data, dev_efforts_data, profile
+        )
+        headers = {
+            "ETag": etag,
+            "Content-Disposition": f'attachment; filename="{monthly_pdf_filename(year, month)}"',
+            **pdf_size_headers(profile, pdf_bytes, baseline_size)
+        }
+        return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
 
-        df = pd.concat(all_dfs, ignore_index=True).drop_duplicates()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 月間集計
-        monthly_stats = report_service.aggregate_monthly_data(df, year, month)
-        if "error" in monthly_stats:
-            raise HTTPException(status_code=404, detail=monthly_stats["error"])
 
-        # 年間サマリー集計
-        # 選択された月までのデータのみを表示（未来の月は表示しない）
-        annual_summary = report_service.get_annual_summary_data(df, year, target_month=month)
-
-        # SLAデータ読み込み（チェックボックス状態に関わらず自動読み込み）
-        # 指定年月のデータが存在すれば、常にレポートに含める
-        sla_data = []
-        sla_file = Path(__file__).parent.parent.parent / "data" / "sla_breach_data.json"
-        if sla_file.exists():
-            with open(sla_file, "r", encoding="utf-8") as f:
-                all_sla = json.load(f)
-                month_key = f"{year}-{str(month).zfill(2)}"
-                if month_key in all_sla.get("monthly_data", {}):
-                    sla_data = all_sla["monthly_data"][month_key].get("breaches", [])
-        
-        print(f"DEBUG: Auto-loaded SLA data for {year}-{month:02d}: {len(sla_data)} breaches")
-
-        # Development Effortsデータ読み込み（年間・チェックボックス状態に関わらず自動読み込み）
-        # 指定年のデータが存在すれば、常にレポートに含める
-        dev_efforts_data = {}
-        dev_efforts_file = Path(__file__).parent.parent.parent / "data" / "dev_efforts_data.json"
-        if dev_efforts_file.exists():
-            with open(dev_efforts_file, "r", encoding="utf-8") as f:
-                all_dev = json.load(f)
-                # 年間の全月データを取得
-                for m in range(1, 13):
-                    mk = f"{year}-{str(m).zfill(2)}"
-                    if mk in all_dev.get("monthly_data", {}):
-                        dev_efforts_data[m] = all_dev["monthly_data"][mk]
-        
-        print(f"DEBUG: Auto-loaded Dev Efforts data for {year}: {len(dev_efforts_data)} months")
-
-        # PDF生成
-        output_dir = Path("static")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        pdf_path = str(output_dir / f"Monthly_Report_{year}_{month:02d}.pdf")
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter, topMargin=20, bottomMargin=20)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # タイトル
-        elements.append(Paragraph(f"<b>Monthly Report - {year}/{month:02d}</b>", styles["Title"]))
-        elements.append(Spacer(1, 8))
-
-        # サマリー
-        summary = monthly_stats.get("summary", {})
-        elements.append(Paragraph(f"Total Tickets: {summary.get('total_tickets', 0)} | Closed: {summary.get('closed_tickets', 0)}", styles["Normal"]))
-        elements.append(Spacer(1, 10))
-
-        # Annual Summary Chart
-        bar_path = chart_renderer.render_annual_summary(annual_summary, year)
-        elements.append(Image(bar_path, width=6.5 * inch, height=3 * inch))
-        elements.append(Spacer(1, 8))
-
-        month_labels = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        annual_table_data = [["Category"] + month_labels]
-        for category in annual_summary.get("categories", []):
-            counts = annual_summary.get("data", {}).get(category, [0] * 12)
-            annual_table_data.append([category] + counts)
-
-        annual_table = Table(annual_table_data, colWidths=[1.5 * inch] + [0.45 * inch] * 12)
-        annual_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#bfdbfe")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        elements.append(annual_table)
-        elements.append(PageBreak())
-
-        # Monthly Ticket Distribution + KPI Pivot Table (keep on same page)
-        page2_elements = []
-        page2_elements.append(Paragraph("<b>Monthly Ticket Distribution</b>", styles["Heading2"]))
-        page2_elements.append(Spacer(1, 6))
-        pie_path = chart_renderer.render_monthly_pie(monthly_stats["pivot_data"], year, month)
-        page2_elements.append(Image(pie_path, width=6.5 * inch, height=4.5 * inch))
-        page2_elements.append(Spacer(1, 8))
-
-        # Monthly KPI Pivot Table
-        page2_elements.append(Paragraph("<b>Monthly KPI Pivot Table</b>", styles["Heading2"]))
-        page2_elements.append(Spacer(1, 6))
-
-        pivot_table_data = [["Type", "Category", "TRANS_NON", "TRANS_WORK", "OPEN", "CLOSE"]]
-        for key, values in monthly_stats.get("pivot_data", {}).items():
-            parts = [p.strip() for p in key.split("|")]
-            type_name = parts[0] if len(parts) > 0 else ""
-            category_name = parts[1] if len(parts) > 1 else ""
-            pivot_table_data.append([
-                type_name,
-                category_name,
-                values.get("TRANS_NON", 0),
-                values.get("TRANS_WORK", 0),
-                values.get("OPEN", 0),
-                values.get("CLOSE", 0)
-            ])
-
-        pivot_table = Table(pivot_table_data, colWidths=[1.2 * inch, 2.0 * inch, 0.9 * inch, 0.9 * inch, 0.8 * inch, 0.8 * inch])
-        pivot_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#bfdbfe")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ALIGN", (2, 1), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        page2_elements.append(pivot_table)
-        elements.append(KeepTogether(page2_elements))
-        elements.append(PageBreak())
-
-        # SLA Breachセクション (keep title and table together)
-        sla_elements = []
-        sla_elements.append(Paragraph("<b>SLA Breach</b>", styles["Heading2"]))
-        sla_elements.append(Spacer(1, 6))
-
-        if sla_data:
-            sla_table_data = [["Ticket No.", "Requested for", "Description", "Time-Arrive", "Business elapsed time", "Remarks"]]
-            for breach in sla_data:
-                sla_table_data.append([
-                    breach.get("ticket_no", ""),
-                    breach.get("requested_for", ""),
-                    breach.get("description", ""),
-                    f"{year}/{month}/27",
-                    f"{breach.get('elapsed_time', '')}({breach.get('percentage', '')}%)",
-                    breach.get("remarks", "")
-                ])
-
-            sla_table = Table(sla_table_data, colWidths=[1.0 * inch, 1.0 * inch, 1.0 * inch, 0.7 * inch, 1.8 * inch, 2.8 * inch])
-            sla_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#bfdbfe")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-                ("WORDWRAP", (0, 0), (-1, -1), True),
-            ]))
-            sla_elements.append(sla_table)
-        else:
-            sla_elements.append(Paragraph("No SLA breach data for this month.", styles["Normal"]))
-        
-        elements.append(KeepTogether(sla_elements))
-        elements.append(Spacer(1, 12))
-
-        # Development Effortsセクション
-        elements.append(Paragraph("<b>Development Efforts</b>", styles["Heading2"]))
-        elements.append(Spacer(1, 10))
-
-        if dev_efforts_data:
-            month_labels = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec", "Total"]
-            
-            # ME Hours row
-            me_hours_row = [str(year)]
-            me_total = 0
-            for m in range(1, 13):
-                val = dev_efforts_data.get(m, {}).get("me_hours", "")
-                me_hours_row.append(str(val) if val != "" else "")
-                if val != "":
-                    me_total += float(val)
-            me_hours_row.append(str(me_total) if me_total > 0 else "")
-            
-            # SOW Planned row (fixed at 16)
-            sow_row = ["SOW Planned"]
-            sow_total = 0
-            for m in range(1, 13):
-                if dev_efforts_data.get(m):
-                    sow_row.append("16")
-                    sow_total += 16
-                else:
-                    sow_row.append("16")
-                    sow_total += 16
-            sow_row.append(str(sow_total))
-            
-            # Carry Forward row
-            cf_row = ["Carry Forward"]
-            cf_total = 0
-            for m in range(1, 13):
-                val = dev_efforts_data.get(m, {}).get("carry_forward", "")
-                cf_row.append(str(val) if val != "" else "")
-                if val != "":
-                    cf_total += float(val)
-            cf_row.append(str(cf_total) if cf_total != 0 else "")
-            
-            # Build table
-            dev_table_data = [
-                [str(year)] + month_labels,
-                ["ME Hours"] + me_hours_row[1:],
-                sow_row,
-                cf_row
-            ]
-            
-            col_widths = [1.0 * inch] + [0.55 * inch] * 13
-            dev_table = Table(dev_table_data, colWidths=col_widths)
-            dev_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#bfdbfe")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("ALIGN", (1, 0), (-1, -1), "CENTER"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ]))
-            elements.append(dev_table)
-        else:
-            elements.append(Paragraph("No Development Efforts data for this year.", styles["Normal"]))
-
-        doc.build(elements)
-
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=f"Monthly_Report_{year}_{month:02d}.pdf"
-        )
+def render_year_charts(content: bytes, year: int, through_month: Optional[int], processes: int) -> dict:
+    """1年分のグラフを描画してURLを返す（ブロッキング）"""
+    with stage("parse") as timing:
+        df = _read_ticket_sheets(content)
+        timing["rows"] = 0 if df is None else len(df)
+    if df is None:
+        raise HTTPException(status_code=400, detail="Required sheets not found")
+
+    with stage("aggregate"):
+        monthly_pivots = get_report_service().aggregate_year_pivots(df, year, through_month=through_month)
+        if not monthly_pivots:
+            raise HTTPException(status_code=404, detail=f"No data found for {year}")
+        annual_summary = get_report_service().get_annual_summary_data(df, year, target_month=through_month)
+
+    with stage("chart"):
+        result = get_chart_renderer().render_year(monthly_pivots, annual_summary, year, processes=processes)
+
+    return {
+        "success": True,
+        "year": year,
+        "charts": {
+            "pies": {m: chart_url(p) for m, p in result["pies"].items()},
+            "bar": chart_url(result["annual"])
+        }
+    }
+
+
+@router.post("/charts/year")
+async def prerender_year_charts(
+    file: UploadFile = File(...),
+    year: int = Form(...),
+    through_month: Optional[int] = Form(None),
+    processes: int = Form(1)
+):
+    """1年分の月次パイチャートと年間サマリーを一括で事前生成する（月末締め用）"""
+    try:
+        content = await file.read()
+        return await run_blocking(render_year_charts, content, year, through_month, processes)
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
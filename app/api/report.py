@@ -1,10 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Query, status
+from fastapi.responses import Response
 from datetime import date
+from typing import List, Optional
+import base64
+import binascii
+import gzip
+import io
+import json
+import re
 import shutil
 import os
 from tempfile import NamedTemporaryFile
-from app.services.report_orchestrator import get_weekly_report_data
+from app.infra.pdf_cache import get_pdf_cache, content_hash
+from app.infra.stage_executor import run_blocking, stage
+from app.utils.http_cache import make_etag, etag_matches, accepts_gzip
 
 router = APIRouter()
 
@@ -31,41 +40,206 @@ def validate_request(file: UploadFile, begin_date: str, end_date: str):
         )
     return begin_dt, end_dt
 
-from fastapi.encoders import jsonable_encoder
 
-import pandas as pd
+JSON_SHAPES = ("records", "columns")
+JSON_SECTIONS = ("left_section", "right_section", "new_users_section")
+MAX_PAGE_SIZE = 10000
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+DATASET_KEY_PATTERN = re.compile(r"^weekly-[0-9a-f]{64}$")
+
+
+def validate_shape(shape: str) -> str:
+    if shape not in JSON_SHAPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "INVALID_SHAPE", "message": f"shape must be one of {', '.join(JSON_SHAPES)}"}
+        )
+    return shape
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated column names of the `fields` parameter (None = all columns)."""
+    if fields is None:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    if not names:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "INVALID_FIELDS", "message": "fields must list at least one column"}
+        )
+    return names
+
+
+def validate_limit(limit: Optional[int]) -> Optional[int]:
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "INVALID_LIMIT", "message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}
+        )
+    return limit
+
+
+def encode_cursor(dataset_key: str, section: str, offset: int, limit: int,
+                  fields: Optional[List[str]], shape: str) -> str:
+    """Opaque cursor of a section page: the cached dataset plus the page parameters."""
+    payload = {"k": dataset_key, "s": section, "o": offset, "n": limit, "f": fields, "shape": shape}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def invalid_cursor(message: str = "cursor is malformed") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"error_code": "INVALID_CURSOR", "message": message}
+    )
+
+
+def validate_fields(frames: dict, fields: Optional[List[str]]):
+    """Every requested field must be a column of some section (INVALID_FIELDS otherwise)."""
+    from app.services.json_service import unknown_fields
+
+    unknown = unknown_fields(frames, fields) if fields is not None else []
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "INVALID_FIELDS", "message": f"Unknown fields: {', '.join(unknown)}"}
+        )
+
+
+def decode_cursor(cursor: str) -> dict:
+    """The page parameters of a cursor; INVALID_CURSOR unless every one has the expected type and range."""
+    invalid = invalid_cursor()
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise invalid
+    if not isinstance(payload, dict):
+        raise invalid
+    fields = payload.get("f")
+    valid = (
+        isinstance(payload.get("k"), str) and DATASET_KEY_PATTERN.match(payload["k"])
+        and payload.get("s") in JSON_SECTIONS
+        and type(payload.get("o")) is int and payload["o"] >= 0
+        and type(payload.get("n")) is int and 1 <= payload["n"] <= MAX_PAGE_SIZE
+        and (fields is None or (isinstance(fields, list) and all(isinstance(f, str) for f in fields)))
+        and payload.get("shape") in JSON_SHAPES
+    )
+    if not valid:
+        raise invalid
+    return payload
+
+
+def page_info(dataset_key: str, section: str, offset: int, limit: int, total: int,
+              fields: Optional[List[str]], shape: str) -> dict:
+    next_offset = offset + limit
+    next_cursor = (
+        encode_cursor(dataset_key, section, next_offset, limit, fields, shape) if next_offset < total else None
+    )
+    return {"offset": offset, "total": total, "next_cursor": next_cursor}
+
+
+def weekly_dataset_key(workbook_path: str, begin_dt: date, end_dt: date) -> str:
+    """Dataset cache key of the prepared sections (workbook content, period and the sheet-year window)."""
+    from app.services.report_orchestrator import workbook_hash
+    return "weekly-" + content_hash(
+        f"{workbook_hash(workbook_path)}|{begin_dt.isoformat()}|{end_dt.isoformat()}|{date.today().year}".encode("utf-8")
+    )
+
+
+def build_weekly_json(workbook_path: str, begin_dt: date, end_dt: date, shape: str = "records",
+                      fields: Optional[List[str]] = None, limit: Optional[int] = None) -> bytes:
+    """
+    Parse, aggregate and encode the /generate response body (blocking).
+    With `limit`, sections longer than one page are kept in the shared dataset cache
+    so /generate/page can serve the rest without the workbook being uploaded again.
+    """
+    # Heavy imports (pandas, openpyxl) are deferred to first use to keep API startup fast
+    from app.services.report_orchestrator import get_weekly_report_data
+    from app.services.json_service import encode_json_report, section_frames
+
+    data = get_weekly_report_data(workbook_path, begin_dt, end_dt)
+    frames = section_frames(data)
+    validate_fields(frames, fields)
+
+    pages = None
+    if limit is not None:
+        dataset_key = weekly_dataset_key(workbook_path, begin_dt, end_dt)
+        pages = {
+            name: page_info(dataset_key, name, 0, limit, len(df), fields, shape)
+            for name, df in frames.items()
+        }
+        if any(page["next_cursor"] for page in pages.values()):
+            from app.infra.dataset_cache import get_dataset_cache
+            get_dataset_cache().put(dataset_key, frames)
+    return encode_json_report(data, begin_dt, end_dt, shape, fields, limit, pages)
+
+
+def build_weekly_page(cursor: dict, limit: Optional[int] = None) -> bytes:
+    """Encode the section page a cursor points to from the cached dataset (blocking)."""
+    from app.infra.dataset_cache import get_dataset_cache
+    from app.services.json_service import encode_json, encode_section, select_page
+
+    frames = get_dataset_cache().get(cursor["k"])
+    if frames is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail={"error_code": "CURSOR_EXPIRED", "message": "The report data has expired; generate the report again"}
+        )
+    section, offset, fields, shape = cursor["s"], cursor["o"], cursor["f"], cursor["shape"]
+    if section not in frames:
+        raise invalid_cursor(f"Unknown section: {section}")
+    validate_fields(frames, fields)
+    limit = limit or cursor["n"]
+    df = frames[section]
+    payload = {
+        "section": section,
+        "data": encode_section(select_page(df, fields, offset, limit), shape),
+        **page_info(cursor["k"], section, offset, limit, len(df), fields, shape),
+    }
+    return encode_json(payload)
+
+
+async def json_response(body: bytes, accept_encoding: Optional[str]) -> Response:
+    """JSON bytes as a response, gzip-compressed (off the event loop) when the client accepts it."""
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and accepts_gzip(accept_encoding):
+        body = await run_blocking(gzip.compress, body, GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.post("/generate")
 async def generate_json_report(
     begin_date: str = Form(...),
     end_date: str = Form(...),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    shape: str = Form("records"),
+    fields: Optional[str] = Form(None),
+    limit: Optional[int] = Form(None),
+    accept_encoding: Optional[str] = Header(None)
 ):
+    """
+    Weekly report as JSON.
+    - shape=columns returns each section as {"columns": [...], "rows": [[...], ...]}
+      instead of a list of objects.
+    - fields=<col>,<col> keeps only those columns in every section.
+    - limit=N returns the first N rows of each section; "pages" then holds each
+      section's total and the cursor for GET /generate/page.
+    """
     begin_dt, end_dt = validate_request(file, begin_date, end_date)
-    
+    validate_shape(shape)
+    field_names = parse_fields(fields)
+    validate_limit(limit)
+
     with NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
         shutil.copyfileobj(file.file, tmp_file)
         tmp_path = tmp_file.name
 
     try:
-        data = get_weekly_report_data(tmp_path, begin_dt, end_dt)
-        
-        # Clean DataFrames: Replace NaT/NaN with None for JSON serialization
-        def clean_df(df):
-            return df.astype(object).where(pd.notnull(df), None).to_dict(orient="records")
-
-        # Convert to JSON-serializable format
-        result = {
-            "summary": data["summary"],
-            "left_section": clean_df(data["left_df"]),
-            "right_section": clean_df(data["right_df"]),
-            "new_users_section": clean_df(data["new_users_df"]),
-            "period": {
-                "begin": begin_dt.isoformat(),
-                "end": end_dt.isoformat()
-            }
-        }
-        return JSONResponse(content=jsonable_encoder(result))
+        # Parsing and aggregation run off the event loop
+        body = await run_blocking(build_weekly_json, tmp_path, begin_dt, end_dt, shape, field_names, limit)
+        return await json_response(body, accept_encoding)
     except Exception as e:
         print(f"Error in generate_json_report: {str(e)}")
         import traceback
@@ -75,36 +249,144 @@ async def generate_json_report(
     finally:
         if os.path.exists(tmp_path): os.remove(tmp_path)
 
-@router.post("/pdf", response_class=FileResponse)
+
+@router.get("/generate/page")
+async def get_json_report_page(
+    cursor: str = Query(...),
+    limit: Optional[int] = Query(None),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """
+    Next page of one /generate section, served from the cached dataset (no re-upload).
+    The cursor carries the section, offset, fields and shape; `limit` overrides the page size.
+    """
+    page_cursor = decode_cursor(cursor)
+    validate_limit(limit)
+    body = await run_blocking(build_weekly_page, page_cursor, limit)
+    return await json_response(body, accept_encoding)
+
+def weekly_pdf_key(content: bytes, begin_dt: date, end_dt: date) -> str:
+    """Cache key / ETag: workbook content, period, renderer version (and the sheet-year window)."""
+    from app.infra.pdf_renderer import RENDERER_VERSION
+    return get_pdf_cache().make_key(
+        "weekly", RENDERER_VERSION, content_hash(content),
+        begin_dt.isoformat(), end_dt.isoformat(), date.today().year
+    )
+
+
+def build_weekly_pdf(content: bytes, begin_dt: date, end_dt: date, cache_key: str) -> bytes:
+    """Parse, aggregate and render the weekly PDF (blocking; cached under `cache_key`)."""
+    cache = get_pdf_cache()
+    pdf_bytes = cache.get(cache_key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    from app.services.report_orchestrator import get_weekly_report_data
+    from app.services.pdf_service import generate_pdf_service
+
+    data = get_weekly_report_data(io.BytesIO(content), begin_dt, end_dt)
+    with stage("pdf") as timing:
+        pdf_bytes = generate_pdf_service(data, begin_dt, end_dt)
+        timing["bytes"] = len(pdf_bytes)
+    cache.put(cache_key, pdf_bytes)
+    return pdf_bytes
+
+
+def weekly_pdf_filename(end_date: str) -> str:
+    return f"alphast_SNOW_report_{end_date.replace('-', '_')}.pdf"
+
+
+@router.post("/pdf", response_class=Response)
 async def generate_pdf_report(
     begin_date: str = Form(...),
     end_date: str = Form(...),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    if_none_match: Optional[str] = Header(None)
 ):
     begin_dt, end_dt = validate_request(file, begin_date, end_date)
-    
-    with NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = tmp_file.name
+
+    # Per-request in-memory upload and PDF: concurrent requests share no files
+    content = await file.read()
+
+    cache_key = weekly_pdf_key(content, begin_dt, end_dt)
+    etag = make_etag(cache_key)
+    headers = {"ETag": etag, "Content-Disposition": f'attachment; filename="{weekly_pdf_filename(end_date)}"'}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
     try:
-        data = get_weekly_report_data(tmp_path, begin_dt, end_dt)
-        
-        # We need a PDF generation service
-        from app.services.pdf_service import generate_pdf_service
-        output_pdf_path = generate_pdf_service(data, begin_dt, end_dt)
-
-        filename = f"alphast_SNOW_report_{end_date.replace('-', '_')}.pdf"
-        return FileResponse(
-            path=output_pdf_path,
-            filename=filename,
-            media_type="application/pdf"
-        )
+        pdf_bytes = await run_blocking(build_weekly_pdf, content, begin_dt, end_dt, cache_key)
+        return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
     except Exception as e:
         print(f"Error in generate_pdf_report: {str(e)}")
         import traceback
         traceback.print_exc()
         if isinstance(e, HTTPException): raise e
         raise HTTPException(status_code=500, detail={"error_code": "INTERNAL_ERROR", "message": str(e)})
-    finally:
-        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+
+def parse_bundle_outputs(outputs: Optional[str], has_template: bool) -> list:
+    """Validates the comma-separated `outputs` form field of /bundle."""
+    from app.services.bundle_service import BUNDLE_OUTPUTS
+
+    if not outputs:
+        return ["json", "pdf", "xlsx"] if has_template else ["json", "pdf"]
+    requested = [o.strip().lower() for o in outputs.split(",") if o.strip()]
+    unknown = [o for o in requested if o not in BUNDLE_OUTPUTS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "INVALID_OUTPUTS", "message": f"outputs must be a subset of {', '.join(BUNDLE_OUTPUTS)}"}
+        )
+    if "xlsx" in requested and not has_template:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "TEMPLATE_REQUIRED", "message": "xlsx output requires a template upload"}
+        )
+    return requested
+
+
+def bundle_filename(end_date: str) -> str:
+    return f"alphast_SNOW_report_{end_date.replace('-', '_')}"
+
+
+@router.post("/bundle", response_class=Response)
+async def generate_report_bundle(
+    begin_date: str = Form(...),
+    end_date: str = Form(...),
+    file: UploadFile = File(...),
+    template: Optional[UploadFile] = File(None),
+    outputs: Optional[str] = Form(None)
+):
+    """
+    One upload, every deliverable: JSON preview, PDF and (with a template) the
+    Excel report, rendered in parallel from a single parse and returned as a zip.
+    The Excel report has the open tickets on the template's "IFS" sheet, the
+    closed / open counts on its Period line and the new users on its "New User"
+    sheet (skipped if the template has none); closed tickets are not listed.
+    """
+    begin_dt, end_dt = validate_request(file, begin_date, end_date)
+    requested = parse_bundle_outputs(outputs, template is not None)
+
+    content = await file.read()
+    template_content = await template.read() if template is not None else None
+    basename = bundle_filename(end_date)
+
+    try:
+        from app.services.bundle_service import build_report_bundle
+
+        archive = await run_blocking(
+            build_report_bundle, io.BytesIO(content), begin_dt, end_dt, requested,
+            io.BytesIO(template_content) if template_content is not None else None, basename
+        )
+        return Response(
+            content=archive, media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{basename}.zip"'}
+        )
+    except Exception as e:
+        print(f"Error in generate_report_bundle: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        if isinstance(e, HTTPException): raise e
+        raise HTTPException(status_code=500, detail={"error_code": "INTERNAL_ERROR", "message": str(e)})
@@ -1,21 +1,16 @@
 """
 SLA Breach Data Management API
 月別SLAデータの保存・取得・削除
+Breach の id は月ごとに採番され、削除・保存で振り直されない。変更履歴は /history で参照できる。
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-import json
-import os
-from pathlib import Path
+from app.infra.data_repository import get_sla_repository, get_month_key
 
 router = APIRouter(prefix="/api/sla", tags=["SLA Data"])
 
-# Data file path
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-SLA_DATA_FILE = DATA_DIR / "sla_breach_data.json"
-
 
 class SLABreach(BaseModel):
     id: Optional[int] = None
@@ -34,106 +29,74 @@ class MonthSLAData(BaseModel):
     breaches: List[SLABreach]
 
 
-def ensure_data_file():
-    """データファイルの存在確認・初期化"""
-    DATA_DIR.mkdir(exist_ok=True)
-    if not SLA_DATA_FILE.exists():
-        with open(SLA_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump({"monthly_data": {}}, f, ensure_ascii=False, indent=2)
-
-
-def load_data() -> dict:
-    """JSONデータ読み込み"""
-    ensure_data_file()
-    try:
-        with open(SLA_DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return {"monthly_data": {}}
-
-
-def save_data(data: dict):
-    """JSONデータ保存"""
-    ensure_data_file()
-    with open(SLA_DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def get_month_key(year: int, month: int) -> str:
-    """月キー生成"""
-    return f"{year}-{str(month).zfill(2)}"
-
-
 @router.get("/{year}/{month}")
 async def get_sla_data(year: int, month: int):
     """指定月のSLAデータ取得"""
-    data = load_data()
-    month_key = get_month_key(year, month)
-    month_data = data["monthly_data"].get(month_key, {"breaches": []})
     return {
         "year": year,
         "month": month,
-        "breaches": month_data.get("breaches", [])
+        "breaches": get_sla_repository().get_month(year, month)
     }
 
 
 @router.post("/{year}/{month}")
 async def save_sla_data(year: int, month: int, sla_data: MonthSLAData):
-    """指定月のSLAデータ保存"""
-    data = load_data()
+    """
+    指定月のSLAデータ保存（一覧の置き換え）
+    id のある Breach は更新、id の無い Breach は追加、一覧に無い Breach は削除として記録する。
+    """
     month_key = get_month_key(year, month)
-    
-    # Assign IDs and timestamps
-    breaches = []
-    for i, breach in enumerate(sla_data.breaches):
-        breach_dict = breach.dict()
-        breach_dict["id"] = i + 1
-        if not breach_dict.get("created_at"):
-            breach_dict["created_at"] = datetime.now().isoformat()
-        breaches.append(breach_dict)
-    
-    data["monthly_data"][month_key] = {
+    breaches = get_sla_repository().save_month(
+        year, month, [breach.dict() for breach in sla_data.breaches], updated_at=datetime.now().isoformat()
+    )
+    return {
+        "status": "success",
+        "message": f"Saved {len(breaches)} SLA breaches for {month_key}",
+        "breaches": breaches
+    }
+
+
+@router.post("/{year}/{month}/breaches")
+async def add_sla_breach(year: int, month: int, breach: SLABreach):
+    """SLA Breachを1件追加"""
+    return get_sla_repository().add_breach(year, month, breach.dict(), updated_at=datetime.now().isoformat())
+
+
+@router.put("/{year}/{month}/{breach_id}")
+async def update_sla_breach(year: int, month: int, breach_id: int, breach: SLABreach):
+    """指定SLA Breach更新"""
+    updated = get_sla_repository().update_breach(
+        year, month, breach_id, breach.dict(), updated_at=datetime.now().isoformat()
+    )
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Breach not found")
+    return updated
+
+
+@router.get("/{year}/{month}/history")
+async def get_sla_history(year: int, month: int):
+    """指定月の変更履歴（追加・更新・削除の記録、古い順）"""
+    return {
         "year": year,
         "month": month,
-        "breaches": breaches,
-        "updated_at": datetime.now().isoformat()
+        "history": get_sla_repository().history(year, month)
     }
-    
-    save_data(data)
-    return {"status": "success", "message": f"Saved {len(breaches)} SLA breaches for {month_key}"}
 
 
 @router.delete("/{year}/{month}/{breach_id}")
 async def delete_sla_breach(year: int, month: int, breach_id: int):
     """指定SLA Breach削除"""
-    data = load_data()
-    month_key = get_month_key(year, month)
-    
-    if month_key not in data["monthly_data"]:
+    deleted = get_sla_repository().delete_breach(year, month, breach_id, updated_at=datetime.now().isoformat())
+
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Month data not found")
-    
-    month_data = data["monthly_data"][month_key]
-    breaches = month_data.get("breaches", [])
-    
-    # Filter out the breach to delete
-    new_breaches = [b for b in breaches if b.get("id") != breach_id]
-    
-    if len(new_breaches) == len(breaches):
+    if not deleted:
         raise HTTPException(status_code=404, detail="Breach not found")
-    
-    # Reassign IDs
-    for i, breach in enumerate(new_breaches):
-        breach["id"] = i + 1
-    
-    month_data["breaches"] = new_breaches
-    month_data["updated_at"] = datetime.now().isoformat()
-    
-    save_data(data)
+
     return {"status": "success", "message": f"Deleted breach {breach_id}"}
 
 
 @router.get("/all")
 async def get_all_sla_data():
     """全SLAデータ取得"""
-    data = load_data()
-    return data["monthly_data"]
+    return get_sla_repository().all_months()
@@ -0,0 +1,292 @@
+"""
+Artifact Store
+
+生成物（static/charts の PNG、static/Monthly_Report_*.pdf など）を容量上限と TTL で管理する。
+ディレクトリ走査を避けるため、登録済みファイルのサイズと最終アクセス時刻をインデックス（JSON）に保持し、
+上限を超えた場合は最終アクセスが古い順（LRU）に削除する。
+index.html や logo.jpg など、登録されていないファイルは一切削除しない。
+
+複数のワーカープロセスが同じディレクトリを共有できる:
+インデックスの変更はロックファイル（<index>.lock）で排他し、ディスク上の最新のインデックスを読み直してから書き込む。
+他プロセスが書き換えたインデックスはファイルの変化で検知して読み直す。
+公開ディレクトリ（static/）のストアは、インデックスとロックファイルを公開されない cache/ に置く（index_dir）。
+"""
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.infra.file_lock import FileLock, atomic_write
+
+STATIC_DIR = Path(__file__).parent.parent.parent / "static"
+# static/ のインデックスの置き場所（/static として配信されないディレクトリ）
+STATIC_INDEX_DIR = Path(__file__).parent.parent.parent / "cache"
+STATIC_INDEX_NAME = "static_artifact_index.json"
+LEGACY_INDEX_NAME = ".artifact_index.json"
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024   # 200 MB
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
+
+# インデックスが無い初回起動時のみ取り込む既存の生成物
+ADOPT_PATTERNS = ("charts/*.png", "Monthly_Report_*.pdf")
+
+# touch() のたびにインデックスを書き出さないための最小間隔
+INDEX_FLUSH_INTERVAL = 5.0
+
+
+class ArtifactStore:
+    """
+    容量上限（バイト）と TTL を持つ生成物ストア。
+    キーはルートディレクトリからの相対パス（例: "charts/monthly_pie_2025_01.png"）。
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        index_name: str = LEGACY_INDEX_NAME,
+        index_dir: Optional[str] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.root_dir = os.path.abspath(root_dir)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # インデックスとロックファイルの置き場所（既定はルートディレクトリ）
+        self.index_path = os.path.join(os.path.abspath(index_dir) if index_dir else self.root_dir, index_name)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{self.index_path}.lock")
+        self._lock_depth = 0
+        self._last_flush = 0.0
+        self._dirty = False
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._touched: Dict[str, float] = {}   # 未書き出しのアクセス時刻
+        self._changed = False
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with self._locked():
+            if self._signature is None:
+                self._index = self._adopt_existing()
+                self._changed = True
+
+    # ---- index persistence ----
+
+    def _stat_index(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _reload_if_changed(self):
+        """他プロセスがインデックスを書き換えていれば読み直す（未書き出しのアクセス時刻は引き継ぐ）。"""
+        signature = self._stat_index()
+        if signature is None or signature == self._signature:
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f).get("artifacts", {})
+        except Exception:
+            return
+        for key, last_access in self._touched.items():
+            if key in index:
+                index[key]["last_access"] = max(index[key]["last_access"], last_access)
+        self._index = index
+        self._signature = signature
+
+    def _adopt_existing(self) -> Dict[str, Dict[str, Any]]:
+        # 初回のみ既存の生成物を取り込む（以降はインデックスのみ参照）
+        now = self._clock()
+        index = {}
+        for pattern in ADOPT_PATTERNS:
+            for path in glob.glob(os.path.join(self.root_dir, pattern)):
+                stat = os.stat(path)
+                index[self._key(path)] = {"size": stat.st_size, "created": stat.st_mtime, "last_access": now}
+        return index
+
+    @contextmanager
+    def _locked(self):
+        """
+        インデックスを変更する区間。プロセス間ロックを取り、最新のインデックスを読み直してから
+        変更し、変更（_changed）またはアクセス記録があれば抜けるときに書き出す（入れ子にできる）。
+        """
+        with self._lock:
+            outermost = self._lock_depth == 0
+            if outermost:
+                self._file_lock.acquire()
+            self._lock_depth += 1
+            try:
+                if outermost:
+                    self._reload_if_changed()
+                yield
+                if outermost and (self._changed or self._touched):
+                    self._write()
+            finally:
+                self._lock_depth -= 1
+                if outermost:
+                    self._file_lock.release()
+
+    def _write(self):
+        atomic_write(self.index_path, json.dumps({"artifacts": self._index}, ensure_ascii=False).encode("utf-8"))
+        self._signature = self._stat_index()
+        self._touched.clear()
+        self._changed = False
+        self._last_flush = self._clock()
+        self._dirty = False
+
+    def _flush(self, force: bool = False):
+        now = self._clock()
+        if not force and now - self._last_flush < INDEX_FLUSH_INTERVAL:
+            self._dirty = True
+            return
+        with self._locked():
+            pass
+        self._dirty = False
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root_dir).replace(os.sep, "/")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, *key.split("/"))
+
+    # ---- public API ----
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return sum(int(entry["size"]) for entry in self._index.values())
+
+    def key_for(self, path: str) -> str:
+        return self._key(path)
+
+    def register(self, path: str, digest: Optional[str] = None) -> Optional[str]:
+        """
+        書き出し直後の生成物を登録し、必要に応じて古いものを削除する。キーを返す。
+        digest（入力データのハッシュ）を渡すと、同じ入力の生成物を lookup(key, digest) で再利用できる。
+        """
+        key = self._key(path)
+        if key.startswith(".."):
+            # ルート外のファイルは管理対象外（削除対象にしない）
+            return None
+        now = self._clock()
+        with self._locked():
+            self._index[key] = {"size": os.path.getsize(path), "created": now, "last_access": now}
+            if digest is not None:
+                self._index[key]["digest"] = digest
+            self._changed = True
+            self.evict(keep={key})
+        return key
+
+    def touch(self, path: str) -> bool:
+        """アクセスを記録する（LRU 用）。未登録のファイルなら False。"""
+        key = self._key(path)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return False
+            entry["last_access"] = self._touched[key] = self._clock()
+            self._flush()
+            return True
+
+    def lookup(self, key: str, digest: Optional[str] = None) -> Optional[str]:
+        """
+        有効期限内の生成物のパスを返す（ディレクトリ走査なし）。期限切れ・消失時は None。
+        digest を渡した場合は、同じ digest で登録された生成物のみ返す。
+        """
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._index.get(key)
+            if entry is None or (digest is not None and entry.get("digest") != digest):
+                return None
+            now = self._clock()
+            path = self._path(key)
+            if self._expired(entry, now) or not os.path.exists(path):
+                with self._locked():
+                    # 他プロセスが登録し直していれば削除しない
+                    entry = self._index.get(key)
+                    if entry is not None and (self._expired(entry, now) or not os.path.exists(path)):
+                        self._remove(key)
+                return None
+            entry["last_access"] = self._touched[key] = now
+            self._flush()
+            return path
+
+    def evict(self, keep: Optional[set] = None) -> List[str]:
+        """TTL 切れを削除し、容量上限を超えていれば最終アクセスが古い順に削除する。"""
+        keep = keep or set()
+        removed = []
+        with self._locked():
+            now = self._clock()
+            for key, entry in list(self._index.items()):
+                if key not in keep and self._expired(entry, now):
+                    self._remove(key)
+                    removed.append(key)
+
+            total = sum(int(entry["size"]) for entry in self._index.values())
+            if total > self.max_bytes:
+                for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+                    if total <= self.max_bytes:
+                        break
+                    if key in keep:
+                        continue
+                    total -= int(entry["size"])
+                    self._remove(key)
+                    removed.append(key)
+        return removed
+
+    def flush(self):
+        """遅延中のインデックス更新を書き出す。"""
+        with self._lock:
+            if self._dirty:
+                self._flush(force=True)
+
+    def _expired(self, entry: Dict[str, float], now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry["last_access"] > self.ttl_seconds
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        self._changed = True
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+_default_store: Optional[ArtifactStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    static/ 配下の生成物用の共有ストア（インデックスは cache/static_artifact_index.json）。
+    容量上限と TTL は環境変数 ARTIFACT_MAX_BYTES / ARTIFACT_TTL_SECONDS で変更できる。
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _remove_legacy_index(str(STATIC_DIR))
+            _default_store = ArtifactStore(
+                root_dir=str(STATIC_DIR),
+                max_bytes=int(os.environ.get("ARTIFACT_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                ttl_seconds=float(os.environ.get("ARTIFACT_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                index_name=STATIC_INDEX_NAME,
+                index_dir=str(STATIC_INDEX_DIR)
+            )
+        return _default_store
+
+
+def _remove_legacy_index(root_dir: str):
+    """以前 static/ 直下に置いていたインデックスとロックファイルを削除する（/static で公開されていたため）。"""
+    for name in (LEGACY_INDEX_NAME, f"{LEGACY_INDEX_NAME}.lock"):
+        try:
+            os.remove(os.path.join(root_dir, name))
+        except OSError:
+            pass
@@ -1,10 +1,23 @@
 import matplotlib
 matplotlib.use('Agg') # サーバー側での描画用にバックエンドを固定
-import matplotlib.pyplot as plt
+# pyplot の「現在の図」はプロセス全体で共有されるため使わない（chart 段階は複数スレッドで同時に描画する）
+from matplotlib.figure import Figure
 import pandas as pd
+import io
 import os
-from typing import Dict, List, Any
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
 import numpy as np
+from app.infra.file_lock import atomic_write
+from app.infra.metrics import record_cache
+from app.infra.timing import span
+
+# 描画内容を変更したら上げる（描画済みグラフの再利用キーに含まれる）
+CHART_VERSION = "2"
+
+MONTH_LABELS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 
 class ChartRenderer:
     """
@@ -23,100 +36,182 @@ class ChartRenderer:
         "Deactivate account": "#0000FF"         # Blue
     }
 
-    def __init__(self, output_dir: str = "static/charts"):
+    def __init__(self, output_dir: str = "static/charts", artifact_store=None):
         self.output_dir = output_dir
+        # 生成したPNGを容量上限・TTL付きで管理する（任意）
+        self.artifact_store = artifact_store
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def render_annual_summary(self, data: Dict[str, Any], year: int) -> str:
+    def _register(self, output_path: str, digest: Optional[str] = None):
+        if self.artifact_store is not None:
+            self.artifact_store.register(output_path, digest=digest)
+
+    def _reusable(self, output_path: str, digest: str) -> bool:
         """
-        年間サマリーの積み上げ棒グラフを生成する。
-        常に1月〜12月の全ての月を表示し、データがある月のみ棒グラフを描画。
+        同じ入力から描画済みのグラフがあれば True（ストアのインデックスは他のワーカープロセスと共有）。
+        """
+        if self.artifact_store is None:
+            return False
+        reusable = self.artifact_store.lookup(self.artifact_store.key_for(output_path), digest=digest) is not None
+        record_cache("chart", reusable)
+        return reusable
+
+    @staticmethod
+    def _digest(kind: str, *parts: Any) -> str:
+        from app.infra.pdf_cache import data_hash
+        return data_hash([kind, CHART_VERSION, *parts])
+
+    @classmethod
+    def build_annual_series(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        年間サマリーの積み上げ棒グラフ用系列を構築する（描画なし）。
+        常に1月〜12月の12要素の配列を返す。
         """
         months = data["months"]  # 実際にデータがある月のリスト（例：[1]なら1月のみ）
-        categories = data["categories"]
         stats_data = data["data"]
 
-        # 常に12ヶ月分のスペースを確保
-        fig, ax = plt.subplots(figsize=(10, 5))
-        
-        # 常に12ヶ月分のラベルを表示
-        all_month_labels = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        
-        # 12ヶ月分のゼロ配列を準備
-        bottom = np.zeros(12)
-
-        # カテゴリごとに積み上げ
-        for cat in categories:
+        series = []
+        for cat in data["categories"]:
             # 12ヶ月分の配列を作成（デフォルトは0）
             counts_full = [0] * 12
-            
+
             # データがある月のみ値を設定
             cat_data = stats_data.get(cat, [])
             for i, month in enumerate(months):
                 if i < len(cat_data):
-                    counts_full[month - 1] = cat_data[i]  # month-1でインデックスに変換
-            
-            color = self.CATEGORY_COLORS.get(cat, "#808080")
-            ax.bar(all_month_labels, counts_full, bottom=bottom, label=cat, color=color)
-            bottom += np.array(counts_full)
+                    counts_full[month - 1] = int(cat_data[i])  # month-1でインデックスに変換
 
-        # 装飾
-        ax.set_title(f"Annual Summary - {year}", fontsize=16, fontweight='bold', pad=20)
-        ax.set_ylabel("Ticket Count", fontsize=12)
-        ax.grid(axis='y', linestyle='--', alpha=0.3)
-        
-        # 月ラベルのフォントサイズを調整
-        ax.tick_params(axis='x', labelsize=10)
-        ax.tick_params(axis='y', labelsize=10)
+            series.append({
+                "category": cat,
+                "counts": counts_full,
+                "color": cls.CATEGORY_COLORS.get(cat, "#808080")
+            })
 
-        # x軸の範囲を12ヶ月分に固定
-        ax.set_xlim(-0.6, 11.6) 
-        plt.subplots_adjust(left=0.12, right=0.98, top=0.88, bottom=0.1)
+        return {"labels": list(MONTH_LABELS), "series": series}
 
-        # レイアウト確定
-        
-        output_path = os.path.join(self.output_dir, f"annual_summary_{year}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return output_path
+    @classmethod
+    def order_pie_labels(cls, labels) -> List[str]:
+        """
+        パイチャートのカテゴリ順（SOWの表示順、その他は名前順）。
+        単月の描画（render_monthly_pie）と1年分の一括描画（render_year）で同じ順にする。
+        """
+        known = list(cls.CATEGORY_COLORS)
+        return sorted(set(labels), key=lambda label: (known.index(label), "") if label in cls.CATEGORY_COLORS else (len(known), label))
 
-    def render_monthly_pie(self, pivot_data: Dict[str, Any], year: int, month: int) -> str:
+    @classmethod
+    def build_pie_slices(cls, pivot_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
-        月間のカテゴリ配分を示すパイチャートを生成する。
+        月間のカテゴリ配分（パイチャート用スライス）を構築する（描画なし）。
+        スライスは order_pie_labels の順。データが無い場合は空リストを返す。
         """
         # カテゴリごとの合計を算出
         cat_totals = {}
         target_cols = ["TRANS_NON", "TRANS_WORK", "OPEN", "CLOSE"]
-        
+
         for key, values in pivot_data.items():
             # key format: "Type | Category"
             parts = key.split('|')
             cat = parts[1].strip() if len(parts) > 1 else parts[0].strip()
-            
+
             # 各ステータスの合計を算出 ('Grand Total'が削除されたため手動)
             row_total = sum(values.get(c, 0) for c in target_cols)
-            cat_totals[cat] = cat_totals.get(cat, 0) + row_total
+            cat_totals[cat] = cat_totals.get(cat, 0) + int(row_total)
 
-        # 集計データが空、または合計が0の場合のハンドリング
         if not cat_totals or sum(cat_totals.values()) == 0:
-            # 描画エラーを避けるため、空の画像を生成するか、例外的に処理
-            labels = ["No Data"]
-            sizes = [1] # ダミー
-            colors = ["#e2e8f0"] # Gray
-        else:
-            labels = list(cat_totals.keys())
-            sizes = list(cat_totals.values())
-            colors = [self.CATEGORY_COLORS.get(label, "#808080") for label in labels]
+            return []
+
+        return [
+            {"label": label, "value": cat_totals[label], "color": cls.CATEGORY_COLORS.get(label, "#808080")}
+            for label in cls.order_pie_labels(cat_totals)
+        ]
+
+    @classmethod
+    def build_chart_data(cls, pivot_data: Dict[str, Any], annual_summary: Dict[str, Any], year: int, month: int) -> Dict[str, Any]:
+        """
+        クライアント側描画用のチャートデータ（JSON）を構築する。
+        サーバー側のラスタライズは行わない（PDF出力時のみ必要）。
+        """
+        return {
+            "year": year,
+            "month": month,
+            "palette": dict(cls.CATEGORY_COLORS),
+            "annual": {
+                "title": f"Annual Summary - {year}",
+                **cls.build_annual_series(annual_summary)
+            },
+            "pie": {
+                "title": f"Total incidents and SRs - {year}/{month:02d}",
+                "slices": cls.build_pie_slices(pivot_data)
+            }
+        }
+
+    @staticmethod
+    def _png(fig: Figure) -> bytes:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=300, bbox_inches='tight') # 余白を自動調整して保存
+        return buffer.getvalue()
+
+    def _annual_figure(self, annual: Dict[str, Any], year: int) -> Figure:
+        # 常に12ヶ月分のスペースを確保
+        fig = Figure(figsize=(10, 5))
+        ax = fig.subplots()
+
+        # 常に12ヶ月分のラベルを表示
+        all_month_labels = annual["labels"]
+
+        # 12ヶ月分のゼロ配列を準備
+        bottom = np.zeros(12)
+
+        # カテゴリごとに積み上げ
+        for entry in annual["series"]:
+            counts_full = entry["counts"]
+            ax.bar(all_month_labels, counts_full, bottom=bottom, label=entry["category"], color=entry["color"])
+            bottom += np.array(counts_full)
+
+        # 装飾
+        ax.set_title(f"Annual Summary - {year}", fontsize=16, fontweight='bold', pad=20)
+        ax.set_ylabel("Ticket Count", fontsize=12)
+        ax.grid(axis='y', linestyle='--', alpha=0.3)
+
+        # 月ラベルのフォントサイズを調整
+        ax.tick_params(axis='x', labelsize=10)
+        ax.tick_params(axis='y', labelsize=10)
+
+        # x軸の範囲を12ヶ月分に固定
+        ax.set_xlim(-0.6, 11.6)
+        fig.subplots_adjust(left=0.12, right=0.98, top=0.88, bottom=0.1)
+        return fig
+
+    def _pie_png(self, slices: List[Dict[str, Any]], year: int, month: int) -> bytes:
+        """
+        データのある月は render_year と同じ図テンプレートで描画する
+        （単月・一括のどちらで描画しても同じ PNG になる）。
+        """
+        if not slices:
+            return self._png(self._no_data_pie_figure(year, month))
+        template = _PieTemplate([s["label"] for s in slices])
+        try:
+            template.update(slices, year, month)
+            return self._png(template.fig)
+        finally:
+            template.close()
+
+    def _no_data_pie_figure(self, year: int, month: int) -> Figure:
+        # 集計データが空、または合計が0の場合のハンドリング
+        # 描画エラーを避けるため、ダミーの1スライスで "No Data" を描画する
+        labels = ["No Data"]
+        sizes = [1] # ダミー
+        colors = ["#e2e8f0"] # Gray
+
+        fig = Figure(figsize=(12, 10)) # サイズを拡大
+        ax = fig.subplots()
 
-        fig, ax = plt.subplots(figsize=(12, 10)) # サイズを拡大
-        
         # パイチャートの描画設定の改善
         wedges, texts, autotexts = ax.pie(
             sizes,
             autopct='%1.1f%%',
-            startangle=140, 
+            startangle=140,
             colors=colors,
             pctdistance=0.75,
             textprops={'fontsize': 18, 'fontweight': 'bold'}
@@ -137,13 +232,226 @@ class ChartRenderer:
                   fontsize=14)
 
         ax.set_title(f"Total incidents and SRs - {year}/{month:02d}", fontsize=28, fontweight='bold', pad=40)
-        ax.axis('equal') 
+        ax.axis('equal')
 
         # レイアウトの微調整（凡例が下で切れないように）
-        plt.subplots_adjust(left=0.1, right=0.9, top=0.85, bottom=0.2)
+        fig.subplots_adjust(left=0.1, right=0.9, top=0.85, bottom=0.2)
+        return fig
+
+    def annual_summary_png(self, data: Dict[str, Any], year: int) -> bytes:
+        """
+        年間サマリーの積み上げ棒グラフ（PNG バイト列）。ファイルを介さないため、
+        同じ年を同時に描画するリクエストとも混ざらない（PDF への埋め込み用）。
+        """
+        with span("chart.annual", year=year) as timing:
+            png = self._png(self._annual_figure(self.build_annual_series(data), year))
+            timing["bytes"] = len(png)
+        return png
 
+    def monthly_pie_png(self, pivot_data: Dict[str, Any], year: int, month: int) -> bytes:
+        """月間のカテゴリ配分を示すパイチャート（PNG バイト列。PDF への埋め込み用）"""
+        with span("chart.pie", year=year, month=month) as timing:
+            png = self._pie_png(self.build_pie_slices(pivot_data), year, month)
+            timing["bytes"] = len(png)
+        return png
+
+    def render_annual_summary(self, data: Dict[str, Any], year: int) -> str:
+        """
+        年間サマリーの積み上げ棒グラフを生成する。
+        常に1月〜12月の全ての月を表示し、データがある月のみ棒グラフを描画。
+        ファイルは丸ごと置き換える（読み手が書きかけのファイルを見ることはない）。
+        """
+        annual = self.build_annual_series(data)
+        output_path = os.path.join(self.output_dir, f"annual_summary_{year}.png")
+        digest = self._digest("annual", annual, year)
+        if self._reusable(output_path, digest):
+            return output_path
+
+        with span("chart.annual", year=year) as timing:
+            png = self._png(self._annual_figure(annual, year))
+            atomic_write(output_path, png)
+            timing["bytes"] = len(png)
+        self._register(output_path, digest)
+        
+        return output_path
+
+    def render_monthly_pie(self, pivot_data: Dict[str, Any], year: int, month: int) -> str:
+        """
+        月間のカテゴリ配分を示すパイチャートを生成する。
+        """
+        slices = self.build_pie_slices(pivot_data)
         output_path = os.path.join(self.output_dir, f"monthly_pie_{year}_{month:02d}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight') # 余白を自動調整して保存
-        plt.close()
+        digest = self._digest("pie", slices, year, month)
+        if self._reusable(output_path, digest):
+            return output_path
+
+        with span("chart.pie", year=year, month=month) as timing:
+            png = self._pie_png(slices, year, month)
+            atomic_write(output_path, png)
+            timing["bytes"] = len(png)
+        self._register(output_path, digest)
 
         return output_path
+
+    def render_year(
+        self,
+        monthly_pivots: Dict[int, Dict[str, Any]],
+        annual_summary: Dict[str, Any],
+        year: int,
+        processes: int = 1
+    ) -> Dict[str, Any]:
+        """
+        1年分のパイチャートと年間サマリーを一括生成する（月末締めの事前生成用）。
+        パイチャートは1つの図テンプレートを使い回し、月ごとにアーティストのデータのみ更新する。
+        processes > 1 の場合は月をプロセスに分散して描画する（CPU コア数を上限とする）。
+        同じ入力から描画済みの月（render_monthly_pie と同じ digest）は描画し直さない。
+        """
+        # 全月で共通のカテゴリ順（各月のスライスはこの順の部分列になるため、単月の描画と同じ並びになる）
+        labels = self.order_pie_labels(
+            s["label"] for pivot_data in monthly_pivots.values() for s in self.build_pie_slices(pivot_data)
+        )
+
+        pies = {}
+        digests = {}
+        items = []
+        for month, pivot_data in sorted(monthly_pivots.items()):
+            digests[month] = self._digest("pie", self.build_pie_slices(pivot_data), year, month)
+            output_path = os.path.join(self.output_dir, f"monthly_pie_{year}_{month:02d}.png")
+            if self._reusable(output_path, digests[month]):
+                pies[month] = output_path
+            else:
+                items.append((month, pivot_data))
+
+        # クライアント指定の値なのでコア数で頭打ちにする（超えても速くならず、プロセスが増えるだけ）
+        processes = max(1, min(processes, os.cpu_count() or 1))
+        chunks = [items]
+        if processes > 1 and len(items) > 1:
+            size = math.ceil(len(items) / processes)
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+
+        rendered = {}
+        if len(chunks) == 1:
+            if items:
+                rendered.update(_render_pie_batch(self.output_dir, labels, year, items))
+        else:
+            # fork はスレッド（uvicorn のスレッドプール等）が持つロックごと複製するため spawn で起動する
+            with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context("spawn")) as executor:
+                for result in executor.map(_render_pie_batch, [self.output_dir] * len(chunks), [labels] * len(chunks), [year] * len(chunks), chunks):
+                    rendered.update(result)
+
+        # 子プロセスではストアを持たないため、親プロセスでまとめて登録する
+        for month, path in rendered.items():
+            self._register(path, digests[month])
+        pies.update(rendered)
+
+        return {
+            "year": year,
+            "pies": dict(sorted(pies.items())),
+            "annual": self.render_annual_summary(annual_summary, year)
+        }
+
+
+class _PieTemplate:
+    """
+    月次パイチャート用の再利用可能な図テンプレート。
+    図・凡例スタイル・フォントは1回だけ構築し、月ごとにウェッジの角度とラベルのみ更新する。
+    """
+
+    START_ANGLE = 140
+    PCT_DISTANCE = 0.75
+
+    def __init__(self, labels: List[str]):
+        self.labels = labels
+        self.fig = Figure(figsize=(12, 10))
+        self.ax = self.fig.subplots()
+        colors = [ChartRenderer.CATEGORY_COLORS.get(label, "#808080") for label in labels]
+
+        # 全カテゴリ分のウェッジを一度だけ生成（値はダミー）
+        self.wedges, _, self.autotexts = self.ax.pie(
+            [1] * len(labels),
+            autopct='%1.1f%%',
+            startangle=self.START_ANGLE,
+            colors=colors,
+            pctdistance=self.PCT_DISTANCE,
+            textprops={'fontsize': 18, 'fontweight': 'bold'}
+        )
+        for autotext in self.autotexts:
+            autotext.set_color('white')
+            autotext.set_fontsize(24)
+
+        self.title = self.ax.set_title("", fontsize=28, fontweight='bold', pad=40)
+        self.legend = None
+        # 表示範囲はダミーのウェッジ（カテゴリ数）に依らず固定する（単月・一括で同じ図になる）
+        self.ax.set_xlim(-1.1, 1.1)
+        self.ax.set_ylim(-1.1, 1.1)
+        self.ax.set_aspect('equal', adjustable='box')
+        self.fig.subplots_adjust(left=0.1, right=0.9, top=0.85, bottom=0.2)
+
+    def update(self, slices: List[Dict[str, Any]], year: int, month: int):
+        """ウェッジ角度・パーセント表示・凡例・タイトルを当月の値に更新する。"""
+        values = {s["label"]: s["value"] for s in slices}
+        total = sum(values.values())
+
+        # ax.pie と同じ角度計算（反時計回り、START_ANGLE 起点）
+        theta1 = self.START_ANGLE / 360.0
+        for label, wedge, autotext in zip(self.labels, self.wedges, self.autotexts):
+            frac = values.get(label, 0) / total
+            visible = frac > 0
+            wedge.set_visible(visible)
+            autotext.set_visible(visible)
+            if not visible:
+                continue
+
+            theta2 = theta1 + frac
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+
+            thetam = 2 * np.pi * 0.5 * (theta1 + theta2)
+            autotext.set_position((self.PCT_DISTANCE * np.cos(thetam), self.PCT_DISTANCE * np.sin(thetam)))
+            autotext.set_text(f"{frac * 100:.1f}%")
+            theta1 = theta2
+
+        # 凡例は当月に存在するカテゴリのみ
+        if self.legend is not None:
+            self.legend.remove()
+        shown = [(w, label) for w, label in zip(self.wedges, self.labels) if values.get(label, 0) > 0]
+        self.legend = self.ax.legend([w for w, _ in shown], [label for _, label in shown],
+                                     title="Categories",
+                                     title_fontsize=16,
+                                     loc="upper center",
+                                     bbox_to_anchor=(0.5, -0.05),
+                                     ncol=min(len(shown), 3),
+                                     fontsize=14)
+
+        self.title.set_text(f"Total incidents and SRs - {year}/{month:02d}")
+
+    def save(self, output_path: str):
+        atomic_write(output_path, ChartRenderer._png(self.fig))
+
+    def close(self):
+        # pyplot に登録していない図は参照が無くなれば解放される
+        self.fig.clear()
+
+
+def _render_pie_batch(output_dir: str, labels: List[str], year: int, items: List[Any]) -> Dict[int, str]:
+    """
+    指定月リストのパイチャートを1つのテンプレートで描画する（プロセスプールからも呼ばれる）。
+    """
+    renderer = ChartRenderer(output_dir=output_dir)
+    template: Optional[_PieTemplate] = _PieTemplate(labels) if labels else None
+    paths = {}
+    try:
+        for month, pivot_data in items:
+            slices = renderer.build_pie_slices(pivot_data)
+            if not slices or template is None:
+                # データなし月は従来の単発描画（"No Data"）にフォールバック
+                paths[month] = renderer.render_monthly_pie(pivot_data, year, month)
+                continue
+            template.update(slices, year, month)
+            output_path = os.path.join(output_dir, f"monthly_pie_{year}_{month:02d}.png")
+            template.save(output_path)
+            paths[month] = output_path
+    finally:
+        if template is not None:
+            template.close()
+    return paths
@@ -0,0 +1,227 @@
+"""
+Data Repository
+
+SLA Breach / Development Efforts データの保存先を抽象化するリポジトリ。
+既定のバックエンドは SQLite（data/report_data.db）。初回起動時に data/*.json から一度だけ取り込む。
+環境変数 DATA_BACKEND=json で JSON ファイル保存に切り替えられる
+（SLA Breach はスナップショット data/sla_breach_data.json + ジャーナル data/sla_breach_journal.jsonl）。
+
+月キーは "YYYY-MM"。
+
+SLA Breach の変更は追記専用のジャーナル（add / update / delete の記録）として保存し、
+現在の一覧はジャーナルを適用した結果（マテリアライズドビュー）として持つ。
+id は月ごとに採番し、削除しても振り直さない（画面の id がずれない・変更履歴を監査できる）。
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+SLA_DATA_FILE = DATA_DIR / "sla_breach_data.json"
+SLA_JOURNAL_FILE = DATA_DIR / "sla_breach_journal.jsonl"
+DEV_EFFORTS_FILE = DATA_DIR / "dev_efforts_data.json"
+DATA_DB_FILE = DATA_DIR / "report_data.db"
+
+# SLA Breach の項目（JSON の並び順どおり）
+SLA_FIELDS = ("id", "ticket_no", "requested_for", "description", "percentage", "elapsed_time", "remarks", "created_at")
+DEV_EFFORTS_FIELDS = ("me_hours", "sow_planned", "carry_forward", "last_updated")
+
+# ジャーナルの操作種別
+SLA_ADD, SLA_UPDATE, SLA_DELETE = "add", "update", "delete"
+
+
+def get_month_key(year: int, month: int) -> str:
+    """月キー生成"""
+    return f"{year}-{str(month).zfill(2)}"
+
+
+def _breach_record(breach: Dict[str, Any], breach_id: int, created_at: Optional[str]) -> Dict[str, Any]:
+    record = {field: breach.get(field) for field in SLA_FIELDS}
+    record["id"] = breach_id
+    record["created_at"] = breach.get("created_at") or created_at
+    return record
+
+
+def plan_month_save(current: Dict[int, Dict[str, Any]], next_id: int, breaches: List[Dict[str, Any]],
+                    updated_at: str) -> List[Dict[str, Any]]:
+    """
+    月の一覧の保存をジャーナルの変更に変換する（変更の無い Breach は記録しない）。
+    current: 現在の id → Breach、next_id: 次に採番する id。
+    既存の id を持つ Breach は update、id が無い（または不明な）ものは add、一覧に無い既存の id は delete。
+    戻り値の add / update / 変更なしの Breach は引数の並び順（delete は末尾）。
+    """
+    changes = []
+    kept = set()
+    for breach in breaches:
+        breach_id = breach.get("id")
+        if breach_id in current and breach_id not in kept:
+            kept.add(breach_id)
+            record = _breach_record(breach, breach_id, current[breach_id].get("created_at"))
+            op = SLA_UPDATE if record != current[breach_id] else None
+        else:
+            record = _breach_record(breach, next_id, updated_at)
+            op = SLA_ADD
+            next_id += 1
+        changes.append({"op": op, "id": record["id"], "breach": record})
+    for breach_id in current:
+        if breach_id not in kept:
+            changes.append({"op": SLA_DELETE, "id": breach_id, "breach": None})
+    return changes
+
+
+class SlaRepository(ABC):
+    """
+    月別SLA Breachデータのリポジトリ。
+    実装は _change() だけを持ち、月の現在の状態から変更（ジャーナルの記録）を作る関数を
+    排他制御の中で実行して、変更を追記・一覧に反映する。
+    """
+
+    @abstractmethod
+    def get_month(self, year: int, month: int) -> List[Dict[str, Any]]:
+        """指定月のBreach一覧（id順）。データが無ければ空リスト。"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _change(self, year: int, month: int, updated_at: str,
+                plan: Callable[[Optional[Dict[int, Dict[str, Any]]], int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        plan(現在の id → Breach（月データが無ければ None）, 次の id) が返す変更のうち
+        op が None でないものをジャーナルに追記して一覧に反映し、plan の戻り値を返す。
+        変更が無ければ何も書き込まない。
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def history(self, year: int, month: int) -> List[Dict[str, Any]]:
+        """指定月のジャーナル（古い順。{seq, op, id, breach, at}）"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def all_months(self) -> Dict[str, Dict[str, Any]]:
+        """全月データ（月キー → {year, month, breaches, updated_at}）"""
+        raise NotImplementedError
+
+    def save_month(self, year: int, month: int, breaches: List[Dict[str, Any]], updated_at: str) -> List[Dict[str, Any]]:
+        """指定月の一覧を保存し、保存後の Breach（引数の並び順・id 付き）を返す。"""
+        changes = self._change(
+            year, month, updated_at, lambda current, next_id: plan_month_save(current or {}, next_id, breaches, updated_at)
+        )
+        return [change["breach"] for change in changes if change["op"] != SLA_DELETE]
+
+    def add_breach(self, year: int, month: int, breach: Dict[str, Any], updated_at: str) -> Dict[str, Any]:
+        """Breachを1件追加し、採番した id 付きで返す。"""
+        def plan(current, next_id):
+            return [{"op": SLA_ADD, "id": next_id, "breach": _breach_record(breach, next_id, updated_at)}]
+
+        return self._change(year, month, updated_at, plan)[0]["breach"]
+
+    def update_breach(self, year: int, month: int, breach_id: int, breach: Dict[str, Any],
+                      updated_at: str) -> Optional[Dict[str, Any]]:
+        """Breachを1件更新して返す。該当が無ければ None。"""
+        def plan(current, next_id):
+            if not current or breach_id not in current:
+                return []
+            record = _breach_record(breach, breach_id, current[breach_id].get("created_at"))
+            return [{"op": SLA_UPDATE if record != current[breach_id] else None, "id": breach_id, "breach": record}]
+
+        changes = self._change(year, month, updated_at, plan)
+        return changes[0]["breach"] if changes else None
+
+    def delete_breach(self, year: int, month: int, breach_id: int, updated_at: str) -> Optional[bool]:
+        """Breachを削除する（他の id は変わらない）。月データが無ければ None、Breachが無ければ False。"""
+        month_exists = []
+
+        def plan(current, next_id):
+            month_exists.append(current is not None)
+            if current is None or breach_id not in current:
+                return []
+            return [{"op": SLA_DELETE, "id": breach_id, "breach": None}]
+
+        changes = self._change(year, month, updated_at, plan)
+        if not month_exists[-1]:
+            return None
+        return bool(changes)
+
+
+class DevEffortsRepository(ABC):
+    """月別Development Effortsデータのリポジトリ"""
+
+    @abstractmethod
+    def get(self, month_key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, month_key: str, record: Dict[str, Any]):
+        """1か月分を追加・更新する（record は DEV_EFFORTS_FIELDS）。"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, month_key: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_year(self, year: int) -> Dict[int, Dict[str, Any]]:
+        """指定年の月（1-12） → データ。データの無い月は含まない。"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def all_months(self) -> Dict[str, Dict[str, Any]]:
+        raise NotImplementedError
+
+
+_repositories: Dict[str, Any] = {}
+_repositories_lock = threading.Lock()
+
+
+def _create_repositories() -> Dict[str, Any]:
+    backend = os.environ.get("DATA_BACKEND", "sqlite")
+    if backend == "json":
+        from app.infra.json_store import JsonDevEffortsRepository
+        from app.infra.sla_journal import JournalSlaRepository
+        return {
+            "sla": JournalSlaRepository(Path(os.environ.get("SLA_DATA_FILE", SLA_DATA_FILE)),
+                                        Path(os.environ.get("SLA_JOURNAL_FILE", SLA_JOURNAL_FILE))),
+            "dev_efforts": JsonDevEffortsRepository(Path(os.environ.get("DEV_EFFORTS_FILE", DEV_EFFORTS_FILE))),
+        }
+    if backend == "sqlite":
+        from app.infra.sqlite_store import SqliteStore, SqliteSlaRepository, SqliteDevEffortsRepository, import_json_data
+        store = SqliteStore(Path(os.environ.get("DATA_DB_PATH", DATA_DB_FILE)))
+        import_json_data(store, SLA_DATA_FILE, DEV_EFFORTS_FILE)
+        return {"sla": SqliteSlaRepository(store), "dev_efforts": SqliteDevEffortsRepository(store)}
+    raise ValueError(f"Unknown DATA_BACKEND: {backend}")
+
+
+def _get(name: str):
+    with _repositories_lock:
+        if not _repositories:
+            _repositories.update(_create_repositories())
+        return _repositories[name]
+
+
+def get_sla_repository() -> SlaRepository:
+    return _get("sla")
+
+
+def get_dev_efforts_repository() -> DevEffortsRepository:
+    return _get("dev_efforts")
+
+
+def get_monthly_context(year: int, month: int) -> Dict[str, Any]:
+    """
+    月報に添えるデータ一式（画面の状態表示・PDF生成・プレビュー・/monthly/* で共通）。
+    指定月のSLA Breach、指定年のDevelopment Efforts（月 → データ）と、指定月のデータ有無。
+    """
+    sla_breaches = get_sla_repository().get_month(year, month)
+    dev_efforts = get_dev_efforts_repository().get_year(year)
+    current = dev_efforts.get(month)
+    return {
+        "year": year,
+        "month": month,
+        "month_key": get_month_key(year, month),
+        "sla_breaches": sla_breaches,
+        "dev_efforts": dev_efforts,
+        "has_sla_data": len(sla_breaches) > 0,
+        "has_dev_efforts_data": current is not None and current.get("me_hours") is not None,
+    }
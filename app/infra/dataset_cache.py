@@ -0,0 +1,203 @@
+"""
+Dataset Cache
+
+アップロードされたワークブックのパース結果（シート名 → DataFrame）をワークブックのハッシュをキーに保存し、
+同じワークブックの再アップロードでは Excel のパースを省略する。
+保存先は cache/datasets（ワーカープロセス間で共有。容量上限・TTL・インデックスは ArtifactStore に従う）。
+
+形式は Parquet（シートごとに 1 ファイル。pyarrow が必要）。読み込むワーカーごとに DataFrame を作り直す。
+- 列名は位置（c0, c1, ...）で保存し、元の列名（重複・文字列以外を含む）はマニフェストに持つ
+- 型の混在した object 列（Excel の Remarks など）は値ごとに型付きの JSON 文字列にして保存する
+- どちらにも変換できない値を含むデータセットは保存しない（pickle などの任意のオブジェクトは読み込まない）
+"""
+import datetime
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from app.infra.artifact_store import ArtifactStore, DEFAULT_TTL_SECONDS
+from app.infra.metrics import record_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "datasets"
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024  # 500 MB
+FORMAT = "parquet-2"
+
+
+def _encode_value(value: Any) -> Any:
+    """型の混在した列の値 → JSON（型を区別できるようにタグを付ける）"""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if value is pd.NaT:
+        return {"$nat": True}
+    if isinstance(value, pd.Timestamp):
+        return {"$ts": value.isoformat()}
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"$t": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {"$td": value.total_seconds()}
+    raise TypeError(f"{type(value).__name__} values cannot be stored in the dataset cache")
+
+
+def _decode_value(value: Any) -> Any:
+    import pandas as pd
+
+    if not isinstance(value, dict):
+        return value
+    tag, text = next(iter(value.items()))
+    if tag == "$nat":
+        return pd.NaT
+    if tag == "$ts":
+        return pd.Timestamp(text)
+    if tag == "$dt":
+        return datetime.datetime.fromisoformat(text)
+    if tag == "$d":
+        return datetime.date.fromisoformat(text)
+    if tag == "$t":
+        return datetime.time.fromisoformat(text)
+    if tag == "$td":
+        return datetime.timedelta(seconds=text)
+    raise ValueError(f"Unknown value tag: {tag}")
+
+
+def _mixed_columns(df: "pd.DataFrame") -> List[int]:
+    """Parquet（Arrow）の型にならない object 列の位置"""
+    import pyarrow as pa
+
+    mixed = []
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if column.dtype != object:
+            continue
+        try:
+            pa.array(column, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            mixed.append(i)
+    return mixed
+
+
+def _to_parquet(df: "pd.DataFrame", path: str) -> Dict[str, Any]:
+    """df を path に保存し、読み戻しに必要な情報（マニフェストのシート項目）を返す。"""
+    import pandas as pd
+
+    columns = [_encode_value(c) for c in df.columns]
+    mixed = _mixed_columns(df)
+    table = df.copy(deep=False)
+    table.columns = [f"c{i}" for i in range(df.shape[1])]
+    for i in mixed:
+        table[f"c{i}"] = [json.dumps(_encode_value(None if v is pd.NA else v)) for v in df.iloc[:, i]]
+    table.to_parquet(path)
+    return {"columns": columns, "json_columns": mixed}
+
+
+def _read_parquet(path: str, sheet: Dict[str, Any]) -> "pd.DataFrame":
+    import pandas as pd
+
+    df = pd.read_parquet(path, memory_map=True)
+    for i in sheet["json_columns"]:
+        df[f"c{i}"] = pd.Series([_decode_value(json.loads(v)) for v in df[f"c{i}"]], index=df.index, dtype=object)
+    df.columns = [_decode_value(c) for c in sheet["columns"]]
+    return df
+
+
+class DatasetCache:
+    """
+    キー → {シート名: DataFrame} のキャッシュ。
+    マニフェスト（<key>.json）を最後に登録するため、マニフェストがあればデータファイルは書き込み済み。
+    """
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+
+    def _write(self, name: str, write: Callable[[str], Any]) -> Any:
+        path = os.path.join(self.store.root_dir, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            result = write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.store.register(path)
+        return result
+
+    def get(self, key: str) -> Optional[Dict[str, "pd.DataFrame"]]:
+        frames = self._read(key)
+        record_cache("dataset", frames is not None)
+        return frames
+
+    def _read(self, key: str) -> Optional[Dict[str, "pd.DataFrame"]]:
+        manifest_path = self.store.lookup(f"{key}.json")
+        if manifest_path is None:
+            return None
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != FORMAT:
+                # 旧形式（pickle を含む）は読み込まずに作り直す
+                return None
+            paths = {}
+            for sheet in manifest["sheets"]:
+                path = self.store.lookup(sheet["file"])
+                if path is None:
+                    # 一部だけ削除された場合は作り直す
+                    return None
+                paths[sheet["file"]] = path
+            return {sheet["name"]: _read_parquet(paths[sheet["file"]], sheet) for sheet in manifest["sheets"]}
+        except Exception as e:
+            print(f"WARNING: dataset cache entry {key} could not be read ({e})")
+            return None
+
+    def put(self, key: str, frames: Dict[str, "pd.DataFrame"]):
+        """保存する。pyarrow が無い・保存できない値を含む場合は例外（何も登録しない）。"""
+        sheets = []
+        for i, (name, df) in enumerate(frames.items()):
+            file = f"{key}.{i}.parquet"
+            sheets.append({"name": name, "file": file, **self._write(file, lambda p, df=df: _to_parquet(df, p))})
+        manifest = json.dumps({"format": FORMAT, "sheets": sheets}, ensure_ascii=False)
+        self._write(f"{key}.json", lambda p: Path(p).write_text(manifest, encoding="utf-8"))
+
+    def get_or_load(self, key: str, loader: Callable[[], Dict[str, "pd.DataFrame"]]) -> Dict[str, "pd.DataFrame"]:
+        """キャッシュにあれば読み込み、無ければ loader() の結果を保存して返す。"""
+        frames = self.get(key)
+        if frames is None:
+            frames = loader()
+            try:
+                self.put(key, frames)
+            except Exception as e:
+                print(f"WARNING: dataset cache entry {key} could not be written ({e})")
+        return frames
+
+
+_dataset_cache: Optional[DatasetCache] = None
+_dataset_cache_lock = threading.Lock()
+
+
+def get_dataset_cache() -> DatasetCache:
+    """
+    共有データセットキャッシュ。保存先・容量上限・TTL は環境変数
+    DATASET_CACHE_DIR / DATASET_CACHE_MAX_BYTES / DATASET_CACHE_TTL_SECONDS で変更できる。
+    """
+    global _dataset_cache
+    with _dataset_cache_lock:
+        if _dataset_cache is None:
+            _dataset_cache = DatasetCache(ArtifactStore(
+                root_dir=os.environ.get("DATASET_CACHE_DIR", str(CACHE_DIR)),
+                max_bytes=int(os.environ.get("DATASET_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                ttl_seconds=float(os.environ.get("DATASET_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+            ))
+        return _dataset_cache
@@ -3,11 +3,16 @@ import openpyxl
 from openpyxl.styles import Font
 from copy import copy
 from datetime import date
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union, BinaryIO
+from app.infra.timing import span
 
-def load_excel_data(file_path: str) -> Dict[str, pd.DataFrame]:
-    """Pure I/O: Loads all sheets from an Excel file."""
-    return pd.read_excel(file_path, sheet_name=None)
+def load_excel_data(file_path: Union[str, BinaryIO]) -> Dict[str, pd.DataFrame]:
+    """Pure I/O: Loads all sheets from an Excel file (path or binary file-like object)."""
+    with span("excel.read") as timing:
+        sheets = pd.read_excel(file_path, sheet_name=None)
+        timing["sheets"] = len(sheets)
+        timing["rows"] = sum(len(df) for df in sheets.values())
+    return sheets
 
 def copy_cell_style(source_cell, target_cell):
     """Utility for Excel writing."""
@@ -20,14 +25,15 @@ def copy_cell_style(source_cell, target_cell):
         target_cell.alignment = copy(source_cell.alignment)
 
 def write_report_to_template(
-    template_path: str,
-    output_path: str,
+    template_path: Union[str, BinaryIO],
+    output_path: Union[str, BinaryIO],
     sections: List[Dict[str, Any]],
     summary_info: Dict[str, Any]
 ):
     """
     Pure I/O: Writes prepared data to an Excel template.
     Expects data already prepared by the service layer.
+    Template and output may be paths or binary file-like objects.
     """
     wb = openpyxl.load_workbook(template_path)
     ws = wb["IFS"] if "IFS" in wb.sheetnames else wb.active
@@ -48,16 +54,27 @@ def write_report_to_template(
                 break
 
     # 2. Section Writing
-    # Sections are passed as a list of dicts: {anchor: str, df: DataFrame, allowed_cols: list}
+    # Sections are passed as a list of dicts:
+    #   {anchor: str, df: DataFrame, allowed_cols: list} - written under the anchor's header row
+    #   {sheet: str, start_row: int, df: DataFrame}       - written column by column from column A
+    # A section may name its sheet ("IFS" otherwise); sheets missing from the template are skipped.
     for section in sections:
-        anchor = section['anchor']
         df = section['df']
-        allowed_cols = section.get('allowed_cols')
-        
+        sheet = section.get('sheet')
+        if sheet is not None and sheet not in wb.sheetnames:
+            continue
+        target = wb[sheet] if sheet is not None else ws
+
+        anchor = section.get('anchor')
+        if anchor is None:
+            col_map = {col_name: idx for idx, col_name in enumerate(df.columns, start=1)}
+            _write_df_to_ws(target, df, section['start_row'], col_map)
+            continue
+
         # Implementation of finding and writing to the section (moved from writer service)
-        header_row, col_map = _find_header_mapping(ws, anchor, allowed_cols)
+        header_row, col_map = _find_header_mapping(target, anchor, section.get('allowed_cols'))
         if header_row:
-             _write_df_to_ws(ws, df, header_row + 1, col_map)
+             _write_df_to_ws(target, df, header_row + 1, col_map)
 
     wb.save(output_path)
 
@@ -0,0 +1,238 @@
+"""
+Report Job Queue
+
+パース・集計・グラフ・PDF生成などの重い処理を、イベントループの外（上限付きのワーカースレッド）で実行する。
+POST でジョブを登録してジョブIDを返し、クライアントは状態をポーリングして結果をダウンロードする。
+完了したジョブの結果は TTL を過ぎると破棄される。TTL 内でも、完了ジョブの件数または
+保持している結果（PDF）のバイト数が上限を超えた場合は、完了の古いものから破棄する。
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_RESULT_TTL_SECONDS = 60 * 60  # 1 hour
+DEFAULT_MAX_FINISHED = 100
+DEFAULT_MAX_RESULT_BYTES = 256 * 1024 * 1024
+
+
+class JobQueueFull(Exception):
+    """未完了ジョブ数が上限に達している。"""
+
+
+class Job:
+    """
+    1件のレポートジョブ。
+    result は PDF のバイト列または JSON に変換可能な dict。
+    失敗時は error（メッセージ）と status_code（HTTPステータス）を保持する。
+    """
+
+    def __init__(self, kind: str, filename: Optional[str], media_type: str, created: float):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.media_type = media_type
+        self.status = QUEUED
+        self.created = created
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Any = None
+        self.result_bytes = 0
+        self.error: Any = None
+        self.status_code: Optional[int] = None
+        self.future = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    上限付きワーカープールで関数を実行するジョブキュー。
+    未完了（queued + running）のジョブが max_pending を超える登録は JobQueueFull で拒否する。
+    完了ジョブは max_finished 件・結果の合計 max_result_bytes バイト（bytes の結果のみ数える）まで保持する。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS,
+        max_finished: Optional[int] = DEFAULT_MAX_FINISHED,
+        max_result_bytes: Optional[int] = DEFAULT_MAX_RESULT_BYTES,
+        clock: Callable[[], float] = time.time
+    ):
+        self.max_pending = max_pending
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_finished = max_finished
+        self.max_result_bytes = max_result_bytes
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[], Any], filename: Optional[str] = None,
+               media_type: str = "application/json") -> Job:
+        """ジョブを登録する。fn は引数なしで呼ばれ、戻り値がジョブの結果になる。"""
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs ({pending})")
+            job = Job(kind, filename, media_type, self._clock())
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        """保持しているジョブの状態別の件数"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            self._purge_expired()
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        ジョブを取り消す。待機中なら実行されない。
+        実行中のスレッドは中断できないため、完了時に結果を破棄する。
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            if job.future is not None:
+                job.future.cancel()
+            job.status = CANCELLED
+            job.finished = self._clock()
+            self._evict_finished()
+            return job
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[[], Any]):
+        with self._lock:
+            if job.status == CANCELLED:
+                return
+            job.status = RUNNING
+            job.started = self._clock()
+
+        result, error, status_code = None, None, None
+        try:
+            result = fn()
+        except Exception as e:
+            # HTTPException 等は status_code / detail をそのまま引き継ぐ
+            status_code = getattr(e, "status_code", 500)
+            error = getattr(e, "detail", None) or str(e)
+
+        with self._lock:
+            if job.status == CANCELLED:
+                return
+            job.finished = self._clock()
+            if error is None:
+                job.status = DONE
+                job.result = result
+                job.result_bytes = len(result) if isinstance(result, (bytes, bytearray)) else 0
+            else:
+                job.status = FAILED
+                job.error = error
+                job.status_code = status_code
+            self._evict_finished()
+
+    def _purge_expired(self):
+        if self.result_ttl_seconds is None:
+            return
+        now = self._clock()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and now - job.finished > self.result_ttl_seconds:
+                del self._jobs[job_id]
+
+    def _evict_finished(self):
+        """完了ジョブの件数・結果のバイト数が上限以下になるまで、完了の古いものから破棄する。"""
+        finished = sorted((job for job in self._jobs.values() if job.status in FINISHED_STATES),
+                          key=lambda job: job.finished)
+        total_bytes = sum(job.result_bytes for job in finished)
+        while finished and (
+            (self.max_finished is not None and len(finished) > self.max_finished)
+            or (self.max_result_bytes is not None and total_bytes > self.max_result_bytes)
+        ):
+            job = finished.pop(0)
+            total_bytes -= job.result_bytes
+            del self._jobs[job.id]
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def jobs_api_enabled() -> bool:
+    """
+    /jobs のルートを公開するか（環境変数 JOBS_API=0 で無効）。
+    ジョブは登録を受けたワーカープロセスのメモリにしかないため、複数ワーカーで起動する場合は無効にする。
+    """
+    return os.environ.get("JOBS_API", "1") != "0"
+
+
+def get_job_queue() -> JobQueue:
+    """
+    共有ジョブキュー。ワーカー数・未完了ジョブの上限・結果の保持期間・保持する完了ジョブ数・
+    結果の合計バイト数は環境変数 JOB_WORKERS / JOB_MAX_PENDING / JOB_RESULT_TTL_SECONDS /
+    JOB_MAX_FINISHED / JOB_MAX_RESULT_BYTES で変更できる。
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(
+                max_workers=int(os.environ.get("JOB_WORKERS", DEFAULT_WORKERS)),
+                max_pending=int(os.environ.get("JOB_MAX_PENDING", DEFAULT_MAX_PENDING)),
+                result_ttl_seconds=float(os.environ.get("JOB_RESULT_TTL_SECONDS", DEFAULT_RESULT_TTL_SECONDS)),
+                max_finished=int(os.environ.get("JOB_MAX_FINISHED", DEFAULT_MAX_FINISHED)),
+                max_result_bytes=int(os.environ.get("JOB_MAX_RESULT_BYTES", DEFAULT_MAX_RESULT_BYTES))
+            )
+        return _job_queue
+
+
+def job_counts() -> Dict[str, int]:
+    """状態別のジョブ数（共有ジョブキューが未作成なら全て 0。メトリクス用）"""
+    counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED_STATES}
+    with _job_queue_lock:
+        queue = _job_queue
+    if queue is not None:
+        for status, n in queue.counts().items():
+            counts[status] = n
+    return counts
+
+
+def shutdown_job_queue():
+    """共有ジョブキューを停止する（待機中のジョブは破棄、実行中のジョブは各スレッドで完了する）。"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.shutdown(wait=False)
+            _job_queue = None
@@ -0,0 +1,188 @@
+"""
+JSON File Store
+
+Development Efforts データを従来どおり JSON ファイル（{"monthly_data": {...}}）に保存するバックエンド。
+DATA_BACKEND=json の場合に使用する（SLA Breach は app.infra.sla_journal）。
+
+読み込んだ内容はプロセス内で共有キャッシュし、ファイルの mtime / サイズが変わった場合のみ読み直す。
+
+保存はライトビハインド:
+- 変更（op）はすぐにメモリ上のデータへ反映し、未保存の op として記録する
+- flush_delay 秒以内の連続した保存は 1 回の書き込みにまとめる
+- 書き込み時はプロセス間ロックを取り、ディスク上の最新内容に未保存の op を適用し直してから
+  一時ファイル + rename でアトミックに置き換える（他プロセスの変更を上書きしない）
+"""
+import atexit
+import copy
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.infra.data_repository import DevEffortsRepository, get_month_key
+from app.infra.file_lock import FileLock, atomic_write
+
+DEFAULT_FLUSH_DELAY = 0.2  # seconds
+
+
+def _empty() -> dict:
+    return {"monthly_data": {}}
+
+
+class JsonFile:
+    """
+    {"monthly_data": {...}} 形式の JSON ファイル（パスごとにプロセスで 1 インスタンス: get_json_file()）。
+    read() はロック内でデータを参照する関数を、update() は変更する関数（op）を受け取る。
+    """
+
+    def __init__(self, path: Path, flush_delay: float = DEFAULT_FLUSH_DELAY):
+        self.path = Path(path)
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{self.path}.lock")
+        self._signature: Optional[Tuple[int, int]] = None
+        self._base: dict = _empty()     # ディスク上の内容
+        self._view: dict = _empty()     # _base + 未保存の op
+        self._pending: List[Callable[[dict], Any]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    # ---- disk ----
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_disk(self) -> dict:
+        if not self.path.exists():
+            return _empty()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data.setdefault("monthly_data", {})
+            return data
+        except Exception as e:
+            # 壊れたファイルを空データで上書きしないよう退避し、最後に読めた内容で続行する
+            backup = f"{self.path}.corrupt-{int(time.time())}"
+            shutil.copyfile(self.path, backup)
+            print(f"WARNING: {self.path} could not be parsed ({e}); copied to {backup}")
+            return copy.deepcopy(self._base)
+
+    def _refresh(self):
+        """ファイルの mtime / サイズが変わっていれば読み直し、未保存の op を適用し直す。"""
+        signature = self._stat()
+        if signature is not None and signature == self._signature:
+            return
+        self._base = self._read_disk()
+        self._signature = signature
+        self._view = copy.deepcopy(self._base)
+        for op in self._pending:
+            op(self._view)
+
+    # ---- public API ----
+
+    def read(self, fn: Callable[[dict], Any]) -> Any:
+        """fn(data) の結果を返す（ロック内で実行。data は変更しないこと、返す値はコピーすること）。"""
+        with self._lock:
+            self._refresh()
+            return fn(self._view)
+
+    def update(self, op: Callable[[dict], Any], changed: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        op(data) をメモリ上のデータに適用し、書き込みを予約する。op の戻り値を返す。
+        op は書き込み時にディスク上の最新内容へ再適用されるため、引数以外の状態を変更しないこと。
+        changed(戻り値) が False の場合（op が何も変更しなかった場合）は書き込みを予約しない。
+        """
+        with self._lock:
+            self._refresh()
+            result = op(self._view)
+            if changed is not None and not changed(result):
+                return result
+            self._pending.append(op)
+            if self.flush_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return result
+
+    def flush(self):
+        """未保存の op をディスクに書き込む。"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock:
+                # 他プロセスの変更を取り込んでから op を適用する
+                base = self._read_disk() if self._stat() != self._signature else self._base
+                base = copy.deepcopy(base)
+                for op in self._pending:
+                    op(base)
+                atomic_write(str(self.path), json.dumps(base, ensure_ascii=False, indent=2).encode("utf-8"))
+                self._signature = self._stat()
+            self._base = base
+            self._view = copy.deepcopy(base)
+            self._pending = []
+
+
+_files: Dict[str, JsonFile] = {}
+_files_lock = threading.Lock()
+
+
+def get_json_file(path: Path) -> JsonFile:
+    """パスごとに共有される JsonFile（書き込み待ちの遅延時間は JSON_FLUSH_DELAY で変更できる）"""
+    key = str(Path(path).resolve())
+    with _files_lock:
+        if key not in _files:
+            _files[key] = JsonFile(Path(path), float(os.environ.get("JSON_FLUSH_DELAY", DEFAULT_FLUSH_DELAY)))
+        return _files[key]
+
+
+@atexit.register
+def flush_all():
+    """未保存の変更をすべて書き込む（終了時）"""
+    with _files_lock:
+        files = list(_files.values())
+    for json_file in files:
+        json_file.flush()
+
+
+class JsonDevEffortsRepository(DevEffortsRepository):
+
+    def __init__(self, path: Path):
+        self.file = get_json_file(path)
+
+    def get(self, month_key: str) -> Optional[Dict[str, Any]]:
+        return self.file.read(lambda data: copy.deepcopy(data["monthly_data"].get(month_key)))
+
+    def save(self, month_key: str, record: Dict[str, Any]):
+        def op(data):
+            data["monthly_data"][month_key] = dict(record)
+
+        self.file.update(op)
+
+    def delete(self, month_key: str) -> bool:
+        def op(data):
+            return data["monthly_data"].pop(month_key, None) is not None
+
+        return self.file.update(op, changed=bool)
+
+    def get_year(self, year: int) -> Dict[int, Dict[str, Any]]:
+        def select(data):
+            monthly_data = data["monthly_data"]
+            return {m: dict(monthly_data[get_month_key(year, m)]) for m in range(1, 13)
+                    if get_month_key(year, m) in monthly_data}
+
+        return self.file.read(select)
+
+    def all_months(self) -> Dict[str, Dict[str, Any]]:
+        return self.file.read(lambda data: copy.deepcopy(data["monthly_data"]))
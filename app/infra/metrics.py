@@ -0,0 +1,229 @@
+"""
+Metrics
+
+Prometheus のテキスト形式（version 0.0.4）で公開するプロセス内メトリクス。外部サービス・追加パッケージは不要。
+
+- http_request_duration_seconds{method, route, status}: ルート（パステンプレート）ごとのレイテンシ
+- http_requests_in_flight: 処理中のリクエスト数
+- report_stage_duration_seconds{stage}: timing のスパン（parse / aggregate / chart / pdf / pdf.build など）の所要時間
+- report_stage_wait_seconds{stage}: 段階の実行枠（stage_executor の上限）の待ち時間
+- cache_requests_total{cache, result} / cache_hit_ratio{cache}: pdf / dataset / chart キャッシュのヒット率
+- report_jobs{status}: ジョブキューの状態別ジョブ数
+- process_resident_memory_bytes / process_cpu_seconds_total
+
+値はワーカープロセスごと（run_api.py --workers N では各ワーカーが自分の値を返す）。
+STAGE_EXECUTOR=process の場合、ワーカープロセス内のスパンは呼び出し元に返されて集計されるが、
+ワーカープロセス内のキャッシュヒットは集計されない。
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒。軽い API（/api/*）から PDF 生成（数十秒）までを区別できる幅
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [バケットごとの件数（累積前）, 合計, 件数]
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(s[0]), s[1], s[2]) for key, s in sorted(self._series.items())]
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+def _gauge(name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f"{name}{_format_labels(key)} {_format_value(value)}" for key, value in samples)
+    return lines
+
+
+request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route.")
+stage_duration = Histogram("report_stage_duration_seconds", "Duration of report pipeline stages.")
+stage_wait = Histogram("report_stage_wait_seconds", "Time spent waiting for a stage concurrency slot.")
+cache_requests = Counter("cache_requests_total", "Cache lookups by cache and result (hit / miss).")
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def observe_span(name: str, duration_ms: float, fields: dict):
+    """timing のスパン 1 件を段階のヒストグラムに記録する。"""
+    stage_duration.observe(duration_ms / 1000, stage=name)
+    wait_ms = fields.get("wait_ms")
+    if wait_ms is not None:
+        stage_wait.observe(wait_ms / 1000, stage=name)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _cache_hit_ratios() -> List[Tuple[Labels, float]]:
+    totals: Dict[str, List[float]] = {}
+    for key, value in cache_requests.values().items():
+        labels = dict(key)
+        hits_and_total = totals.setdefault(labels["cache"], [0.0, 0.0])
+        if labels["result"] == "hit":
+            hits_and_total[0] += value
+        hits_and_total[1] += value
+    return [((("cache", cache),), hits / total) for cache, (hits, total) in sorted(totals.items()) if total]
+
+
+def _resident_memory_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        # Windows: 取得しない
+        return None
+    # /proc が無い環境（macOS 等）はピーク値で代用（macOS はバイト、それ以外は KB 単位）
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _job_samples() -> List[Tuple[Labels, float]]:
+    from app.infra.job_queue import job_counts
+    return [((("status", status),), n) for status, n in sorted(job_counts().items())]
+
+
+def render() -> str:
+    """全メトリクスのテキスト表現"""
+    times = os.times()
+    with _in_flight_lock:
+        in_flight = _in_flight
+    lines: List[str] = []
+    lines += request_duration.expose()
+    lines += _gauge("http_requests_in_flight", "HTTP requests currently being served.", [((), in_flight)])
+    lines += stage_duration.expose()
+    lines += stage_wait.expose()
+    lines += cache_requests.expose()
+    lines += _gauge("cache_hit_ratio", "Cache hits / lookups since start.", _cache_hit_ratios())
+    lines += _gauge("report_jobs", "Report jobs by status.", _job_samples())
+    rss = _resident_memory_bytes()
+    lines += _gauge("process_resident_memory_bytes", "Resident memory size in bytes.", [((), rss)] if rss is not None else [])
+    lines += _gauge("process_cpu_seconds_total", "User and system CPU time in seconds.", [((), times.user + times.system)])
+    return "\n".join(lines) + "\n"
+
+
+def _route_label(scope) -> str:
+    """
+    パステンプレート（/monthly/context/{year}/{month} 等）。マウント（/static）はマウント先のパス、
+    どのルートにも一致しなかった場合は unmatched（404 の URL ごとに系列が増えないように）。
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", None) or "unmatched"
+    mounted = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+    return mounted or "unmatched"
+
+
+class MetricsMiddleware:
+    """リクエストのレイテンシ（ルート・メソッド・ステータス別）と処理中のリクエスト数を記録する ASGI ミドルウェア。"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        with _in_flight_lock:
+            _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            with _in_flight_lock:
+                _in_flight -= 1
+            request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"], route=_route_label(scope), status=str(status["code"])
+            )
@@ -0,0 +1,186 @@
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, KeepTogether, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from functools import lru_cache
+from typing import Optional
+import io
+from app.infra.file_lock import atomic_write
+from app.infra.timing import span
+
+# Part of the PDF cache key: bump when the monthly PDF layout changes
+RENDERER_VERSION = "2"
+
+# 出力プロファイル
+# standard: 300dpi のグラフPNGをそのまま埋め込む（従来どおり）
+# compact : メール配布向け。グラフを表示サイズ × image_dpi に縮小し JPEG で埋め込む
+PDF_PROFILES = {
+    "standard": {"page_compression": 1, "image_dpi": None, "jpeg_quality": None},
+    "compact": {"page_compression": 1, "image_dpi": 150, "jpeg_quality": 85},
+}
+DEFAULT_PROFILE = "standard"
+
+ANNUAL_COL_WIDTHS = [1.5 * inch] + [0.45 * inch] * 12
+PIVOT_COL_WIDTHS = [1.2 * inch, 2.0 * inch, 0.9 * inch, 0.9 * inch, 0.8 * inch, 0.8 * inch]
+SLA_COL_WIDTHS = [1.0 * inch, 1.0 * inch, 1.0 * inch, 0.7 * inch, 1.8 * inch, 2.8 * inch]
+DEV_COL_WIDTHS = [1.0 * inch] + [0.55 * inch] * 13
+
+
+def _table_style(*extra):
+    """Light-blue header theme shared by every monthly table, plus table-specific commands."""
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#bfdbfe")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#1e3a5f")),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ] + list(extra))
+
+
+@lru_cache(maxsize=None)
+def get_monthly_styles() -> dict:
+    """
+    Paragraph and table styles for the monthly report.
+    Built once per process; they are read-only during rendering.
+    """
+    return {
+        "sheet": getSampleStyleSheet(),
+        "annual": _table_style(
+            ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ),
+        "pivot": _table_style(
+            ("ALIGN", (2, 1), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ),
+        "sla": _table_style(
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("WORDWRAP", (0, 0), (-1, -1), True),
+        ),
+        "dev": _table_style(
+            ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ),
+    }
+
+
+def _fit_image(source, width: float, height: float, dpi: int, quality: int) -> io.BytesIO:
+    """グラフ画像を表示サイズ（pt）× dpi に縮小し、白背景に合成した JPEG を返す。"""
+    from PIL import Image as PILImage
+
+    with PILImage.open(source) as img:
+        img = img.convert("RGBA")
+        flat = PILImage.new("RGB", img.size, (255, 255, 255))
+        flat.paste(img, mask=img.split()[3])
+        size = (max(1, round(width / inch * dpi)), max(1, round(height / inch * dpi)))
+        if size[0] < flat.width or size[1] < flat.height:
+            flat = flat.resize(size, PILImage.LANCZOS)
+
+    buffer = io.BytesIO()
+    flat.save(buffer, "JPEG", quality=quality, optimize=True)
+    buffer.seek(0)
+    return buffer
+
+
+def _chart(source, width: float, height: float, profile: dict) -> Image:
+    if isinstance(source, bytes):
+        # 同じ sections を複数のプロファイルで描画するため、描画ごとに新しいバッファを使う
+        source = io.BytesIO(source)
+    if profile["image_dpi"]:
+        source = _fit_image(source, width, height, profile["image_dpi"], profile["jpeg_quality"])
+    return Image(source, width=width, height=height)
+
+
+def render_monthly_report(
+    title: str,
+    summary_text: str,
+    annual_chart,
+    annual_table: list,
+    pie_chart,
+    pivot_table: list,
+    sla_table: Optional[list],
+    dev_table: Optional[list],
+    path: Optional[str] = None,
+    profile: str = DEFAULT_PROFILE
+) -> bytes:
+    """
+    Pure I/O: Renders the monthly report PDF from prepared sections.
+    No aggregation or formatting logic; tables arrive as lists of rows
+    (header first) and charts as image paths, PNG bytes or file-like objects.
+
+    `profile` selects an entry of PDF_PROFILES (page compression, chart downsampling).
+    Returns the PDF bytes; if `path` is given they also replace that file atomically.
+    """
+    styles = get_monthly_styles()
+    sheet = styles["sheet"]
+    options = PDF_PROFILES[profile]
+
+    buffer = io.BytesIO()
+    # invariant=1: byte-identical output for identical input (strong ETags)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=20, bottomMargin=20, invariant=1,
+                            pageCompression=options["page_compression"])
+    elements = []
+
+    # タイトル / サマリー
+    elements.append(Paragraph(f"<b>{title}</b>", sheet["Title"]))
+    elements.append(Spacer(1, 8))
+    elements.append(Paragraph(summary_text, sheet["Normal"]))
+    elements.append(Spacer(1, 10))
+
+    # Annual Summary Chart + table
+    elements.append(_chart(annual_chart, 6.5 * inch, 3 * inch, options))
+    elements.append(Spacer(1, 8))
+    annual = Table(annual_table, colWidths=ANNUAL_COL_WIDTHS)
+    annual.setStyle(styles["annual"])
+    elements.append(annual)
+    elements.append(PageBreak())
+
+    # Monthly Ticket Distribution + KPI Pivot Table (keep on same page)
+    page2_elements = [
+        Paragraph("<b>Monthly Ticket Distribution</b>", sheet["Heading2"]),
+        Spacer(1, 6),
+        _chart(pie_chart, 6.5 * inch, 4.5 * inch, options),
+        Spacer(1, 8),
+        Paragraph("<b>Monthly KPI Pivot Table</b>", sheet["Heading2"]),
+        Spacer(1, 6),
+    ]
+    pivot = Table(pivot_table, colWidths=PIVOT_COL_WIDTHS)
+    pivot.setStyle(styles["pivot"])
+    page2_elements.append(pivot)
+    elements.append(KeepTogether(page2_elements))
+    elements.append(PageBreak())
+
+    # SLA Breachセクション (keep title and table together)
+    sla_elements = [Paragraph("<b>SLA Breach</b>", sheet["Heading2"]), Spacer(1, 6)]
+    if sla_table:
+        sla = Table(sla_table, colWidths=SLA_COL_WIDTHS)
+        sla.setStyle(styles["sla"])
+        sla_elements.append(sla)
+    else:
+        sla_elements.append(Paragraph("No SLA breach data for this month.", sheet["Normal"]))
+    elements.append(KeepTogether(sla_elements))
+    elements.append(Spacer(1, 12))
+
+    # Development Effortsセクション
+    elements.append(Paragraph("<b>Development Efforts</b>", sheet["Heading2"]))
+    elements.append(Spacer(1, 10))
+    if dev_table:
+        dev = Table(dev_table, colWidths=DEV_COL_WIDTHS)
+        dev.setStyle(styles["dev"])
+        elements.append(dev)
+    else:
+        elements.append(Paragraph("No Development Efforts data for this year.", sheet["Normal"]))
+
+    with span("pdf.build", profile=profile) as timing:
+        doc.build(elements)
+        pdf_bytes = buffer.getvalue()
+        timing["pages"] = doc.page
+        timing["bytes"] = len(pdf_bytes)
+
+    if path:
+        atomic_write(path, pdf_bytes)
+    return pdf_bytes
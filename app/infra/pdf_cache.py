@@ -0,0 +1,89 @@
+"""
+PDF Artifact Cache
+
+生成済みPDFを入力（ワークブックのハッシュ、期間、レンダラーのバージョン等）から
+計算したキーで保存し、同じ入力の再ダウンロードではパース・集計・描画を省略する。
+保存先は公開されない cache/pdf（static/ 配下ではない）で、容量上限・TTL は ArtifactStore に従う。
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from app.infra.artifact_store import ArtifactStore, DEFAULT_TTL_SECONDS
+from app.infra.metrics import record_cache
+
+CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "pdf"
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def data_hash(data: Any) -> str:
+    """JSONに変換可能なデータの安定したハッシュ（SLA/Dev Effortsデータ等）。"""
+    return content_hash(json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class PdfCache:
+    """キー → PDFバイト列のキャッシュ。キーはそのまま強いETagとして使える。"""
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return content_hash("\x1f".join(str(p) for p in parts).encode("utf-8"))
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.store.lookup(f"{key}.pdf")
+        pdf_bytes = None
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    pdf_bytes = f.read()
+            except FileNotFoundError:
+                pass
+        record_cache("pdf", pdf_bytes is not None)
+        return pdf_bytes
+
+    def size(self, key: str) -> Optional[int]:
+        """キャッシュ済みPDFのバイト数（読み込まずに返す）。未キャッシュなら None。"""
+        path = self.store.lookup(f"{key}.pdf")
+        if path is None:
+            return None
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, pdf_bytes: bytes):
+        path = os.path.join(self.store.root_dir, f"{key}.pdf")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+        self.store.register(path)
+
+
+_pdf_cache: Optional[PdfCache] = None
+_pdf_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> PdfCache:
+    """
+    共有PDFキャッシュ。保存先・容量上限・TTL は環境変数
+    PDF_CACHE_DIR / PDF_CACHE_MAX_BYTES / PDF_CACHE_TTL_SECONDS で変更できる。
+    """
+    global _pdf_cache
+    with _pdf_cache_lock:
+        if _pdf_cache is None:
+            _pdf_cache = PdfCache(ArtifactStore(
+                root_dir=os.environ.get("PDF_CACHE_DIR", str(CACHE_DIR)),
+                max_bytes=int(os.environ.get("PDF_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                ttl_seconds=float(os.environ.get("PDF_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+            ))
+        return _pdf_cache
@@ -1,60 +1,217 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, HRFlowable, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, HRFlowable, Image, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from functools import lru_cache
+from typing import Optional
+import bisect
+import io
 import os
+from app.infra.timing import span
+
+# Part of the PDF cache key: bump when the weekly PDF layout or its data preparation changes
+RENDERER_VERSION = "4"
+
+# Sections with more body rows than this are laid out page by page
+CHUNK_ROWS = 50
+
+
+class _RowCommands:
+    """
+    TableStyle commands addressed by whole-section row numbers, indexed by row
+    so each sub-table only looks at the commands that touch its rows.
+    """
+
+    def __init__(self, cmds):
+        self.fixed = [cmd for cmd in cmds if cmd[1][1] < 0 or cmd[2][1] < 0]
+        ranged = sorted((cmd for cmd in cmds if cmd[1][1] >= 0 and cmd[2][1] >= 0), key=lambda cmd: cmd[1][1])
+        self.ranged = ranged
+        self.starts = [cmd[1][1] for cmd in ranged]
+        self.max_span = max((cmd[2][1] - cmd[1][1] for cmd in ranged), default=0)
+
+    def local(self, start, end):
+        """Commands for data rows [start, end), re-indexed so `start` becomes row 1."""
+        offset = start - 1
+        local = list(self.fixed)
+        lo = bisect.bisect_left(self.starts, start - self.max_span)
+        hi = bisect.bisect_right(self.starts, end - 1)
+        for cmd in self.ranged[lo:hi]:
+            name, (c0, r0), (c1, r1) = cmd[0], cmd[1], cmd[2]
+            r0, r1 = max(r0, start), min(r1, end - 1)
+            if r0 <= r1:
+                local.append((name, (c0, r0 - offset), (c1, r1 - offset)) + tuple(cmd[3:]))
+        return local
+
+
+class ChunkedTable(Flowable):
+    """
+    Long table laid out one page-sized sub-table at a time.
+
+    A single ReportLab Table re-measures all remaining rows on every page
+    split, so layout cost grows quadratically with very long sections. This
+    flowable builds a sub-table for (roughly) one page of rows only when
+    that page is laid out; each sub-table repeats the header and carries
+    the same styles. Earlier sub-tables can be released once drawn.
+    """
+
+    def __init__(self, data, colWidths=None, style=None, row_commands=None, chunk_rows=CHUNK_ROWS, start=0):
+        super().__init__()
+        self._header = data[0]
+        self._data = data
+        self._col_widths = colWidths
+        self._style = style
+        if not isinstance(row_commands, _RowCommands):
+            row_commands = _RowCommands(row_commands or [])
+        self._row_commands = row_commands
+        self._chunk_rows = chunk_rows
+        self._start = start + 1  # index of the first body row still to place
+        self._table = None
+
+    def _make_table(self, end):
+        t = Table([self._header] + self._data[self._start:end], colWidths=self._col_widths, repeatRows=1)
+        if self._style is not None:
+            t.setStyle(self._style)
+        cmds = self._row_commands.local(self._start, end)
+        if cmds:
+            t.setStyle(TableStyle(cmds))
+        return t
+
+    def wrap(self, availWidth, availHeight):
+        if self._start + self._chunk_rows < len(self._data):
+            # More rows pending: force a split so each page gets its own sub-table
+            self.width, self.height = availWidth, availHeight + 1
+            return self.width, self.height
+        self._table = self._make_table(len(self._data))
+        self.width, self.height = self._table.wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        n = self._chunk_rows
+        while True:
+            end = min(self._start + n, len(self._data))
+            table = self._make_table(end)
+            _, h = table.wrap(availWidth, availHeight)
+            if h <= availHeight:
+                if end == len(self._data):
+                    return [table]
+                n *= 2  # the whole chunk fits: take more rows for this page
+                continue
+            break
+
+        # Number of body rows that fit under the header on this page
+        row_heights = table._rowHeights
+        used = row_heights[0]
+        fit = 0
+        for height in row_heights[1:]:
+            if used + height > availHeight:
+                break
+            used += height
+            fit += 1
+        if fit == 0:
+            return []
+
+        # Next page starts with a chunk sized to what fitted here
+        rest = ChunkedTable(self._data, self._col_widths, self._style, self._row_commands,
+                            chunk_rows=max(fit + fit // 4, 1), start=self._start + fit - 1)
+        return [self._make_table(self._start + fit), rest]
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
+
+
+@lru_cache(maxsize=None)
+def get_weekly_styles() -> dict:
+    """
+    Paragraph and table styles for the weekly report.
+    Built once per process; they are read-only during rendering.
+    """
+    styles = getSampleStyleSheet()
+    blue_header_color = colors.dodgerblue
+
+    return {
+        'normal': styles['Normal'],
+        'title': ParagraphStyle(
+            name='Title', parent=styles['Heading1'], fontSize=20, alignment=2,
+            textColor=blue_header_color, spaceAfter=15
+        ),
+        'subtitle': ParagraphStyle(
+            name='Subtitle', parent=styles['Normal'], fontSize=12, alignment=2, spaceAfter=15
+        ),
+        'heading2': ParagraphStyle(
+            name='Heading2', parent=styles['Heading2'], textColor=blue_header_color
+        ),
+        'heading3': ParagraphStyle(
+            name='Heading3', parent=styles['Heading3'], textColor=blue_header_color,
+            spaceBefore=12, spaceAfter=6
+        ),
+        'table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), blue_header_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.aliceblue),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+    }
+
+
+_logo_cache = {}
+
+
+def _load_logo(logo_path: str) -> Optional[bytes]:
+    """Logo bytes, read once per process (re-read only if the file changes)."""
+    try:
+        mtime = os.path.getmtime(logo_path)
+    except OSError:
+        return None
+    cached = _logo_cache.get(logo_path)
+    if cached is None or cached[0] != mtime:
+        with open(logo_path, "rb") as f:
+            cached = (mtime, f.read())
+        _logo_cache[logo_path] = cached
+    return cached[1]
+
 
 def render_workload_report(
-    path: str,
     logo_path: str,
     title: str,
     subtitle: str,
     summary_items: list,
-    sections: list
+    sections: list,
+    path: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS
 ):
     """
     Pure I/O: Renders a PDF using ReportLab primitives.
     No business logic, sorting, or filtering.
+
+    Builds into a per-call in-memory buffer and returns the PDF bytes, so
+    concurrent requests never share an output file. If `path` is given the
+    bytes are also written there.
+
+    Sections with more than `chunk_rows` body rows are rendered as a
+    ChunkedTable (page-sized sub-tables with repeated headers).
     """
-    doc = SimpleDocTemplate(path, pagesize=landscape(A4), 
+    buffer = io.BytesIO()
+    # invariant=1: byte-identical output for identical input (strong ETags)
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), invariant=1,
                              rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
     story = []
-    styles = getSampleStyleSheet()
-
-    # Define Styles
-    blue_header_color = colors.dodgerblue
-    
-    title_style = ParagraphStyle(
-        name='Title', parent=styles['Heading1'], fontSize=20, alignment=2,
-        textColor=blue_header_color, spaceAfter=15
-    )
-    subtitle_style = ParagraphStyle(
-        name='Subtitle', parent=styles['Normal'], fontSize=12, alignment=2, spaceAfter=15
-    )
-    heading2_style = ParagraphStyle(
-        name='Heading2', parent=styles['Heading2'], textColor=blue_header_color
-    )
-    heading3_style = ParagraphStyle(
-        name='Heading3', parent=styles['Heading3'], textColor=blue_header_color,
-        spaceBefore=12, spaceAfter=6
-    )
-
-    blue_table_theme = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), blue_header_color),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.aliceblue),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ])
+    styles = get_weekly_styles()
+    title_style = styles['title']
+    subtitle_style = styles['subtitle']
+    heading2_style = styles['heading2']
+    heading3_style = styles['heading3']
+    blue_table_theme = styles['table']
 
     # 1. Branding
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=1.5*inch, height=0.5*inch)
+    logo_bytes = _load_logo(logo_path)
+    if logo_bytes is not None:
+        logo = Image(io.BytesIO(logo_bytes), width=1.5*inch, height=0.5*inch)
         logo.hAlign = 'LEFT'
         story.append(logo)
         story.append(Spacer(1, -0.4 * inch))
@@ -67,22 +224,39 @@ def render_workload_report(
 
     # 2. Summary Info
     for item in summary_items:
-        story.append(Paragraph(item, styles['Normal']))
+        story.append(Paragraph(item, styles['normal']))
     story.append(Spacer(1, 0.3 * inch))
 
     # 3. Dynamic Sections
     for i, section in enumerate(sections):
         story.append(Paragraph(section['title'], heading3_style))
         if section['data']:
-            # data is list of lists of Paragraphs
-            t = Table(section['data'], colWidths=section.get('widths'), repeatRows=1)
-            t.setStyle(blue_table_theme)
-            story.append(t)
+            # data is list of lists of strings / Paragraphs
+            if len(section['data']) - 1 > chunk_rows:
+                # Row-level highlighting prepared by the service is re-indexed per sub-table
+                story.append(ChunkedTable(section['data'], colWidths=section.get('widths'),
+                                          style=blue_table_theme, row_commands=section.get('styles'),
+                                          chunk_rows=chunk_rows))
+            else:
+                t = Table(section['data'], colWidths=section.get('widths'), repeatRows=1)
+                t.setStyle(blue_table_theme)
+                if section.get('styles'):
+                    # Row-level highlighting prepared by the service
+                    t.setStyle(TableStyle(section['styles']))
+                story.append(t)
         else:
-            story.append(Paragraph(section.get('empty_msg', 'No data found.'), styles['Normal']))
+            story.append(Paragraph(section.get('empty_msg', 'No data found.'), styles['normal']))
         
         if i < len(sections) - 1:
             story.append(PageBreak())
 
-    doc.build(story)
-    return path
+    with span("pdf.build") as timing:
+        doc.build(story)
+        pdf_bytes = buffer.getvalue()
+        timing["pages"] = doc.page
+        timing["bytes"] = len(pdf_bytes)
+
+    if path:
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+    return pdf_bytes
@@ -0,0 +1,211 @@
+"""
+SLA Journal
+
+DATA_BACKEND=json の場合の SLA Breach の保存先。
+変更は追記専用のジャーナル（JSON Lines。1 行 = add / update / delete の 1 記録）に書き、
+現在の一覧はスナップショット + ジャーナルを適用した結果としてメモリ上に持つ。
+
+- 追加・更新・削除はジャーナルへの 1 行の追記だけで済む（月全体を書き直さない）
+- ジャーナルは切り詰めず、変更履歴として残す
+- 一定量追記されるとバックグラウンドでスナップショット（従来の sla_breach_data.json 形式）を書き直し、
+  起動時の読み込みは「スナップショット + それ以降のジャーナル」だけになる
+- 他プロセスの追記はファイルサイズの変化で検知し、増えた分だけを適用する
+"""
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.infra.data_repository import SlaRepository, get_month_key, SLA_DELETE
+from app.infra.file_lock import FileLock, atomic_write
+
+DEFAULT_COMPACT_BYTES = 256 * 1024  # スナップショット以降のジャーナルがこのサイズを超えたら書き直す
+
+
+class JournalSlaRepository(SlaRepository):
+
+    def __init__(self, snapshot_path: Path, journal_path: Path, compact_bytes: int = DEFAULT_COMPACT_BYTES):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path)
+        self.compact_bytes = compact_bytes
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{self.journal_path}.lock")
+        # 月キー → {year, month, updated_at, next_id, breaches: {id: breach}}
+        self._months: Dict[str, Dict[str, Any]] = {}
+        self._seq = 0
+        self._offset = 0               # 適用済みのジャーナルのバイト数
+        self._snapshot_offset = 0      # スナップショットに含まれるジャーナルのバイト数
+        self._snapshot_signature: Optional[Tuple[int, int]] = None
+        self._compactor: Optional[threading.Thread] = None
+
+    # ---- disk ----
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_snapshot(self):
+        self._months = {}
+        self._seq = self._offset = self._snapshot_offset = 0
+        self._snapshot_signature = self._stat(self.snapshot_path)
+        if self._snapshot_signature is None:
+            return
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        for month_key, month_data in snapshot.get("monthly_data", {}).items():
+            breaches = {b["id"]: b for b in month_data.get("breaches", [])}
+            self._months[month_key] = {
+                "year": month_data.get("year"),
+                "month": month_data.get("month"),
+                "updated_at": month_data.get("updated_at"),
+                "next_id": month_data.get("next_id") or max(breaches, default=0) + 1,
+                "breaches": breaches,
+            }
+        self._seq = snapshot.get("journal_seq", 0)
+        self._offset = self._snapshot_offset = snapshot.get("journal_offset", 0)
+
+    def _apply(self, record: Dict[str, Any]):
+        month_data = self._months.setdefault(record["month_key"], {
+            "year": record["year"], "month": record["month"], "updated_at": None, "next_id": 1, "breaches": {}
+        })
+        if record["op"] == SLA_DELETE:
+            month_data["breaches"].pop(record["id"], None)
+        else:
+            month_data["breaches"][record["id"]] = record["breach"]
+        month_data["next_id"] = max(month_data["next_id"], record["id"] + 1)
+        month_data["updated_at"] = record["at"]
+        self._seq = record["seq"]
+
+    def _refresh(self):
+        """スナップショットが書き換わっていれば読み直し、ジャーナルの未適用の行を適用する。"""
+        if self._stat(self.snapshot_path) != self._snapshot_signature:
+            self._load_snapshot()
+        journal = self._stat(self.journal_path)
+        size = journal[1] if journal else 0
+        if size < self._offset:
+            # ジャーナルが差し替えられた場合は最初から読み直す
+            self._load_snapshot()
+        if size <= self._offset:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read(size - self._offset)
+        # 書き込み途中の最終行（改行の無い部分）は適用しない
+        complete = tail[:tail.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._offset += len(complete)
+
+    def _append(self, records: List[Dict[str, Any]]):
+        data = b"".join(json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in records)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "ab") as f:
+            # 途中で落ちた書き込みの残り（改行の無い最終行）は捨ててから追記する
+            if f.tell() > self._offset:
+                f.truncate(self._offset)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset += len(data)
+
+    # ---- SlaRepository ----
+
+    def _change(self, year: int, month: int, updated_at: str,
+                plan: Callable[[Optional[Dict[int, Dict[str, Any]]], int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        month_key = get_month_key(year, month)
+        with self._lock, self._file_lock:
+            self._refresh()
+            month_data = self._months.get(month_key)
+            current = copy.deepcopy(month_data["breaches"]) if month_data else None
+            changes = plan(current, month_data["next_id"] if month_data else 1)
+
+            records = []
+            for change in changes:
+                if change["op"] is None:
+                    continue
+                self._seq += 1
+                records.append({"seq": self._seq, "month_key": month_key, "year": year, "month": month,
+                                "op": change["op"], "id": change["id"],
+                                "breach": copy.deepcopy(change["breach"]), "at": updated_at})
+            if records:
+                self._append(records)
+                for record in records:
+                    self._apply(record)
+        if records:
+            self._maybe_compact()
+        return changes
+
+    def get_month(self, year: int, month: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            month_data = self._months.get(get_month_key(year, month))
+            if month_data is None:
+                return []
+            return [copy.deepcopy(month_data["breaches"][i]) for i in sorted(month_data["breaches"])]
+
+    def history(self, year: int, month: int) -> List[Dict[str, Any]]:
+        month_key = get_month_key(year, month)
+        if not self.journal_path.exists():
+            return []
+        result = []
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                if record["month_key"] == month_key:
+                    result.append({key: record[key] for key in ("seq", "op", "id", "breach", "at")})
+        return result
+
+    def all_months(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._monthly_data(include_next_id=False)
+
+    # ---- compaction ----
+
+    def _monthly_data(self, include_next_id: bool) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for month_key in sorted(self._months):
+            month_data = self._months[month_key]
+            result[month_key] = {
+                "year": month_data["year"],
+                "month": month_data["month"],
+                "breaches": [copy.deepcopy(month_data["breaches"][i]) for i in sorted(month_data["breaches"])],
+                "updated_at": month_data["updated_at"],
+            }
+            if include_next_id:
+                result[month_key]["next_id"] = month_data["next_id"]
+        return result
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._offset - self._snapshot_offset < self.compact_bytes:
+                return
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="sla-journal-compaction", daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """現在の一覧をスナップショットに書き出す（ジャーナルは履歴として残す）。"""
+        with self._lock, self._file_lock:
+            self._refresh()
+            if self._offset == self._snapshot_offset and self.snapshot_path.exists():
+                return
+            snapshot = {
+                "monthly_data": self._monthly_data(include_next_id=True),
+                "journal_offset": self._offset,
+                "journal_seq": self._seq,
+            }
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(str(self.snapshot_path), json.dumps(snapshot, ensure_ascii=False, indent=2).encode("utf-8"))
+            self._snapshot_offset = self._offset
+            self._snapshot_signature = self._stat(self.snapshot_path)
@@ -0,0 +1,254 @@
+"""
+SQLite Store
+
+SLA Breach / Development Efforts データを SQLite（WALモード）に保存するバックエンド。
+月キー・チケット番号にインデックスを持ち、保存は行単位の UPSERT、取得はインデックス検索になる。
+SLA Breach の変更は sla_journal に追記し、同じトランザクションで sla_breaches（現在の一覧）に反映する。
+接続はスレッドごとに 1 本（WAL なので読み込みは書き込みをブロックしない）。
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.infra.data_repository import (
+    SlaRepository, DevEffortsRepository, get_month_key, SLA_FIELDS, DEV_EFFORTS_FIELDS, SLA_DELETE
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sla_months (
+    month_key TEXT PRIMARY KEY,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS sla_breaches (
+    month_key TEXT NOT NULL REFERENCES sla_months(month_key) ON DELETE CASCADE,
+    id INTEGER NOT NULL,
+    ticket_no TEXT,
+    requested_for TEXT,
+    description TEXT,
+    percentage TEXT,
+    elapsed_time TEXT,
+    remarks TEXT,
+    created_at TEXT,
+    PRIMARY KEY (month_key, id)
+);
+CREATE INDEX IF NOT EXISTS idx_sla_breaches_ticket_no ON sla_breaches(ticket_no);
+CREATE TABLE IF NOT EXISTS sla_journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    month_key TEXT NOT NULL,
+    op TEXT NOT NULL,
+    breach_id INTEGER NOT NULL,
+    data TEXT,
+    at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sla_journal_month_key ON sla_journal(month_key, seq);
+CREATE TABLE IF NOT EXISTS dev_efforts (
+    month_key TEXT PRIMARY KEY,
+    me_hours REAL,
+    sow_planned REAL,
+    carry_forward REAL,
+    last_updated TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SqliteStore:
+    """スレッドごとの接続を持つ SQLite データベース"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+
+class SqliteSlaRepository(SlaRepository):
+
+    def __init__(self, store: SqliteStore):
+        self.store = store
+
+    def get_month(self, year: int, month: int) -> List[Dict[str, Any]]:
+        rows = self.store.connect().execute(
+            f"SELECT {', '.join(SLA_FIELDS)} FROM sla_breaches WHERE month_key = ? ORDER BY id",
+            (get_month_key(year, month),)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _change(self, year: int, month: int, updated_at: str,
+                plan: Callable[[Optional[Dict[int, Dict[str, Any]]], int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        month_key = get_month_key(year, month)
+        with self.store.connect() as conn:
+            # 採番と反映を他の書き込みと直列化する
+            conn.execute("BEGIN IMMEDIATE")
+            current = None
+            if conn.execute("SELECT 1 FROM sla_months WHERE month_key = ?", (month_key,)).fetchone():
+                rows = conn.execute(
+                    f"SELECT {', '.join(SLA_FIELDS)} FROM sla_breaches WHERE month_key = ?", (month_key,)
+                ).fetchall()
+                current = {row["id"]: dict(row) for row in rows}
+            # 削除済みの id も再利用しない
+            last_id = conn.execute(
+                "SELECT MAX(id) FROM (SELECT id FROM sla_breaches WHERE month_key = ? "
+                "UNION ALL SELECT breach_id FROM sla_journal WHERE month_key = ?)", (month_key, month_key)
+            ).fetchone()[0]
+            changes = plan(current, (last_id or 0) + 1)
+
+            applied = [change for change in changes if change["op"] is not None]
+            if not applied:
+                return changes
+            conn.execute(
+                "INSERT INTO sla_months (month_key, year, month, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(month_key) DO UPDATE SET updated_at = excluded.updated_at",
+                (month_key, year, month, updated_at)
+            )
+            for change in applied:
+                if change["op"] == SLA_DELETE:
+                    conn.execute("DELETE FROM sla_breaches WHERE month_key = ? AND id = ?", (month_key, change["id"]))
+                else:
+                    breach = change["breach"]
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO sla_breaches (month_key, {', '.join(SLA_FIELDS)}) "
+                        f"VALUES (?{', ?' * len(SLA_FIELDS)})",
+                        (month_key, *(breach.get(field) for field in SLA_FIELDS))
+                    )
+                conn.execute(
+                    "INSERT INTO sla_journal (month_key, op, breach_id, data, at) VALUES (?, ?, ?, ?, ?)",
+                    (month_key, change["op"], change["id"],
+                     json.dumps(change["breach"], ensure_ascii=False) if change["breach"] else None, updated_at)
+                )
+        return changes
+
+    def history(self, year: int, month: int) -> List[Dict[str, Any]]:
+        rows = self.store.connect().execute(
+            "SELECT seq, op, breach_id, data, at FROM sla_journal WHERE month_key = ? ORDER BY seq",
+            (get_month_key(year, month),)
+        ).fetchall()
+        return [{"seq": row["seq"], "op": row["op"], "id": row["breach_id"],
+                 "breach": json.loads(row["data"]) if row["data"] else None, "at": row["at"]} for row in rows]
+
+    def all_months(self) -> Dict[str, Dict[str, Any]]:
+        conn = self.store.connect()
+        result = {}
+        for row in conn.execute("SELECT month_key, year, month, updated_at FROM sla_months ORDER BY month_key"):
+            result[row["month_key"]] = {"year": row["year"], "month": row["month"], "breaches": [], "updated_at": row["updated_at"]}
+        for row in conn.execute(f"SELECT month_key, {', '.join(SLA_FIELDS)} FROM sla_breaches ORDER BY month_key, id"):
+            breach = dict(row)
+            result[breach.pop("month_key")]["breaches"].append(breach)
+        return result
+
+
+class SqliteDevEffortsRepository(DevEffortsRepository):
+
+    def __init__(self, store: SqliteStore):
+        self.store = store
+
+    def get(self, month_key: str) -> Optional[Dict[str, Any]]:
+        row = self.store.connect().execute(
+            f"SELECT {', '.join(DEV_EFFORTS_FIELDS)} FROM dev_efforts WHERE month_key = ?", (month_key,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def save(self, month_key: str, record: Dict[str, Any]):
+        with self.store.connect() as conn:
+            _upsert_dev_efforts(conn, month_key, record)
+
+    def delete(self, month_key: str) -> bool:
+        with self.store.connect() as conn:
+            return conn.execute("DELETE FROM dev_efforts WHERE month_key = ?", (month_key,)).rowcount > 0
+
+    def get_year(self, year: int) -> Dict[int, Dict[str, Any]]:
+        rows = self.store.connect().execute(
+            f"SELECT month_key, {', '.join(DEV_EFFORTS_FIELDS)} FROM dev_efforts WHERE month_key BETWEEN ? AND ?",
+            (get_month_key(year, 1), get_month_key(year, 12))
+        ).fetchall()
+        result = {}
+        for row in rows:
+            record = dict(row)
+            result[int(record.pop("month_key")[5:])] = record
+        return dict(sorted(result.items()))
+
+    def all_months(self) -> Dict[str, Dict[str, Any]]:
+        rows = self.store.connect().execute(
+            f"SELECT month_key, {', '.join(DEV_EFFORTS_FIELDS)} FROM dev_efforts ORDER BY month_key"
+        ).fetchall()
+        return {row["month_key"]: {field: row[field] for field in DEV_EFFORTS_FIELDS} for row in rows}
+
+
+def _upsert_sla_month(conn: sqlite3.Connection, month_key: str, year: int, month: int,
+                      breaches: List[Dict[str, Any]], updated_at: Optional[str]):
+    conn.execute(
+        "INSERT INTO sla_months (month_key, year, month, updated_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(month_key) DO UPDATE SET year = excluded.year, month = excluded.month, updated_at = excluded.updated_at",
+        (month_key, year, month, updated_at)
+    )
+    conn.execute("DELETE FROM sla_breaches WHERE month_key = ?", (month_key,))
+    conn.executemany(
+        f"INSERT INTO sla_breaches (month_key, {', '.join(SLA_FIELDS)}) VALUES (?{', ?' * len(SLA_FIELDS)})",
+        [(month_key, *(breach.get(field) for field in SLA_FIELDS)) for breach in breaches]
+    )
+
+
+def _upsert_dev_efforts(conn: sqlite3.Connection, month_key: str, record: Dict[str, Any]):
+    conn.execute(
+        f"INSERT INTO dev_efforts (month_key, {', '.join(DEV_EFFORTS_FIELDS)}) VALUES (?{', ?' * len(DEV_EFFORTS_FIELDS)}) "
+        "ON CONFLICT(month_key) DO UPDATE SET "
+        + ", ".join(f"{field} = excluded.{field}" for field in DEV_EFFORTS_FIELDS),
+        (month_key, *(record.get(field) for field in DEV_EFFORTS_FIELDS))
+    )
+
+
+def import_json_data(store: SqliteStore, sla_file: Path, dev_efforts_file: Path) -> bool:
+    """
+    既存の data/*.json を一度だけ取り込む（取り込み済みなら何もしない）。
+    JSON ファイル自体は変更しない。取り込みを行った場合は True。
+    """
+    if store.get_meta("json_imported_at") is not None:
+        return False
+
+    def read(path: Path) -> dict:
+        if not Path(path).exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("monthly_data", {})
+        except Exception:
+            return {}
+
+    from datetime import datetime
+
+    with store.connect() as conn:
+        # 他プロセスと同時に起動した場合も一度だけ取り込む
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported_at'").fetchone():
+            return False
+        for month_key, month_data in read(sla_file).items():
+            year, month = (int(p) for p in month_key.split("-"))
+            _upsert_sla_month(conn, month_key, month_data.get("year", year), month_data.get("month", month),
+                              month_data.get("breaches", []), month_data.get("updated_at"))
+        for month_key, record in read(dev_efforts_file).items():
+            _upsert_dev_efforts(conn, month_key, record)
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported_at', ?)", (datetime.now().isoformat(),))
+    return True
@@ -0,0 +1,185 @@
+"""
+Stage Executor
+
+パース・集計・グラフ・PDF生成などの重い処理を、イベントループの外（スレッドプールまたはプロセスプール）で実行する。
+async のハンドラーは run_blocking() でブロッキング処理を渡し、完了を待つ間も他のリクエストを処理できる。
+
+段階（parse / aggregate / chart / pdf / excel）ごとに同時実行数の上限を持ち、
+処理側は `with stage("pdf"):` で囲む。上限を超えた分は空きが出るまで待つ。
+ジョブキュー・バンドル生成のスレッドから呼ばれた場合も同じ上限が適用される。
+各段階は timing のスパンとして計測される（`with stage("parse") as fields:` で rows 等を追加できる）。
+プールで実行した処理のスパンも呼び出し元のリクエストに集計される。
+
+環境変数:
+- STAGE_EXECUTOR: thread（既定）/ process
+- STAGE_WORKERS: プールのワーカー数（既定 4）
+- STAGE_LIMIT_<段階名>: 段階ごとの同時実行数（例: STAGE_LIMIT_PDF=1）
+"""
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from app.infra.timing import collect, merge_spans, span
+
+DEFAULT_WORKERS = 4
+DEFAULT_STAGE_LIMITS = {
+    "parse": 4,
+    "aggregate": 4,
+    "chart": 2,
+    "pdf": 2,
+    "excel": 2,
+}
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class _RemoteHTTPError(Exception):
+    """ワーカープロセスで発生した HTTPException（HTTPException 自体は pickle できないため）。"""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StageExecutor:
+    """ブロッキング処理の実行先（プール）と段階ごとの同時実行数の上限"""
+
+    def __init__(self, kind: str = "thread", max_workers: int = DEFAULT_WORKERS,
+                 limits: Optional[Dict[str, int]] = None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.limits = dict(DEFAULT_STAGE_LIMITS, **(limits or {}))
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self.max_workers = max_workers
+        if kind == "process":
+            # ワーカープロセスと上限を共有するため multiprocessing のセマフォを使う
+            self._context = multiprocessing.get_context("spawn")
+            self._semaphores = {name: self._context.BoundedSemaphore(n) for name, n in self.limits.items()}
+        else:
+            self._semaphores = {name: threading.BoundedSemaphore(n) for name, n in self.limits.items()}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        段階 name の実行枠を確保する（上限に達していれば空くまで待つ）。
+        ブロック内はスパン name として計測し、そのフィールドの dict を返す。
+        """
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            with span(name) as fields:
+                yield fields
+            return
+        start = time.perf_counter()
+        semaphore.acquire()
+        try:
+            with span(name, wait_ms=round((time.perf_counter() - start) * 1000, 2)) as fields:
+                yield fields
+        finally:
+            semaphore.release()
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=self._context,
+                        initializer=_init_worker_process, initargs=(self.limits, self._semaphores)
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+            return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        fn(*args, **kwargs) をプールで実行して結果を返す。
+        process の場合、fn はモジュールレベルの関数、引数と戻り値は pickle できる値であること。
+        """
+        loop = asyncio.get_running_loop()
+        if self.kind == "thread":
+            # スパンを呼び出し元のリクエストに集計するためコンテキストを引き継ぐ
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._get_pool(), context.run, functools.partial(fn, *args, **kwargs))
+        try:
+            result, spans = await loop.run_in_executor(
+                self._get_pool(), functools.partial(_call_in_worker, fn, args, kwargs)
+            )
+        except _RemoteHTTPError as e:
+            from fastapi import HTTPException
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        merge_spans(spans)
+        return result
+
+    def shutdown(self, wait: bool = True):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
+
+
+def _init_worker_process(limits: Dict[str, int], semaphores: Dict[str, Any]):
+    """ワーカープロセスの初期化: 親プロセスと同じセマフォで上限を共有する。"""
+    global _stage_executor
+    executor = StageExecutor(kind="thread", max_workers=1, limits=limits)
+    executor._semaphores = semaphores
+    _stage_executor = executor
+
+
+def _call_in_worker(fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    """ワーカープロセス側: 結果と、その間に計測したスパンを返す。"""
+    try:
+        with collect() as timings:
+            result = fn(*args, **kwargs)
+        return result, timings.spans
+    except Exception as e:
+        if hasattr(e, "status_code") and hasattr(e, "detail"):
+            raise _RemoteHTTPError(e.status_code, e.detail) from None
+        raise
+
+
+_stage_executor: Optional[StageExecutor] = None
+_stage_executor_lock = threading.Lock()
+
+
+def get_stage_executor() -> StageExecutor:
+    """共有の StageExecutor（設定は環境変数 STAGE_EXECUTOR / STAGE_WORKERS / STAGE_LIMIT_*）"""
+    global _stage_executor
+    with _stage_executor_lock:
+        if _stage_executor is None:
+            limits = {
+                name: int(os.environ[f"STAGE_LIMIT_{name.upper()}"])
+                for name in DEFAULT_STAGE_LIMITS if f"STAGE_LIMIT_{name.upper()}" in os.environ
+            }
+            _stage_executor = StageExecutor(
+                kind=os.environ.get("STAGE_EXECUTOR", "thread"),
+                max_workers=int(os.environ.get("STAGE_WORKERS", DEFAULT_WORKERS)),
+                limits=limits
+            )
+        return _stage_executor
+
+
+def stage(name: str):
+    """with stage("pdf"): ... — 共有 StageExecutor の段階の実行枠"""
+    return get_stage_executor().stage(name)
+
+
+async def run_blocking(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """ブロッキング処理を共有 StageExecutor のプールで実行する。"""
+    return await get_stage_executor().run(fn, *args, **kwargs)
+
+
+def shutdown_stage_executor():
+    """共有 StageExecutor のプールを停止する（アプリ終了時）。"""
+    global _stage_executor
+    with _stage_executor_lock:
+        if _stage_executor is not None:
+            _stage_executor.shutdown(wait=False)
+            _stage_executor = None
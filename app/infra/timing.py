@@ -0,0 +1,166 @@
+"""
+Timing
+
+処理段階ごとの所要時間を計測する軽量なスパン API。
+
+    with span("pdf.build") as fields:
+        pdf_bytes = ...
+        fields["bytes"] = len(pdf_bytes)
+
+- stage("pdf") などの実行枠（stage_executor）はそれ自体がスパンになる（待ち時間は wait_ms）
+- 計測結果はリクエスト単位で集められ（contextvars）、TimingMiddleware が
+  Server-Timing ヘッダー（例: `parse;dur=120.5, pdf.build;dur=830.1, total;dur=1012.3`）として返す
+- スパンごと・リクエストごとに 1 行の JSON ログ（ロガー "app.timing"）を出力する。
+  rows / bytes などのフィールドはそのままログに含まれる
+- リクエストの外（ジョブ・テスト）で計測したスパンはログのみ
+- 全てのスパンは /metrics の段階別ヒストグラム（metrics.observe_span）にも記録される
+
+環境変数:
+- SERVER_TIMING: 0 で Server-Timing ヘッダーを付けない（既定 1）
+- TIMING_LOG: 0 でログを出力しない（既定 1）
+"""
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.infra.metrics import observe_span
+
+Span = Tuple[str, float, Dict[str, Any]]
+
+logger = logging.getLogger("app.timing")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _enabled(name: str) -> bool:
+    return os.environ.get(name, "1") != "0"
+
+
+class Timings:
+    """1リクエスト分のスパン（ワーカースレッドからも追加される）"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration_ms: float, fields: Dict[str, Any]):
+        with self._lock:
+            self.spans.append((name, duration_ms, fields))
+
+    def extend(self, spans: Iterable[Span]):
+        with self._lock:
+            self.spans.extend(spans)
+
+
+_current: contextvars.ContextVar[Optional[Timings]] = contextvars.ContextVar("timings", default=None)
+
+
+def current_timings() -> Optional[Timings]:
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """このブロック内（コンテキストを引き継いだスレッドを含む）で計測したスパンを集める。"""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def merge_spans(spans: Iterable[Span]):
+    """別プロセスで計測されたスパンを現在のリクエストとメトリクスに加える。"""
+    spans = list(spans)
+    for name, duration_ms, fields in spans:
+        observe_span(name, duration_ms, fields)
+    timings = _current.get()
+    if timings is not None:
+        timings.extend(spans)
+
+
+def log_event(event: str, **fields):
+    if _enabled("TIMING_LOG"):
+        logger.info(json.dumps({"event": event, **fields}, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def span(name: str, **fields):
+    """
+    name の所要時間を計測する。yield される dict に rows / bytes などを追加するとログに含まれる。
+    例外で抜けた場合は error に例外の型名が入る。
+    """
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        fields["error"] = type(e).__name__
+        raise
+    finally:
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, duration_ms, fields)
+        observe_span(name, duration_ms, fields)
+        log_event("span", name=name, ms=duration_ms, **fields)
+
+
+def server_timing(spans: Iterable[Span], total_ms: Optional[float] = None) -> str:
+    """Server-Timing ヘッダーの値"""
+    entries = [f"{name};dur={duration_ms}" for name, duration_ms, _ in spans]
+    if total_ms is not None:
+        entries.append(f"total;dur={total_ms}")
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """
+    リクエストごとにスパンを集め、Server-Timing ヘッダーとリクエスト単位のログ
+    （メソッド・パス・ステータス・所要時間・レスポンスのバイト数）を出力する ASGI ミドルウェア。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from starlette.datastructures import MutableHeaders
+
+        timings = Timings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        response = {"status": None, "bytes": 0}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if _enabled("SERVER_TIMING"):
+                    total_ms = round((time.perf_counter() - start) * 1000, 2)
+                    message.setdefault("headers", [])
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing(timings.spans, total_ms))
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            log_event(
+                "request", method=scope["method"], path=scope["path"], status=response["status"],
+                ms=round((time.perf_counter() - start) * 1000, 2), bytes=response["bytes"], spans=len(timings.spans)
+            )
@@ -1,28 +1,131 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import parse_qs
+import importlib
 import os
+import threading
+from app.infra.artifact_store import get_artifact_store
+from app.infra.job_queue import jobs_api_enabled, shutdown_job_queue
+from app.infra.stage_executor import shutdown_stage_executor
+from app.infra.metrics import MetricsMiddleware
+from app.infra.timing import TimingMiddleware
 from app.api.report import router as report_router
 from app.api.monthly_report import router as monthly_router
 from app.api.sla_data import router as sla_router
 from app.api.dev_efforts import router as dev_efforts_router
+from app.api.jobs import router as jobs_router
+from app.api.metrics import router as metrics_router
+from app.utils.http_cache import etag_matches
+from app.utils.static_assets import (
+    CachedPage, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, asset_version
+)
 
-app = FastAPI()
+# Heavy libraries used only by the report endpoints. Routers import them lazily on
+# first use; this list is preloaded in a background thread after startup.
+WARMUP_MODULES = [
+    "pandas",
+    "openpyxl",
+    "app.services.report_orchestrator",
+    "app.services.monthly_report_service",
+    "app.infra.chart_renderer",
+    "app.services.pdf_service",
+    "reportlab.platypus",
+]
+
+
+def warm_up_heavy_imports():
+    for module_name in WARMUP_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"Warm-up import failed for {module_name}: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Set WARMUP_IMPORTS=0 to load heavy libraries strictly on first request
+    if os.environ.get("WARMUP_IMPORTS", "1") != "0":
+        threading.Thread(target=warm_up_heavy_imports, name="import-warmup", daemon=True).start()
+    yield
+    shutdown_job_queue()
+    shutdown_stage_executor()
+
+
+app = FastAPI(lifespan=lifespan)
+# Server-Timing header and one structured log line per request / pipeline stage
+app.add_middleware(TimingMiddleware)
+# Per-route latency / in-flight requests for GET /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Mount static files
 static_dir = os.path.join(os.path.dirname(__file__), "../static")
 if not os.path.exists(static_dir):
     os.makedirs(static_dir)
 
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+class ArtifactStaticFiles(StaticFiles):
+    """
+    Static files that record access to generated artifacts (for LRU eviction).
+    Content-versioned URLs (?v=<hash> matching the file) are cached as immutable;
+    everything else revalidates with ETag / Last-Modified.
+    """
+
+    @staticmethod
+    def _current_version(full_path: str, served: bool) -> Optional[str]:
+        # File lock + index write (touch) and stat / hashing (asset_version): kept off the event loop
+        if served:
+            get_artifact_store().touch(full_path)
+        return asset_version(full_path)
+
+    async def get_response(self, path, scope):
+        # Dotfiles (lock files, indexes, editor leftovers) are never published
+        if any(part.startswith(".") for part in path.replace("\\", "/").split("/")):
+            raise StarletteHTTPException(status_code=404)
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            full_path = os.path.join(self.directory, path)
+            version = await run_in_threadpool(self._current_version, full_path, response.status_code == 200)
+            requested = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v")
+            immutable = requested is not None and requested[0] == version
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        return response
+
+
+app.mount("/static", ArtifactStaticFiles(directory=static_dir), name="static")
+
+index_page = CachedPage(os.path.join(static_dir, "index.html"), static_dir=os.path.normpath(static_dir))
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: str) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return False
+
 
 @app.get("/")
-async def read_index():
-    index_path = os.path.join(static_dir, "index.html")
-    if os.path.exists(index_path):
-        with open(index_path, "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
-    return HTMLResponse(content="<h1>Welcome to Weekly Excel-Report Generator</h1><p>Frontend not found.</p>")
+async def read_index(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    """index.html from memory; revalidated with ETag / Last-Modified on every load."""
+    page = index_page.get()
+    if page is None:
+        return HTMLResponse(content="<h1>Welcome to Weekly Excel-Report Generator</h1><p>Frontend not found.</p>")
+    headers = {"ETag": page.etag, "Last-Modified": page.last_modified, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    if etag_matches(if_none_match, page.etag) or (
+        if_none_match is None and not_modified_since(if_modified_since, page.last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=page.body, headers=headers)
 
 @app.get("/health")
 def health():
@@ -33,4 +136,8 @@ app.include_router(report_router)
 app.include_router(monthly_router)
 app.include_router(sla_router)
 app.include_router(dev_efforts_router)
+if jobs_api_enabled():
+    # Jobs live in this process only; run_api.py refuses --workers > 1 unless JOBS_API=0
+    app.include_router(jobs_router)
+app.include_router(metrics_router)
 
@@ -0,0 +1,69 @@
+import contextvars
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import BinaryIO, Iterable, Optional, Union
+from app.infra.stage_executor import stage
+from app.services.report_orchestrator import get_weekly_report_data
+
+BUNDLE_OUTPUTS = ("json", "pdf", "xlsx")
+
+
+def _render_json(data: dict, begin_date: date, end_date: date) -> bytes:
+    from app.services.json_service import encode_json_report
+    return encode_json_report(data, begin_date, end_date)
+
+
+def _render_pdf(data: dict, begin_date: date, end_date: date) -> bytes:
+    from app.services.pdf_service import generate_pdf_service
+    with stage("pdf") as timing:
+        pdf_bytes = generate_pdf_service(data, begin_date, end_date)
+        timing["bytes"] = len(pdf_bytes)
+    return pdf_bytes
+
+
+def _render_xlsx(data: dict, begin_date: date, end_date: date, template: BinaryIO) -> bytes:
+    from app.services.excel_service import generate_excel_service
+    with stage("excel") as timing:
+        xlsx_bytes = generate_excel_service(data, begin_date, end_date, template)
+        timing["bytes"] = len(xlsx_bytes)
+    return xlsx_bytes
+
+
+def build_report_bundle(
+    workbook: Union[str, BinaryIO],
+    begin_date: date,
+    end_date: date,
+    outputs: Iterable[str],
+    template: Optional[BinaryIO] = None,
+    basename: str = "report"
+) -> bytes:
+    """
+    Orchestration Service: Parses the workbook and runs `process_report_data`
+    once, then renders every requested output from the same prepared data.
+    The renderers only read the prepared DataFrames, so they run in parallel.
+    Returns a zip archive with one `<basename>.<ext>` member per output.
+    """
+    data = get_weekly_report_data(workbook, begin_date, end_date)
+
+    renderers = {
+        "json": lambda: _render_json(data, begin_date, end_date),
+        "pdf": lambda: _render_pdf(data, begin_date, end_date),
+    }
+    if template is not None:
+        renderers["xlsx"] = lambda: _render_xlsx(data, begin_date, end_date, template)
+
+    outputs = [o for o in BUNDLE_OUTPUTS if o in set(outputs)]
+    with ThreadPoolExecutor(max_workers=len(outputs), thread_name_prefix="bundle") as pool:
+        # Each renderer runs in a copy of the caller's context so its spans reach the request timings
+        futures = {ext: pool.submit(contextvars.copy_context().run, renderers[ext]) for ext in outputs}
+        results = {ext: future.result() for ext, future in futures.items()}
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for ext, payload in results.items():
+            # PDF and xlsx are already compressed internally; only deflate the JSON
+            compression = zipfile.ZIP_DEFLATED if ext == "json" else zipfile.ZIP_STORED
+            archive.writestr(f"{basename}.{ext}", payload, compress_type=compression)
+    return buffer.getvalue()
@@ -0,0 +1,52 @@
+import io
+from datetime import date
+from typing import BinaryIO, Union
+from app.infra.excel_repository import write_report_to_template
+
+# Template header -> source column of the open-ticket table on the "IFS" sheet
+TICKET_COLUMNS = {
+    "ServiceNow Ticket #": "Ticket No.",
+    "Description": "Request Detail",
+    "Type": "Type",
+    "PIC": "Assign To",
+    "Received": "Time - Arrive",
+    "Resolved": "Time - Close",
+    "Status": "Status",
+    "REQ No.": "REQ No.",
+    "Requested for": "Requested for",
+    "Remarks": "Remarks",
+}
+TICKET_ANCHOR = "ServiceNow Ticket #"
+
+# New users are written row by row from A3 of the "New User" sheet (as report_generator.py does)
+USERS_SHEET = "New User"
+USERS_START_ROW = 3
+
+
+def generate_excel_service(data: dict, begin_date: date, end_date: date,
+                           template: Union[str, BinaryIO]) -> bytes:
+    """
+    Data Preparation Service: Maps the report sections onto the template and
+    calls the infrastructure writer. Returns the .xlsx bytes.
+    Same sections as the weekly report generator: open tickets under the "IFS"
+    headers, the closed / open counts on the Period line, and the new users on the
+    "New User" sheet (when the template has one). Closed tickets are counted only.
+    """
+    left_df = data["left_df"]
+    source_cols = {header: col for header, col in TICKET_COLUMNS.items() if col in left_df.columns}
+    tickets_df = left_df[list(source_cols.values())].copy()
+    tickets_df.columns = list(source_cols.keys())
+
+    summary_info = {
+        "period": f"{begin_date.strftime('%m/%d/%Y')} - {end_date.strftime('%m/%d/%Y')}",
+        "stats": f"{data['summary']['closed_count']} closed, {data['summary']['open_count']} open",
+    }
+    users_df = data["new_users_df"].drop(columns=["is_new_user"], errors="ignore")
+    sections = [
+        {"anchor": TICKET_ANCHOR, "df": tickets_df, "allowed_cols": list(source_cols.keys())},
+        {"sheet": USERS_SHEET, "start_row": USERS_START_ROW, "df": users_df},
+    ]
+
+    buffer = io.BytesIO()
+    write_report_to_template(template, buffer, sections, summary_info)
+    return buffer.getvalue()
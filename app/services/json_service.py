@@ -0,0 +1,134 @@
+import datetime
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from app.infra.timing import span
+
+# Section shapes (validated by the API layer, see report.JSON_SHAPES):
+#   records - list of {column: value} objects (default)
+#   columns - {"columns": [...], "rows": [[...], ...]}, no repeated keys
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Response section name -> key of the prepared DataFrame in the report data
+SECTIONS = {
+    "left_section": "left_df",
+    "right_section": "right_df",
+    "new_users_section": "new_users_df",
+}
+
+
+def _iso_datetimes(series: pd.Series) -> list:
+    """ISO 8601 strings for a datetime column (same text as Timestamp.isoformat), None for NaT."""
+    if series.dt.tz is not None:
+        return [None if pd.isna(v) else v.isoformat() for v in series]
+    text = series.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    micro = series.dt.microsecond.fillna(0).astype(np.int64)
+    has_micro = (micro != 0).to_numpy()
+    if has_micro.any():
+        text = text.where(~has_micro, text + "." + micro.astype(str).str.zfill(6))
+    return text.where(series.notna(), None).tolist()
+
+
+def column_values(series: pd.Series) -> list:
+    """
+    One column as a list of JSON-ready values, converted once per column.
+    Datetimes are formatted vectorised; NaN floats are written as null by orjson;
+    anything left in object columns is handled by `_default` at encode time.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return _iso_datetimes(series)
+    return series.tolist()
+
+
+def _default(value: Any) -> Any:
+    """Fallback for values orjson does not encode natively (mostly object columns)."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_section(df: pd.DataFrame, shape: str = "records") -> Any:
+    """Builds a section from column arrays (no per-cell object conversion of the frame)."""
+    names = [str(c) for c in df.columns]
+    columns = [column_values(df.iloc[:, i]) for i in range(len(names))]
+    if shape == "columns":
+        return {"columns": names, "rows": list(zip(*columns))}
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def section_frames(data: dict) -> Dict[str, pd.DataFrame]:
+    """The three table sections of the report data, keyed by response section name."""
+    return {name: data[key] for name, key in SECTIONS.items()}
+
+
+def unknown_fields(frames: Dict[str, pd.DataFrame], fields: Sequence[str]) -> List[str]:
+    """Requested fields that are not a column of any section."""
+    known = {str(c) for df in frames.values() for c in df.columns}
+    return [f for f in fields if f not in known]
+
+
+def select_page(df: pd.DataFrame, fields: Optional[Sequence[str]] = None,
+                offset: int = 0, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rows [offset, offset + limit) restricted to `fields` (in the section's own column
+    order; fields a section does not have are skipped). Slicing happens before encoding,
+    so unrequested rows and columns are never converted.
+    """
+    if fields is not None:
+        wanted = set(fields)
+        df = df.iloc[:, [i for i, c in enumerate(df.columns) if str(c) in wanted]]
+    if offset or limit is not None:
+        df = df.iloc[offset:None if limit is None else offset + limit]
+    return df
+
+
+def encode_json(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS)
+
+
+def encode_json_report(data: dict, begin_date: date, end_date: date, shape: str = "records",
+                       fields: Optional[Sequence[str]] = None, limit: Optional[int] = None,
+                       pages: Optional[Dict[str, dict]] = None) -> bytes:
+    """
+    Data Preparation Service: Encodes prepared report data into the
+    /generate response body (UTF-8 JSON bytes).
+    With `limit`, each section holds its first page only and `pages` (total rows
+    and the cursor of the next page per section) is included as given.
+    """
+    with span("json.encode") as timing:
+        frames = section_frames(data)
+        result: Dict[str, Any] = {"summary": data["summary"]}
+        rows = 0
+        for name, df in frames.items():
+            page = select_page(df, fields, 0, limit)
+            result[name] = encode_section(page, shape)
+            rows += len(page)
+        result["period"] = {
+            "begin": begin_date.isoformat(),
+            "end": end_date.isoformat()
+        }
+        if shape != "records":
+            result["shape"] = shape
+        if pages is not None:
+            result["pages"] = pages
+        body = encode_json(result)
+        timing["rows"] = rows
+        timing["bytes"] = len(body)
+    return body
+
+
+def section_records(section: Any) -> List[dict]:
+    """Expands a "columns" shaped section back to records (for clients and tests)."""
+    if isinstance(section, dict):
+        return [dict(zip(section["columns"], row)) for row in section["rows"]]
+    return section
@@ -0,0 +1,131 @@
+from typing import Dict, Any, List, Optional
+from app.infra.monthly_pdf_renderer import render_monthly_report, DEFAULT_PROFILE
+
+MONTH_LABELS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def build_annual_table(annual_summary: Dict[str, Any]) -> List[list]:
+    table = [["Category"] + MONTH_LABELS]
+    for category in annual_summary.get("categories", []):
+        counts = annual_summary.get("data", {}).get(category, [0] * 12)
+        table.append([category] + counts)
+    return table
+
+
+def build_pivot_table(pivot_data: Dict[str, Any]) -> List[list]:
+    table = [["Type", "Category", "TRANS_NON", "TRANS_WORK", "OPEN", "CLOSE"]]
+    for key, values in pivot_data.items():
+        parts = [p.strip() for p in key.split("|")]
+        type_name = parts[0] if len(parts) > 0 else ""
+        category_name = parts[1] if len(parts) > 1 else ""
+        table.append([
+            type_name,
+            category_name,
+            values.get("TRANS_NON", 0),
+            values.get("TRANS_WORK", 0),
+            values.get("OPEN", 0),
+            values.get("CLOSE", 0)
+        ])
+    return table
+
+
+def build_sla_table(sla_data: List[Dict[str, Any]], year: int, month: int) -> Optional[List[list]]:
+    if not sla_data:
+        return None
+    table = [["Ticket No.", "Requested for", "Description", "Time-Arrive", "Business elapsed time", "Remarks"]]
+    for breach in sla_data:
+        table.append([
+            breach.get("ticket_no", ""),
+            breach.get("requested_for", ""),
+            breach.get("description", ""),
+            f"{year}/{month}/27",
+            f"{breach.get('elapsed_time', '')}({breach.get('percentage', '')}%)",
+            breach.get("remarks", "")
+        ])
+    return table
+
+
+def build_dev_efforts_table(dev_efforts_data: Dict[int, Dict[str, Any]], year: int) -> Optional[List[list]]:
+    if not dev_efforts_data:
+        return None
+
+    # ME Hours row
+    me_hours_row = ["ME Hours"]
+    me_total = 0
+    for m in range(1, 13):
+        val = dev_efforts_data.get(m, {}).get("me_hours", "")
+        me_hours_row.append(str(val) if val != "" else "")
+        if val != "":
+            me_total += float(val)
+    me_hours_row.append(str(me_total) if me_total > 0 else "")
+
+    # SOW Planned row (fixed at 16)
+    sow_row = ["SOW Planned"] + ["16"] * 12 + [str(16 * 12)]
+
+    # Carry Forward row
+    cf_row = ["Carry Forward"]
+    cf_total = 0
+    for m in range(1, 13):
+        val = dev_efforts_data.get(m, {}).get("carry_forward", "")
+        cf_row.append(str(val) if val != "" else "")
+        if val != "":
+            cf_total += float(val)
+    cf_row.append(str(cf_total) if cf_total != 0 else "")
+
+    return [
+        [str(year)] + MONTH_LABELS + ["Total"],
+        me_hours_row,
+        sow_row,
+        cf_row
+    ]
+
+
+def build_monthly_sections(
+    monthly_stats: Dict[str, Any],
+    annual_summary: Dict[str, Any],
+    sla_data: List[Dict[str, Any]],
+    dev_efforts_data: Dict[int, Dict[str, Any]],
+    year: int,
+    month: int,
+    chart_renderer
+) -> Dict[str, Any]:
+    """
+    Data Preparation Service: Renders the charts and prepares every table.
+    The result is the keyword arguments of `render_monthly_report`, so one
+    preparation can be rendered with several output profiles.
+    Charts are rendered to in-memory PNGs, not to the shared static/charts
+    files, so concurrent requests never embed each other's charts.
+    """
+    summary = monthly_stats.get("summary", {})
+
+    return {
+        "title": f"Monthly Report - {year}/{month:02d}",
+        "summary_text": f"Total Tickets: {summary.get('total_tickets', 0)} | Closed: {summary.get('closed_tickets', 0)}",
+        "annual_chart": chart_renderer.annual_summary_png(annual_summary, year),
+        "annual_table": build_annual_table(annual_summary),
+        "pie_chart": chart_renderer.monthly_pie_png(monthly_stats["pivot_data"], year, month),
+        "pivot_table": build_pivot_table(monthly_stats.get("pivot_data", {})),
+        "sla_table": build_sla_table(sla_data, year, month),
+        "dev_table": build_dev_efforts_table(dev_efforts_data, year),
+    }
+
+
+def generate_monthly_pdf_service(
+    monthly_stats: Dict[str, Any],
+    annual_summary: Dict[str, Any],
+    sla_data: List[Dict[str, Any]],
+    dev_efforts_data: Dict[int, Dict[str, Any]],
+    year: int,
+    month: int,
+    chart_renderer,
+    path: Optional[str] = None,
+    profile: str = DEFAULT_PROFILE
+) -> bytes:
+    """
+    Data Preparation Service: Prepares the monthly report sections and calls
+    the infrastructure renderer. Returns the PDF bytes.
+    """
+    sections = build_monthly_sections(
+        monthly_stats, annual_summary, sla_data, dev_efforts_data, year, month, chart_renderer
+    )
+    return render_monthly_report(**sections, path=path, profile=profile)
@@ -160,6 +160,21 @@ class MonthlyReportService:
             }
         }
 
+    def aggregate_year_pivots(self, df: pd.DataFrame, year: int, through_month: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        指定年の各月のピボットデータを一括集計する（チャート事前生成用）。
+        データが無い月は結果に含めない。
+        """
+        df = self._normalize_columns(df)
+        last_month = through_month if through_month is not None else 12
+
+        pivots = {}
+        for month in range(1, last_month + 1):
+            stats = self.aggregate_monthly_data(df, year, month)
+            if "error" not in stats:
+                pivots[month] = stats["pivot_data"]
+        return pivots
+
     def get_annual_summary_data(self, df: pd.DataFrame, year: int, target_month: Optional[int] = None) -> Dict[str, Any]:
         """
         年間サマリー（Stacked Bar Chart）用のデータを月別に集計する。
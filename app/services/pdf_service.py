@@ -1,18 +1,146 @@
 from datetime import date
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.platypus import Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import getFont, stringWidth
+import numpy as np
 import pandas as pd
 import os
+from functools import lru_cache
 from app.infra.pdf_renderer import render_workload_report
 
-def generate_pdf_service(data: dict, begin_date: date, end_date: date) -> str:
+CELL_STYLE = getSampleStyleSheet()['Normal']
+# Table cell padding (ReportLab default LEFTPADDING + RIGHTPADDING)
+CELL_PADDING = 12
+HIGHLIGHT_COLOR = colors.dodgerblue
+# Highlighted rows are drawn (and so must be measured) in this font
+BOLD_FONT_NAME = 'Helvetica-Bold'
+
+
+@lru_cache(maxsize=None)
+def max_glyph_width(font_name: str) -> float:
+    """Upper bound of a glyph width in `font_name` relative to the font size."""
+    return max(getFont(font_name).widths) / 1000
+
+
+def format_val(val):
+    if pd.isna(val) or val is None: return ""
+    if isinstance(val, (date, pd.Timestamp)): return val.strftime('%m/%d/%Y')
+    return str(val)
+
+
+def format_column(series: pd.Series) -> np.ndarray:
+    """Formats a whole column to display strings (same rules as format_val)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%m/%d/%Y').fillna("").to_numpy(dtype=object)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        out = series.astype(str).to_numpy(dtype=object)
+        out[series.isna().to_numpy()] = ""
+        return out
+    return series.map(format_val).to_numpy(dtype=object)
+
+
+def needs_wrap(texts: np.ndarray, width, is_bold=None) -> np.ndarray:
+    """
+    Returns a boolean mask of cells whose text may not fit on one line.
+    Rows flagged in `is_bold` are measured in the bold font they are drawn in.
+    A cheap length bound filters out most cells; only the remainder is measured.
+    """
+    if width is None:
+        return np.zeros(len(texts), dtype=bool)
+    if is_bold is None:
+        is_bold = np.zeros(len(texts), dtype=bool)
+    font_size = CELL_STYLE.fontSize
+    available = width - CELL_PADDING
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    glyph_width = np.where(is_bold, max_glyph_width(BOLD_FONT_NAME), max_glyph_width(CELL_STYLE.fontName))
+    mask = lengths * font_size * glyph_width > available
+    for i in np.flatnonzero(mask):
+        font_name = BOLD_FONT_NAME if is_bold[i] else CELL_STYLE.fontName
+        if "\n" not in texts[i] and stringWidth(texts[i], font_name, font_size) <= available:
+            mask[i] = False
+    return mask
+
+
+def highlight_row_styles(is_bold: np.ndarray) -> list:
+    """
+    TableStyle commands that bold/colour highlighted rows (body rows start at 1).
+    Consecutive highlighted rows are merged into one command per run.
+    """
+    cmds = []
+    rows = np.flatnonzero(is_bold) + 1
+    if len(rows) == 0:
+        return cmds
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]]))
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        cmds.append(('FONTNAME', (0, start), (-1, end), BOLD_FONT_NAME))
+        cmds.append(('TEXTCOLOR', (0, start), (-1, end), HIGHLIGHT_COLOR))
+    return cmds
+
+
+def prepare_table_data(df, mapping, widths=None, bold_keys=None, highlight_flag=None):
+    """
+    Unified table data preparation for PDF rendering.
+
+    Columns are formatted as whole arrays and cells stay plain strings.
+    Highlighted rows are styled with row-level TableStyle commands, and a
+    ReportLab Paragraph (markup parsing) is only created for cells whose
+    text needs wrapping.
+
+    Args:
+        df: DataFrame to render
+        mapping: List of (display_name, source_column) tuples
+        widths: Column widths in points (used to decide which cells need wrapping)
+        bold_keys: Set of ticket numbers to highlight (legacy tickets)
+        highlight_flag: Column name containing boolean flag for highlighting (e.g., 'is_new_user')
+
+    Returns:
+        (table_data, style_cmds): list of lists of strings / Paragraphs for the
+        ReportLab Table, and extra TableStyle commands for highlighted rows
+    """
+    bold_keys = bold_keys or set()
+    table_data = [[h for h, _ in mapping]]  # Header row
+    n_rows = len(df)
+    if n_rows == 0:
+        return table_data, []
+
+    # Determine which rows should be highlighted
+    if highlight_flag and highlight_flag in df.columns:
+        is_bold = (df[highlight_flag] == True).to_numpy()
+    elif "Ticket No." in df.columns:
+        is_bold = df["Ticket No."].isin(bold_keys).to_numpy()
+    else:
+        is_bold = np.zeros(n_rows, dtype=bool)
+
+    columns = []
+    for col_idx, (_, source_col) in enumerate(mapping):
+        if source_col in df.columns:
+            texts = format_column(df[source_col])
+        else:
+            texts = np.full(n_rows, "", dtype=object)
+
+        width = widths[col_idx] if widths and col_idx < len(widths) else None
+        cells = texts.copy()
+        for i in np.flatnonzero(needs_wrap(texts, width, is_bold)):
+            val = escape(texts[i])
+            para_val = f'<b><font color="dodgerblue">{val}</font></b>' if is_bold[i] else val
+            cells[i] = Paragraph(para_val, CELL_STYLE)
+        columns.append(cells)
+
+    table_data.extend(list(row) for row in zip(*columns))
+    return table_data, highlight_row_styles(is_bold)
+
+
+def generate_pdf_service(data: dict, begin_date: date, end_date: date) -> bytes:
     """
     Data Preparation Service: Prepares the DTO and calls the infrastructure renderer.
     Contains formatting logic (e.g., bolding rows) but NO selection/sorting logic.
+    Returns the rendered PDF as bytes (built in memory, no shared output file).
     """
-    styles = getSampleStyleSheet()
-    
     # Selection of columns for different sections (moved to service)
     LEFT_COLUMNS = [("Ticket #", "Ticket No."), ("Description", "Request Detail"), ("Remarks", "Remarks")]
     RIGHT_COLUMNS = [
@@ -24,46 +152,8 @@ def generate_pdf_service(data: dict, begin_date: date, end_date: date) -> str:
         ("Ticket No", "Ticket No"), ("Date Created", "Date Created"), ("User Name", "User Name"), 
         ("Function / Department", "Function / Department"), ("Email address", "Email address")
     ]
-
-    def format_val(val):
-        if pd.isna(val) or val is None: return ""
-        if isinstance(val, (date, pd.Timestamp)): return val.strftime('%m/%d/%Y')
-        return str(val)
-
-    def prepare_table_data(df, mapping, bold_keys=None, highlight_flag=None):
-        """
-        Unified table data preparation for PDF rendering.
-        
-        Args:
-            df: DataFrame to render
-            mapping: List of (display_name, source_column) tuples
-            bold_keys: Set of ticket numbers to highlight (legacy tickets)
-            highlight_flag: Column name containing boolean flag for highlighting (e.g., 'is_new_user')
-        
-        Returns:
-            List of lists containing Paragraph objects for ReportLab Table
-        """
-        bold_keys = bold_keys or set()
-        table_data = [[h for h, _ in mapping]]  # Header row
-        
-        for _, row in df.iterrows():
-            line = []
-            
-            # Determine if row should be highlighted
-            is_bold = False
-            if highlight_flag and highlight_flag in row:
-                is_bold = row[highlight_flag] == True
-            elif row.get("Ticket No.") in bold_keys:
-                is_bold = True
-            
-            # Build row cells
-            for _, source_col in mapping:
-                val = format_val(row.get(source_col))
-                para_val = f'<b><font color="dodgerblue">{val}</font></b>' if is_bold else val
-                line.append(Paragraph(para_val, styles['Normal']))
-            table_data.append(line)
-        
-        return table_data
+    LEFT_WIDTHS = [1.5*inch, 6.0*inch, 3.3*inch]
+    RIGHT_WIDTHS = [1.1*inch, 0.7*inch, 1.0*inch, 0.7*inch, 3.25*inch, 1.25*inch, 0.95*inch, 0.9*inch, 0.9*inch]
 
     # Prepare Data Structures
     left_df = data["left_df"]
@@ -76,17 +166,22 @@ def generate_pdf_service(data: dict, begin_date: date, end_date: date) -> str:
         f"<b>Summary:</b> {data['summary']['closed_count']} closed, {data['summary']['open_count']} open."
     ]
 
+    left_data, left_styles = prepare_table_data(left_df, LEFT_COLUMNS, LEFT_WIDTHS, bold_keys=left_ticket_nos)
+    right_data, right_styles = prepare_table_data(right_df, RIGHT_COLUMNS, RIGHT_WIDTHS, bold_keys=left_ticket_nos)
+
     sections = [
         {
             "title": "Weekly Activity (Date Range Based)",
-            "data": prepare_table_data(left_df, LEFT_COLUMNS, bold_keys=left_ticket_nos),
-            "widths": [1.5*inch, 6.0*inch, 3.3*inch],
+            "data": left_data,
+            "styles": left_styles,
+            "widths": LEFT_WIDTHS,
             "empty_msg": "No activity found in this period."
         },
         {
             "title": "Weekly Workload Details",
-            "data": prepare_table_data(right_df, RIGHT_COLUMNS, bold_keys=left_ticket_nos),
-            "widths": [1.1*inch, 0.7*inch, 1.0*inch, 0.7*inch, 3.25*inch, 1.25*inch, 0.95*inch, 0.9*inch, 0.9*inch],
+            "data": right_data,
+            "styles": right_styles,
+            "widths": RIGHT_WIDTHS,
             "empty_msg": "No workload details found."
         }
     ]
@@ -119,9 +214,13 @@ def generate_pdf_service(data: dict, begin_date: date, end_date: date) -> str:
         else:
             dynamic_widths = []
         
+        new_users_data, new_users_styles = prepare_table_data(
+            new_users_df, dynamic_new_users_cols, dynamic_widths, highlight_flag='is_new_user'
+        )
         sections.append({
             "title": "New Users",
-            "data": prepare_table_data(new_users_df, dynamic_new_users_cols, highlight_flag='is_new_user'),
+            "data": new_users_data,
+            "styles": new_users_styles,
             "widths": dynamic_widths,
             "empty_msg": "No new users found."
         })
@@ -131,7 +230,6 @@ def generate_pdf_service(data: dict, begin_date: date, end_date: date) -> str:
 
     # Call Infrastructure Renderer
     return render_workload_report(
-        path=os.path.join(os.path.dirname(__file__), "../../report.pdf"), # Temporary file location strategy
         logo_path=logo_path,
         title="IFS AMS Workload Summary",
         subtitle="For NAFTA Marelli USA",
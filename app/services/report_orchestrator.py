@@ -1,10 +1,31 @@
 from datetime import date
-from typing import Dict, Any
+from typing import Dict, Any, Union, BinaryIO
+from app.infra.dataset_cache import get_dataset_cache
 from app.infra.excel_repository import load_excel_data
+from app.infra.pdf_cache import content_hash
+from app.infra.stage_executor import stage
 from app.services.report_parser import process_report_data
 
+
+def workbook_hash(workbook: Union[str, BinaryIO]) -> str:
+    if isinstance(workbook, str):
+        with open(workbook, "rb") as f:
+            return content_hash(f.read())
+    position = workbook.tell()
+    digest = content_hash(workbook.read())
+    workbook.seek(position)
+    return digest
+
+
+def load_workbook_sheets(workbook: Union[str, BinaryIO]):
+    """All sheets of the workbook, served from the shared dataset cache when it was parsed before."""
+    return get_dataset_cache().get_or_load(
+        f"sheets-{workbook_hash(workbook)}", lambda: load_excel_data(workbook)
+    )
+
+
 def get_weekly_report_data(
-    daily_excel_path: str,
+    daily_excel_path: Union[str, BinaryIO],
     begin_date: date,
     end_date: date,
 ) -> Dict[str, Any]:
@@ -14,9 +35,14 @@ def get_weekly_report_data(
     2. Processes/Filters/Summarizes via Service Logic.
     """
     # 1. Load raw data from Infra
-    all_sheets = load_excel_data(daily_excel_path)
+    with stage("parse") as timing:
+        all_sheets = load_workbook_sheets(daily_excel_path)
+        timing["sheets"] = len(all_sheets)
+        timing["rows"] = sum(len(df) for df in all_sheets.values())
     
     # 2. Process data via pure service logic
-    data = process_report_data(all_sheets, begin_date, end_date)
+    with stage("aggregate") as timing:
+        data = process_report_data(all_sheets, begin_date, end_date)
+        timing["rows"] = sum(len(data[key]) for key in ("left_df", "right_df", "new_users_df"))
     
     return data
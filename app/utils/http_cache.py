@@ -0,0 +1,47 @@
+"""
+HTTP caching helpers (ETag / conditional requests, response compression).
+"""
+from typing import Optional
+
+
+def make_etag(value: str) -> str:
+    """Strong ETag for an opaque value (e.g. a content hash)."""
+    return f'"{value}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True if an If-None-Match header matches the given strong ETag.
+    Supports lists ("a", "b") and the "*" wildcard; weak validators never match.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if an Accept-Encoding header allows gzip (honours q=0 and the "*" wildcard)."""
+    if not accept_encoding:
+        return False
+    allowed = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "gzip":
+            return q > 0
+        allowed = q > 0
+    return bool(allowed)
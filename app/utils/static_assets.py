@@ -0,0 +1,121 @@
+"""
+Static asset helpers: the in-memory index page and content-versioned /static URLs.
+
+URLs built with versioned_url() carry `?v=<content hash>`. A request whose version
+matches the file on disk is served with a far-future, immutable Cache-Control;
+any other /static request must revalidate (ETag / Last-Modified, 304).
+A chart redrawn under the same file name gets a new version, and so a new URL.
+"""
+import hashlib
+import os
+import re
+import threading
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+
+STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "static"))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+VERSION_LENGTH = 12
+
+_STATIC_REF = re.compile(r'(\b(?:src|href)=")(/static/[^"?#]+)(")')
+
+
+def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class AssetVersions:
+    """Content hash per file, recomputed only when the file's stat signature changes."""
+
+    def __init__(self):
+        self._versions: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def version(self, path: str) -> Optional[str]:
+        path = os.path.abspath(path)
+        signature = _signature(path)
+        if signature is None:
+            return None
+        with self._lock:
+            cached = self._versions.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        version = digest.hexdigest()[:VERSION_LENGTH]
+        with self._lock:
+            self._versions[path] = (signature, version)
+        return version
+
+
+_asset_versions = AssetVersions()
+
+
+def asset_version(path: str) -> Optional[str]:
+    return _asset_versions.version(path)
+
+
+def versioned_url(url: str, path: str) -> str:
+    """`url` (the /static URL of the file at `path`) with its content version appended."""
+    version = asset_version(path)
+    return f"{url}?v={version}" if version else url
+
+
+class CachedPage:
+    """
+    An HTML page held in memory with its ETag and Last-Modified.
+    Each request only stats the page and the /static files it references;
+    the page is re-read (and its asset URLs re-versioned) when one of them changed.
+    """
+
+    def __init__(self, path: str, static_dir: str = STATIC_DIR):
+        self.path = path
+        self.static_dir = static_dir
+        self._lock = threading.Lock()
+        self._signature = None
+        self._assets: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+
+    def _asset_path(self, url: str) -> str:
+        return os.path.join(self.static_dir, *url[len("/static/"):].split("/"))
+
+    def _stale(self, signature) -> bool:
+        return signature != self._signature or any(
+            _signature(path) != seen for path, seen in self._assets.items()
+        )
+
+    def _load(self, signature):
+        with open(self.path, "r", encoding="utf-8") as f:
+            html = f.read()
+        assets = {}
+
+        def versioned(match):
+            path = self._asset_path(match.group(2))
+            assets[path] = _signature(path)
+            return f"{match.group(1)}{versioned_url(match.group(2), path)}{match.group(3)}"
+
+        self.body = _STATIC_REF.sub(versioned, html).encode("utf-8")
+        self._assets = assets
+        self._signature = signature
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        newest = max([signature[1]] + [s[1] for s in assets.values() if s is not None])
+        self.last_modified = formatdate(newest / 1e9, usegmt=True)
+
+    def get(self) -> Optional["CachedPage"]:
+        """The current page (None if the file does not exist)."""
+        signature = _signature(self.path)
+        if signature is None:
+            return None
+        with self._lock:
+            if self.body is None or self._stale(signature):
+                self._load(signature)
+            return self
@@ -0,0 +1,95 @@
+"""
+Benchmark: PDF table preparation for the weekly report.
+
+Compares the legacy per-row path (iterrows + format_val + one Paragraph per
+cell) with the vectorized prepare_table_data, and times a full
+render_workload_report build as one long Table and as a ChunkedTable
+(page-sized sub-tables), at 1k and 10k rows.
+
+Usage:
+    python benchmarks/bench_pdf_tables.py [rows ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph
+
+from app.services.pdf_service import CELL_STYLE, format_val, prepare_table_data
+from app.infra.pdf_renderer import CHUNK_ROWS, render_workload_report
+
+RIGHT_COLUMNS = [
+    ("Ticket #", "Ticket No."), ("Status", "Status"), ("REQ No.", "REQ No."),
+    ("Type", "Type"), ("Description", "Request Detail"), ("Requested for", "Requested for"),
+    ("PIC", "Assign To"), ("Received", "Time - Arrive"), ("Resolved", "Time - Close")
+]
+RIGHT_WIDTHS = [1.1*inch, 0.7*inch, 1.0*inch, 0.7*inch, 3.25*inch, 1.25*inch, 0.95*inch, 0.9*inch, 0.9*inch]
+
+
+def make_df(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    arrive = pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 30, n_rows), unit="D")
+    details = ["Reset password", "Printer not working after the latest Windows update on the shop floor PC",
+               "Create account", "Permissions control for the finance shared folder and related distribution lists"]
+    return pd.DataFrame({
+        "Ticket No.": [f"TKT-{i:06d}" for i in range(n_rows)],
+        "Status": rng.choice(["OPEN", "CLOSE"], n_rows),
+        "REQ No.": [f"REQ{i}" for i in range(n_rows)],
+        "Type": rng.choice(["Incident", "Service"], n_rows),
+        "Request Detail": rng.choice(details, n_rows),
+        "Requested for": rng.choice(["Alice Smith", "Bob Jones", "Carol White"], n_rows),
+        "Assign To": rng.choice(["Tatsuo", "Ken"], n_rows),
+        "Time - Arrive": arrive,
+        "Time - Close": arrive.where(rng.random(n_rows) > 0.5) + pd.Timedelta(days=1),
+    })
+
+
+def legacy_prepare_table_data(df, mapping, bold_keys):
+    """Previous implementation: iterrows + Paragraph for every cell."""
+    table_data = [[h for h, _ in mapping]]
+    for _, row in df.iterrows():
+        is_bold = row.get("Ticket No.") in bold_keys
+        line = []
+        for _, source_col in mapping:
+            val = format_val(row.get(source_col))
+            para_val = f'<b><font color="dodgerblue">{val}</font></b>' if is_bold else val
+            line.append(Paragraph(para_val, CELL_STYLE))
+        table_data.append(line)
+    return table_data
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(row_counts):
+    print(f"{'rows':>7} {'legacy prep':>12} {'fast prep':>10} {'speedup':>8} "
+          f"{'legacy pdf':>11} {'fast pdf':>9} {'chunked pdf':>12}")
+    for n_rows in row_counts:
+        df = make_df(n_rows)
+        bold_keys = set(df.loc[df["Status"] == "OPEN", "Ticket No."])
+
+        legacy_prep, legacy_data = timed(legacy_prepare_table_data, df, RIGHT_COLUMNS, bold_keys)
+        fast_prep, (fast_data, fast_styles) = timed(prepare_table_data, df, RIGHT_COLUMNS, RIGHT_WIDTHS, bold_keys=bold_keys)
+
+        def render(data, styles=None, chunk_rows=n_rows + 1):
+            section = {"title": "Weekly Workload Details", "data": data, "styles": styles, "widths": RIGHT_WIDTHS}
+            return render_workload_report(logo_path="", title="Benchmark", subtitle="", summary_items=[],
+                                          sections=[section], chunk_rows=chunk_rows)
+
+        legacy_pdf, _ = timed(render, legacy_data)
+        fast_pdf, _ = timed(render, fast_data, fast_styles)
+        chunked_pdf, _ = timed(render, fast_data, fast_styles, CHUNK_ROWS)
+        print(f"{n_rows:>7} {legacy_prep:>11.2f}s {fast_prep:>9.2f}s {legacy_prep / fast_prep:>7.1f}x "
+              f"{legacy_pdf:>10.2f}s {fast_pdf:>8.2f}s {chunked_pdf:>11.2f}s")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
@@ -1,5 +1,43 @@
+"""
+Starts the report API.
+
+    python run_api.py                               # single process (default)
+    JOBS_API=0 python run_api.py --workers auto     # one worker process per CPU core
+    JOBS_API=0 python run_api.py --workers 4 --host 0.0.0.0 --port 8000
+
+API_WORKERS / API_HOST / API_PORT set the same options from the environment.
+Workers share the parsed-workbook datasets (cache/datasets), the PDF cache
+(cache/pdf), the rendered charts (static/charts) and the SLA / Dev Efforts
+data on disk, so an upload is parsed once however many workers serve it
+(each worker still loads its own copy of a dataset it reads).
+Background jobs (/jobs) live in the worker that accepted them, so a poll that
+reached another worker would not find them: more than one worker is refused
+unless the /jobs routes are turned off with JOBS_API=0.
+"""
+import argparse
+import os
+
 import uvicorn
 
+from app.infra.job_queue import jobs_api_enabled
+
+
+def parse_workers(value: str) -> int:
+    if value == "auto":
+        return os.cpu_count() or 1
+    workers = int(value)
+    if workers < 1:
+        raise argparse.ArgumentTypeError("workers must be >= 1 or 'auto'")
+    return workers
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=False)
+    parser = argparse.ArgumentParser(description="Run the report API")
+    parser.add_argument("--workers", type=parse_workers, default=parse_workers(os.environ.get("API_WORKERS", "1")))
+    parser.add_argument("--host", default=os.environ.get("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("API_PORT", "8000")))
+    args = parser.parse_args()
+    if args.workers > 1 and jobs_api_enabled():
+        parser.error("--workers > 1 requires JOBS_API=0 (background jobs are kept in the worker that accepted them)")
 
+    uvicorn.run("app.main:app", host=args.host, port=args.port, reload=False, workers=args.workers)
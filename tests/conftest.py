@@ -0,0 +1,69 @@
+import io
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def weekly_workbook() -> bytes:
+    """Small in-memory daily-work workbook with current/previous year sheets."""
+    import pandas as pd
+
+    year = datetime.now().year
+    rows = [
+        {"Date": f"{year}-01-05", "Ticket No.": "TKT-001", "REQ No.": "REQ1", "Type": "Incident",
+         "Requested for": "Alice", "Assign To": "Bob", "Request Detail": "Printer <broken> & more",
+         "Time - Arrive": f"{year}-01-05", "Time - Close": None, "Remarks": "", "Status": "OPEN",
+         "Category": "Miscellaneous", "Date Created": f"{year}-01-05"},
+        {"Date": f"{year}-01-06", "Ticket No.": "TKT-002", "REQ No.": "REQ2", "Type": "Service",
+         "Requested for": "Carol", "Assign To": "Bob", "Request Detail": "Reset password",
+         "Time - Arrive": f"{year}-01-06", "Time - Close": f"{year}-01-07", "Remarks": "done", "Status": "CLOSE",
+         "Category": "Reset password", "Date Created": f"{year}-01-06"},
+    ]
+    previous = [
+        {"Date": f"{year - 1}-12-20", "Ticket No.": "TKT-000", "REQ No.": "REQ0", "Type": "Incident",
+         "Requested for": "Dan", "Assign To": "Eve", "Request Detail": "VPN", "Time - Arrive": f"{year - 1}-12-20",
+         "Time - Close": None, "Remarks": "", "Status": "OPEN", "Category": "Miscellaneous",
+         "Date Created": f"{year - 1}-12-20"},
+    ]
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame(rows).to_excel(writer, sheet_name=str(year), index=False)
+        pd.DataFrame(previous).to_excel(writer, sheet_name=str(year - 1), index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def isolated_pdf_cache(tmp_path, monkeypatch):
+    """Keeps the PDF artifact cache out of the project tree during tests."""
+    from app.infra import pdf_cache
+    from app.infra.artifact_store import ArtifactStore
+
+    cache = pdf_cache.PdfCache(ArtifactStore(str(tmp_path / "pdf_cache")))
+    monkeypatch.setattr(pdf_cache, "_pdf_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_dataset_cache(tmp_path, monkeypatch):
+    """Keeps parsed-workbook datasets out of the project tree during tests."""
+    from app.infra import dataset_cache
+    from app.infra.artifact_store import ArtifactStore
+
+    cache = dataset_cache.DatasetCache(ArtifactStore(str(tmp_path / "dataset_cache")))
+    monkeypatch.setattr(dataset_cache, "_dataset_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_repositories(tmp_path, monkeypatch):
+    """SQLite-backed SLA / Dev Efforts repositories in a temporary database."""
+    from app.infra import data_repository
+    from app.infra.sqlite_store import SqliteStore, SqliteSlaRepository, SqliteDevEffortsRepository
+
+    store = SqliteStore(tmp_path / "report_data.db")
+    monkeypatch.setattr(data_repository, "_repositories", {
+        "sla": SqliteSlaRepository(store),
+        "dev_efforts": SqliteDevEffortsRepository(store),
+    })
+    return store
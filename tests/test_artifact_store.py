@@ -0,0 +1,88 @@
+import os
+from app.infra.artifact_store import ArtifactStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_artifact(root, name, size):
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    clock = FakeClock()
+    store = ArtifactStore(str(tmp_path), max_bytes=250, ttl_seconds=None, clock=clock)
+
+    a = write_artifact(str(tmp_path), "charts/a.png", 100)
+    store.register(a)
+    clock.now += 1
+    b = write_artifact(str(tmp_path), "charts/b.png", 100)
+    store.register(b)
+    clock.now += 1
+    store.touch(a)  # a is now more recent than b
+    clock.now += 1
+    c = write_artifact(str(tmp_path), "charts/c.png", 100)
+    store.register(c)
+
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+    assert os.path.exists(c)
+    assert store.total_bytes == 200
+    assert store.lookup("charts/b.png") is None
+
+
+def test_ttl_expiry_and_index_reload(tmp_path):
+    clock = FakeClock()
+    store = ArtifactStore(str(tmp_path), max_bytes=10_000, ttl_seconds=60, clock=clock)
+    path = write_artifact(str(tmp_path), "Monthly_Report_2025_12.pdf", 10)
+    store.register(path)
+
+    reloaded = ArtifactStore(str(tmp_path), max_bytes=10_000, ttl_seconds=60, clock=clock)
+    assert reloaded.lookup("Monthly_Report_2025_12.pdf") == path
+
+    clock.now += 120
+    assert reloaded.lookup("Monthly_Report_2025_12.pdf") is None
+    assert not os.path.exists(path)
+
+
+def test_unregistered_files_are_never_evicted(tmp_path):
+    index_html = write_artifact(str(tmp_path), "index.html", 500)
+    store = ArtifactStore(str(tmp_path), max_bytes=0, ttl_seconds=None)
+    store.register(write_artifact(str(tmp_path), "charts/a.png", 10))
+    store.evict()
+    assert os.path.exists(index_html)
+
+
+def test_stores_in_different_workers_share_the_index(tmp_path):
+    first = ArtifactStore(str(tmp_path), ttl_seconds=None)
+    second = ArtifactStore(str(tmp_path), ttl_seconds=None)
+
+    a = write_artifact(str(tmp_path), "charts/a.png", 10)
+    b = write_artifact(str(tmp_path), "charts/b.png", 10)
+    first.register(a)
+    second.register(b)  # must not drop a.png written by the other store
+
+    assert second.lookup("charts/a.png") == a
+    assert first.lookup("charts/b.png") == b
+    assert ArtifactStore(str(tmp_path), ttl_seconds=None).total_bytes == 20
+
+
+def test_index_can_live_outside_the_served_directory(tmp_path):
+    served, private = tmp_path / "static", tmp_path / "cache"
+    store = ArtifactStore(str(served), ttl_seconds=None, index_name="static_index.json", index_dir=str(private))
+    a = write_artifact(str(served), "charts/a.png", 10)
+    store.register(a)
+
+    assert sorted(os.listdir(served)) == ["charts"]
+    assert sorted(os.listdir(private)) == ["static_index.json", "static_index.json.lock"]
+    reloaded = ArtifactStore(str(served), ttl_seconds=None, index_name="static_index.json", index_dir=str(private))
+    assert reloaded.lookup("charts/a.png") == a
@@ -0,0 +1,97 @@
+import io
+import json
+import zipfile
+from datetime import datetime
+
+import openpyxl
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def make_template() -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "IFS"
+    for col, header in enumerate(["ServiceNow Ticket #", "Description", "Type", "PIC", "Received"], start=8):
+        ws.cell(row=2, column=col).value = header
+    ws.cell(row=7, column=3).value = "Period:"
+    wb.create_sheet("New User")
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def post_bundle(workbook: bytes, template: bytes = None, outputs: str = None):
+    year = datetime.now().year
+    files = {"file": ("daily.xlsx", workbook, XLSX)}
+    if template is not None:
+        files["template"] = ("template.xlsx", template, XLSX)
+    data = {"begin_date": f"{year}-01-01", "end_date": f"{year}-01-10"}
+    if outputs is not None:
+        data["outputs"] = outputs
+    return client.post("/bundle", data=data, files=files)
+
+
+def test_bundle_json_and_pdf(weekly_workbook):
+    response = post_bundle(weekly_workbook)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    year = datetime.now().year
+    names = sorted(archive.namelist())
+    assert names == [f"alphast_SNOW_report_{year}_01_10.json", f"alphast_SNOW_report_{year}_01_10.pdf"]
+
+    payload = json.loads(archive.read(names[0]))
+    assert payload["summary"]["open_count"] >= 1
+    assert archive.read(names[1]).startswith(b"%PDF")
+
+
+def test_bundle_with_excel_template(weekly_workbook):
+    response = post_bundle(weekly_workbook, template=make_template(), outputs="xlsx")
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    (name,) = archive.namelist()
+    ws = openpyxl.load_workbook(io.BytesIO(archive.read(name)))["IFS"]
+    tickets = [ws.cell(row=r, column=8).value for r in range(3, 6)]
+    assert "TKT-001" in tickets
+    assert "closed" in ws.cell(row=7, column=4).value
+
+
+def with_new_users(workbook: bytes) -> bytes:
+    year = datetime.now().year
+    wb = openpyxl.load_workbook(io.BytesIO(workbook))
+    ws = wb.create_sheet("New Users")
+    ws.append(["Ticket No", "Date Created", "User Name", "Email address"])
+    ws.append(["TKT-010", datetime(year, 1, 8), "Frank", "frank@example.com"])
+    ws.append(["TKT-011", datetime(year - 1, 11, 2), "Grace", "grace@example.com"])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def test_bundle_excel_writes_new_users_sheet(weekly_workbook):
+    response = post_bundle(with_new_users(weekly_workbook), template=make_template(), outputs="xlsx")
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    (name,) = archive.namelist()
+    wb = openpyxl.load_workbook(io.BytesIO(archive.read(name)))
+    tickets = [wb["IFS"].cell(row=r, column=8).value for r in range(3, 6)]
+    assert "TKT-001" in tickets
+    assert "TKT-002" not in tickets
+    users = wb["New User"]
+    assert [c.value for c in users[3]][:4] == ["TKT-010", datetime(datetime.now().year, 1, 8), "Frank",
+                                              "frank@example.com"]
+    assert users.cell(row=4, column=1).value is None
+
+
+def test_bundle_rejects_xlsx_without_template(weekly_workbook):
+    response = post_bundle(weekly_workbook, outputs="json,xlsx")
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error_code"] == "TEMPLATE_REQUIRED"
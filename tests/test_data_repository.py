@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+
+import pytest
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.infra import json_store
+from app.infra.json_store import JsonDevEffortsRepository
+from app.infra.sla_journal import JournalSlaRepository
+from app.infra.sqlite_store import SqliteStore, SqliteSlaRepository, SqliteDevEffortsRepository, import_json_data
+
+client = TestClient(app)
+
+BREACH = {"ticket_no": "INC1", "requested_for": "Alice", "description": "VPN", "percentage": "120",
+          "elapsed_time": "3h", "remarks": ""}
+
+
+def test_sla_api_roundtrip():
+    breaches = [dict(BREACH, ticket_no=f"INC{i}") for i in range(1, 4)]
+    assert client.post("/api/sla/2025/3", json={"year": 2025, "month": 3, "breaches": breaches}).status_code == 200
+
+    saved = client.get("/api/sla/2025/3").json()["breaches"]
+    assert [(b["id"], b["ticket_no"]) for b in saved] == [(1, "INC1"), (2, "INC2"), (3, "INC3")]
+    assert saved[0]["created_at"]
+
+    # ids stay stable after a delete
+    assert client.delete("/api/sla/2025/3/2").status_code == 200
+    saved = client.get("/api/sla/2025/3").json()["breaches"]
+    assert [(b["id"], b["ticket_no"]) for b in saved] == [(1, "INC1"), (3, "INC3")]
+
+    assert client.delete("/api/sla/2025/3/9").status_code == 404
+    assert client.delete("/api/sla/2025/4/1").status_code == 404
+    assert list(client.get("/api/sla/all").json()) == ["2025-03"]
+
+
+def test_dev_efforts_api_roundtrip():
+    response = client.post("/api/dev-efforts", json={"month": "2025-02", "me_hours": 10, "carry_forward": 0})
+    assert response.json()["carry_forward"] == 6.0
+    client.post("/api/dev-efforts", json={"month": "2025-02", "me_hours": 12, "carry_forward": 0})
+
+    assert client.get("/api/dev-efforts/2025-02").json()["me_hours"] == 12
+    assert client.delete("/api/dev-efforts/2025-02").status_code == 200
+    assert client.get("/api/dev-efforts/2025-02").json() is None
+    assert client.delete("/api/dev-efforts/2025-02").status_code == 404
+
+
+def test_concurrent_saves_keep_every_month(isolated_data_repositories):
+    repo = SqliteDevEffortsRepository(isolated_data_repositories)
+
+    def save(month):
+        repo.save(f"2025-{month:02d}", {"me_hours": month, "sow_planned": 16.0, "carry_forward": 16.0 - month})
+
+    threads = [threading.Thread(target=save, args=(m,)) for m in range(1, 13)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(repo.get_year(2025)) == list(range(1, 13))
+
+
+def test_import_json_data_once(tmp_path):
+    sla_file = tmp_path / "sla.json"
+    dev_file = tmp_path / "dev.json"
+    sla_file.write_text(json.dumps({"monthly_data": {"2025-12": {
+        "year": 2025, "month": 12, "updated_at": "t",
+        "breaches": [dict(BREACH, id=1, created_at="c")]
+    }}}), encoding="utf-8")
+    dev_file.write_text(json.dumps({"monthly_data": {"2025-12": {
+        "me_hours": 4.0, "sow_planned": 16.0, "carry_forward": 12.0, "last_updated": "t"
+    }}}), encoding="utf-8")
+
+    store = SqliteStore(tmp_path / "data.db")
+    assert import_json_data(store, sla_file, dev_file) is True
+    assert import_json_data(store, sla_file, dev_file) is False
+
+    # Same data as the JSON backend exposes for the same files
+    assert SqliteSlaRepository(store).all_months() == JournalSlaRepository(sla_file, tmp_path / "sla.jsonl").all_months()
+    assert SqliteDevEffortsRepository(store).get_year(2025) == JsonDevEffortsRepository(dev_file).get_year(2025)
+
+
+def test_json_store_serves_reads_from_memory(tmp_path):
+    path = tmp_path / "dev.json"
+    repo = JsonDevEffortsRepository(path)
+    repo.save("2025-01", {"me_hours": 1.0, "sow_planned": 16.0, "carry_forward": 15.0, "last_updated": "t"})
+    repo.file.flush()
+
+    # Unchanged file: served from memory without re-parsing
+    parsed = repo.file.read(lambda data: data)
+    assert repo.file.read(lambda data: data) is parsed
+    assert JsonDevEffortsRepository(path).get("2025-01")["me_hours"] == 1.0
+
+    # Edited outside the process: mtime/size change triggers a reload
+    stat = path.stat()
+    path.write_text(json.dumps({"monthly_data": {"2025-01": {"me_hours": 2.5}}}), encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert repo.get("2025-01")["me_hours"] == 2.5
+
+
+def test_json_store_coalesces_saves_and_merges_external_changes(tmp_path):
+    path = tmp_path / "dev.json"
+    repo = JsonDevEffortsRepository(path)
+    writes = []
+    original_write = json_store.atomic_write
+    json_store.atomic_write = lambda p, data: (writes.append(p), original_write(p, data))
+    try:
+        for month in range(1, 13):
+            repo.save(f"2025-{month:02d}", {"me_hours": month})
+        assert repo.get("2025-12") == {"me_hours": 12}  # visible before the flush
+
+        # Another process writes a month while ours are still pending
+        path.write_text(json.dumps({"monthly_data": {"2024-12": {"me_hours": 7}}}), encoding="utf-8")
+        repo.file.flush()
+    finally:
+        json_store.atomic_write = original_write
+
+    assert len(writes) == 1
+    on_disk = json.loads(path.read_text(encoding="utf-8"))["monthly_data"]
+    assert on_disk["2024-12"] == {"me_hours": 7}
+    assert len(on_disk) == 13
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_dev_efforts_year_endpoint():
+    client.post("/api/dev-efforts", json={"month": "2025-01", "me_hours": 10, "carry_forward": 0})
+    client.post("/api/dev-efforts", json={"month": "2025-03", "me_hours": 20, "carry_forward": 0})
+    client.post("/api/dev-efforts", json={"month": "2024-03", "me_hours": 99, "carry_forward": 0})
+
+    data = client.get("/api/dev-efforts/year/2025").json()
+
+    assert sorted(data["months"]) == ["1", "3"]
+    assert data["months"]["3"]["carry_forward"] == -4.0
+    assert data["totals"] == {"me_hours": 30.0, "sow_planned": 192.0, "carry_forward": 2.0}
+
+
+def test_monthly_context_endpoint():
+    client.post("/api/sla/2025/3", json={"year": 2025, "month": 3, "breaches": [BREACH]})
+    client.post("/api/dev-efforts", json={"month": "2025-01", "me_hours": 10, "carry_forward": 0})
+
+    data = client.get("/monthly/context/2025/3").json()
+    assert [b["ticket_no"] for b in data["sla_breaches"]] == ["INC1"]
+    assert list(data["dev_efforts"]) == ["1"]
+    assert data["has_sla_data"] is True
+    assert data["has_dev_efforts_data"] is False
+
+    data = client.get("/monthly/context/2025/1").json()
+    assert (data["has_sla_data"], data["has_dev_efforts_data"]) == (False, True)
+    assert client.get("/monthly/context/2025/13").status_code == 400
+
+
+def test_sla_save_records_only_changes():
+    breaches = [dict(BREACH, ticket_no=f"INC{i}") for i in range(1, 4)]
+    saved = client.post("/api/sla/2025/5", json={"year": 2025, "month": 5, "breaches": breaches}).json()["breaches"]
+    assert [b["id"] for b in saved] == [1, 2, 3]
+
+    # Resave with ids: one edit, one removal, one new entry
+    resave = [dict(saved[0]), dict(saved[2], remarks="escalated"), dict(BREACH, ticket_no="INC4")]
+    saved = client.post("/api/sla/2025/5", json={"year": 2025, "month": 5, "breaches": resave}).json()["breaches"]
+    assert [(b["id"], b["ticket_no"]) for b in saved] == [(1, "INC1"), (3, "INC3"), (4, "INC4")]
+
+    # Deleted ids are never reused
+    assert client.delete("/api/sla/2025/5/4").status_code == 200
+    added = client.post("/api/sla/2025/5/breaches", json=dict(BREACH, ticket_no="INC5")).json()
+    assert added["id"] == 5
+    assert client.put("/api/sla/2025/5/1", json=dict(BREACH, remarks="closed")).json()["remarks"] == "closed"
+    assert client.put("/api/sla/2025/5/9", json=BREACH).status_code == 404
+
+    history = client.get("/api/sla/2025/5/history").json()["history"]
+    assert [(h["op"], h["id"]) for h in history] == [
+        ("add", 1), ("add", 2), ("add", 3),
+        ("update", 3), ("add", 4), ("delete", 2),
+        ("delete", 4), ("add", 5), ("update", 1),
+    ]
+
+
+def test_sla_journal_replays_and_compacts(tmp_path):
+    snapshot, journal = tmp_path / "sla.json", tmp_path / "sla.jsonl"
+    repo = JournalSlaRepository(snapshot, journal, compact_bytes=10 ** 9)
+    repo.save_month(2025, 6, [BREACH, dict(BREACH, ticket_no="INC2")], updated_at="t1")
+    repo.delete_breach(2025, 6, 1, updated_at="t2")
+    size = journal.stat().st_size
+    repo.add_breach(2025, 6, dict(BREACH, ticket_no="INC3"), updated_at="t3")
+    assert journal.stat().st_size > size  # an edit is an append
+    assert not snapshot.exists()
+
+    # Another instance (e.g. another worker) sees the same view from the journal
+    other = JournalSlaRepository(snapshot, journal)
+    assert [(b["id"], b["ticket_no"]) for b in other.get_month(2025, 6)] == [(2, "INC2"), (3, "INC3")]
+
+    repo.compact()
+    lines = journal.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 4  # history is kept
+
+    # A torn final line is ignored; the snapshot plus the journal tail rebuild the view
+    with open(journal, "ab") as f:
+        f.write(b'{"seq": 99, "op"')
+    reopened = JournalSlaRepository(snapshot, journal)
+    assert reopened.all_months() == repo.all_months()
+    assert reopened.add_breach(2025, 6, BREACH, updated_at="t4")["id"] == 4
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 5
+    assert [h["op"] for h in reopened.history(2025, 6)] == ["add", "add", "delete", "add", "add"]
+
+
+def test_repository_without_change_cannot_be_created():
+    from app.infra.data_repository import SlaRepository
+
+    class Incomplete(SlaRepository):
+        def get_month(self, year, month):
+            return []
+
+    with pytest.raises(TypeError, match="_change"):
+        Incomplete()
@@ -0,0 +1,42 @@
+import io
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+from app.infra.artifact_store import ArtifactStore
+from app.infra.dataset_cache import DatasetCache
+from app.services import report_orchestrator
+
+
+def test_dataset_roundtrip_across_instances(tmp_path):
+    frames = {
+        "2025": pd.DataFrame({"Ticket No.": ["TKT-1", "TKT-2"], "Date": pd.to_datetime(["2025-01-05", "2025-01-06"])}),
+        "Mixed": pd.DataFrame({"Remarks": ["text", 3, None], "Closed": [datetime(2025, 1, 7), "N/A", float("nan")]}),
+        "Headers": pd.DataFrame([[1, "a", 2.5]], columns=["Total", "Total", 2025]),
+    }
+    DatasetCache(ArtifactStore(str(tmp_path))).put("sheets-abc", frames)
+
+    # A second worker process reads what the first one wrote
+    loaded = DatasetCache(ArtifactStore(str(tmp_path))).get("sheets-abc")
+    assert list(loaded) == ["2025", "Mixed", "Headers"]
+    for name, df in frames.items():
+        pd.testing.assert_frame_equal(loaded[name], df)
+    assert type(loaded["Mixed"]["Closed"][0]) is datetime
+    assert sorted(n for n in os.listdir(tmp_path) if n.startswith("sheets-abc")) == [
+        "sheets-abc.0.parquet", "sheets-abc.1.parquet", "sheets-abc.2.parquet", "sheets-abc.json"
+    ]
+    assert DatasetCache(ArtifactStore(str(tmp_path))).get("sheets-missing") is None
+
+
+def test_weekly_report_parses_workbook_once(weekly_workbook, monkeypatch):
+    calls = []
+    original = report_orchestrator.load_excel_data
+    monkeypatch.setattr(report_orchestrator, "load_excel_data", lambda wb: calls.append(1) or original(wb))
+    year = date.today().year
+
+    first = report_orchestrator.get_weekly_report_data(io.BytesIO(weekly_workbook), date(year, 1, 1), date(year, 1, 31))
+    second = report_orchestrator.get_weekly_report_data(io.BytesIO(weekly_workbook), date(year, 1, 1), date(year, 1, 31))
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first["left_df"], second["left_df"])
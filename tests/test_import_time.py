@@ -0,0 +1,39 @@
+"""
+Import-time report for API startup (python -X importtime).
+
+Heavy libraries must not be loaded just to answer /health; they are imported
+on first use by the report endpoints. Run with `pytest -s` to see the report.
+"""
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "reportlab", "openpyxl"]
+
+
+def import_time_report(module: str):
+    """Returns [(cumulative_us, module_name)] for every module imported by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        entries.append((int(cumulative), name))
+    return entries
+
+
+def test_app_startup_does_not_import_heavy_libraries():
+    entries = import_time_report("app.main")
+    imported = {name.split(".")[0] for _, name in entries}
+
+    print("\nTop 10 imports by cumulative time (us):")
+    for cumulative, name in sorted(entries, reverse=True)[:10]:
+        print(f"{cumulative:>10}  {name.strip()}")
+
+    assert "app.main" in {name.strip() for _, name in entries}
+    assert not imported & set(HEAVY_MODULES)
@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.infra.job_queue import JobQueue, JobQueueFull, DONE, FAILED, CANCELLED
+
+client = TestClient(app)
+
+
+def wait_for(queue, job, timeout=10):
+    deadline = time.time() + timeout
+    while job.status not in (DONE, FAILED, CANCELLED) and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_runs_and_fails():
+    queue = JobQueue(max_workers=1)
+    ok = wait_for(queue, queue.submit("test", lambda: {"value": 1}))
+    bad = wait_for(queue, queue.submit("test", lambda: 1 / 0))
+
+    assert ok.status == DONE and ok.result == {"value": 1}
+    assert bad.status == FAILED and bad.status_code == 500 and "division" in bad.error
+    queue.shutdown()
+
+
+def test_cancel_queued_job_and_pending_limit():
+    release = threading.Event()
+    queue = JobQueue(max_workers=1, max_pending=2)
+    running = queue.submit("test", release.wait)
+    queued = queue.submit("test", lambda: "never")
+
+    try:
+        queue.submit("test", lambda: "rejected")
+        assert False, "expected JobQueueFull"
+    except JobQueueFull:
+        pass
+
+    assert queue.cancel(queued.id).status == CANCELLED
+    release.set()
+    wait_for(queue, running)
+    queue.shutdown()
+
+    assert running.status == DONE
+    assert queued.status == CANCELLED and queued.result is None
+
+
+def test_results_expire_after_ttl():
+    now = [1000.0]
+    queue = JobQueue(max_workers=1, result_ttl_seconds=60, clock=lambda: now[0])
+    job = wait_for(queue, queue.submit("test", lambda: b"pdf"))
+
+    now[0] += 30
+    assert queue.get(job.id) is job
+    now[0] += 31
+    assert queue.get(job.id) is None
+    queue.shutdown()
+
+
+def test_oldest_finished_jobs_are_evicted_over_the_caps():
+    now = [1000.0]
+    queue = JobQueue(max_workers=1, max_finished=2, max_result_bytes=10, clock=lambda: now[0])
+    jobs = []
+    for result in (b"aaaa", b"bbbb", b"cccc"):
+        now[0] += 1
+        jobs.append(wait_for(queue, queue.submit("test", lambda result=result: result)))
+
+    # Three 4-byte results: over both the count and the byte cap, so the oldest goes
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[1].id) is jobs[1] and queue.get(jobs[2].id) is jobs[2]
+
+    now[0] += 1
+    big = wait_for(queue, queue.submit("test", lambda: b"x" * 8))
+    assert queue.get(jobs[1].id) is None and queue.get(jobs[2].id) is None
+    assert queue.get(big.id).result == b"x" * 8
+    queue.shutdown()
+
+
+def test_weekly_pdf_job_endpoints(weekly_workbook):
+    year = datetime.now().year
+    files = {"file": ("daily.xlsx", weekly_workbook, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+    data = {"begin_date": f"{year}-01-01", "end_date": f"{year}-01-10"}
+
+    response = client.post("/jobs/pdf", data=data, files=files)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()["status"]
+        if status not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    assert status == "done"
+
+    result = client.get(f"/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.headers["content-type"] == "application/pdf"
+    assert result.content.startswith(b"%PDF")
+
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_multiple_workers_require_the_jobs_api_off():
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "JOBS_API": "1"}
+    result = subprocess.run([sys.executable, "run_api.py", "--workers", "2"], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 2
+    assert "JOBS_API=0" in result.stderr
@@ -0,0 +1,113 @@
+import io
+import json
+from datetime import date, datetime
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.json_service import encode_json_report, section_records
+from app.services.report_orchestrator import get_weekly_report_data
+
+client = TestClient(app)
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def legacy_section(df):
+    return jsonable_encoder(df.astype(object).where(pd.notnull(df), None).to_dict(orient="records"))
+
+
+def period():
+    year = datetime.now().year
+    return date(year, 1, 1), date(year, 1, 10)
+
+
+def test_records_match_previous_encoding(weekly_workbook):
+    begin, end = period()
+    data = get_weekly_report_data(io.BytesIO(weekly_workbook), begin, end)
+    data["left_df"] = data["left_df"].assign(
+        Stamp=pd.Series([pd.Timestamp("2026-01-05 08:30:00.123456")] + [pd.NaT] * (len(data["left_df"]) - 1),
+                        index=data["left_df"].index)
+    )
+
+    payload = json.loads(encode_json_report(data, begin, end))
+
+    for section, frame in (("left_section", "left_df"), ("right_section", "right_df"), ("new_users_section", "new_users_df")):
+        assert payload[section] == legacy_section(data[frame])
+    assert payload["left_section"][0]["Stamp"] == "2026-01-05T08:30:00.123456"
+    assert payload["period"] == {"begin": begin.isoformat(), "end": end.isoformat()}
+
+
+def test_generate_columns_shape(weekly_workbook):
+    begin, end = period()
+    form = {"begin_date": begin.isoformat(), "end_date": end.isoformat()}
+    files = {"file": ("daily.xlsx", weekly_workbook, XLSX)}
+
+    records = client.post("/generate", data=form, files=files).json()
+    columns = client.post("/generate", data={**form, "shape": "columns"}, files=files).json()
+    invalid = client.post("/generate", data={**form, "shape": "table"}, files=files)
+
+    assert columns["shape"] == "columns"
+    assert columns["right_section"]["columns"] == list(records["right_section"][0])
+    for section in ("left_section", "right_section", "new_users_section"):
+        assert section_records(columns[section]) == records[section]
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"]["error_code"] == "INVALID_SHAPE"
+
+
+def test_generate_pages_fields_and_gzip(weekly_workbook):
+    begin, end = period()
+    form = {"begin_date": begin.isoformat(), "end_date": end.isoformat()}
+    files = {"file": ("daily.xlsx", weekly_workbook, XLSX)}
+    full = client.post("/generate", data=form, files=files).json()
+
+    first = client.post("/generate", data={**form, "limit": "1", "fields": "Ticket No.,Status"}, files=files)
+    assert first.status_code == 200
+    payload = first.json()
+    rows = payload["right_section"]
+    assert rows == [{k: v for k, v in full["right_section"][0].items() if k in ("Ticket No.", "Status")}]
+    assert payload["pages"]["right_section"]["total"] == len(full["right_section"])
+
+    cursor = payload["pages"]["right_section"]["next_cursor"]
+    assert cursor
+    while cursor:
+        page = client.get("/generate/page", params={"cursor": cursor}, headers={"Accept-Encoding": "identity"})
+        assert page.status_code == 200
+        assert page.json()["section"] == "right_section"
+        rows += page.json()["data"]
+        cursor = page.json()["next_cursor"]
+    assert [r["Ticket No."] for r in rows] == [r["Ticket No."] for r in full["right_section"]]
+
+    compressed = client.post("/generate", data=form, files=files, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == full
+
+    unknown = client.post("/generate", data={**form, "fields": "Nope"}, files=files)
+    assert unknown.json()["detail"]["error_code"] == "INVALID_FIELDS"
+    assert client.get("/generate/page", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_generate_page_rejects_tampered_cursors(weekly_workbook):
+    from app.api.report import decode_cursor, encode_cursor
+    from app.infra.dataset_cache import get_dataset_cache
+
+    begin, end = period()
+    form = {"begin_date": begin.isoformat(), "end_date": end.isoformat(), "limit": "1"}
+    files = {"file": ("daily.xlsx", weekly_workbook, XLSX)}
+    cursor = decode_cursor(client.post("/generate", data=form, files=files).json()["pages"]["right_section"]["next_cursor"])
+    key = cursor["k"]
+
+    def page(section="right_section", offset=1, limit=1, fields=None):
+        tampered = encode_cursor(key, section, offset, limit, fields, "records")
+        return client.get("/generate/page", params={"cursor": tampered})
+
+    assert page().status_code == 200
+    assert page(fields=["Nope"]).json()["detail"]["error_code"] == "INVALID_FIELDS"
+    for response in (page(section="summary"), page(offset=True), page(limit=0)):
+        assert response.status_code == 400
+        assert response.json()["detail"]["error_code"] == "INVALID_CURSOR"
+
+    # A cached dataset without the cursor's section is a bad cursor, not a server error
+    get_dataset_cache().put(key, {"left_section": pd.DataFrame({"Ticket No.": ["TKT-001"]})})
+    assert page().json()["detail"]["error_code"] == "INVALID_CURSOR"
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.infra.metrics import Histogram
+from app.main import app
+
+client = TestClient(app)
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def test_histogram_exposition():
+    histogram = Histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    lines = histogram.expose()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint_reports_routes_stages_and_process(weekly_workbook):
+    year = datetime.now().year
+    client.post(
+        "/generate",
+        data={"begin_date": f"{year}-01-01", "end_date": f"{year}-01-10"},
+        files={"file": ("daily.xlsx", weekly_workbook, XLSX)}
+    )
+    client.get(f"/monthly/context/{year}/1")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/generate",status="200"}' in text
+    assert 'route="/monthly/context/{year}/{month}"' in text
+    assert 'report_stage_duration_seconds_bucket{stage="parse",le="+Inf"}' in text
+    assert 'cache_requests_total{cache="dataset",result="miss"}' in text
+    assert 'report_jobs{status="running"}' in text
+    assert "process_resident_memory_bytes " in text
@@ -0,0 +1,151 @@
+import os
+from app.infra.chart_renderer import ChartRenderer
+
+PIVOT_DATA = {
+    "Incident | Reset password": {"TRANS_NON": 0, "TRANS_WORK": 1, "OPEN": 2, "CLOSE": 3},
+    "Service | Reset password": {"TRANS_NON": 0, "TRANS_WORK": 0, "OPEN": 0, "CLOSE": 4},
+    "Service | Create account": {"TRANS_NON": 1, "TRANS_WORK": 0, "OPEN": 0, "CLOSE": 1},
+}
+ANNUAL_SUMMARY = {
+    "year": 2025,
+    "months": [1, 2, 3],
+    "categories": ["Create account", "Reset password"],
+    "data": {"Create account": [1, 0, 2], "Reset password": [5, 3, 10]},
+}
+
+
+def test_build_chart_data():
+    chart_data = ChartRenderer.build_chart_data(PIVOT_DATA, ANNUAL_SUMMARY, 2025, 3)
+
+    assert chart_data["palette"] == ChartRenderer.CATEGORY_COLORS
+    assert chart_data["annual"]["labels"][0] == "Jan"
+    assert len(chart_data["annual"]["labels"]) == 12
+
+    reset = next(s for s in chart_data["annual"]["series"] if s["category"] == "Reset password")
+    assert reset["counts"] == [5, 3, 10] + [0] * 9
+    assert reset["color"] == ChartRenderer.CATEGORY_COLORS["Reset password"]
+
+    slices = {s["label"]: s["value"] for s in chart_data["pie"]["slices"]}
+    assert slices == {"Reset password": 10, "Create account": 2}
+
+
+def test_build_pie_slices_empty():
+    assert ChartRenderer.build_pie_slices({}) == []
+
+
+def test_render_year_reuses_template(tmp_path):
+    renderer = ChartRenderer(output_dir=str(tmp_path))
+    monthly_pivots = {1: PIVOT_DATA, 2: {"Service | Create account": {"CLOSE": 2}}, 3: {}}
+
+    result = renderer.render_year(monthly_pivots, ANNUAL_SUMMARY, 2025)
+
+    assert sorted(result["pies"]) == [1, 2, 3]
+    for path in list(result["pies"].values()) + [result["annual"]]:
+        assert os.path.getsize(path) > 0
+    assert os.path.basename(result["pies"][2]) == "monthly_pie_2025_02.png"
+
+
+def test_render_year_caps_processes_at_cpu_count(tmp_path, monkeypatch):
+    from app.infra import chart_renderer
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a single core must not start a process pool")
+
+    monkeypatch.setattr(chart_renderer.os, "cpu_count", lambda: 1)
+    monkeypatch.setattr(chart_renderer, "ProcessPoolExecutor", no_pool)
+    monthly_pivots = {1: PIVOT_DATA, 2: {"Service | Create account": {"CLOSE": 2}}}
+
+    result = ChartRenderer(output_dir=str(tmp_path)).render_year(monthly_pivots, ANNUAL_SUMMARY, 2025, processes=64)
+
+    assert sorted(result["pies"]) == [1, 2]
+
+
+def test_unchanged_chart_is_not_redrawn(tmp_path):
+    from app.infra.artifact_store import ArtifactStore
+
+    store = ArtifactStore(str(tmp_path), ttl_seconds=None)
+    path = ChartRenderer(output_dir=str(tmp_path / "charts"), artifact_store=store).render_monthly_pie(PIVOT_DATA, 2025, 3)
+    mtime = os.stat(path).st_mtime_ns
+
+    # Another worker with its own store instance reuses the same rendering
+    other = ChartRenderer(output_dir=str(tmp_path / "charts"), artifact_store=ArtifactStore(str(tmp_path), ttl_seconds=None))
+    assert other.render_monthly_pie(PIVOT_DATA, 2025, 3) == path
+    assert os.stat(path).st_mtime_ns == mtime
+
+    other.render_monthly_pie({"Service | Create account": {"CLOSE": 2}}, 2025, 3)
+    assert os.stat(path).st_mtime_ns != mtime
+
+
+def test_render_year_pool_uses_spawn(tmp_path, monkeypatch):
+    from app.infra import chart_renderer
+
+    contexts = []
+    original = chart_renderer.ProcessPoolExecutor
+
+    def recording_pool(*args, **kwargs):
+        contexts.append(kwargs.get("mp_context"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(chart_renderer.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(chart_renderer, "ProcessPoolExecutor", recording_pool)
+    monthly_pivots = {1: PIVOT_DATA, 2: {"Service | Create account": {"CLOSE": 2}}}
+
+    result = ChartRenderer(output_dir=str(tmp_path)).render_year(monthly_pivots, ANNUAL_SUMMARY, 2025, processes=2)
+
+    assert sorted(result["pies"]) == [1, 2]
+    assert [c.get_start_method() for c in contexts] == ["spawn"]
+
+
+def test_year_batch_and_single_pies_reuse_each_other(tmp_path):
+    from app.infra.artifact_store import ArtifactStore
+
+    renderer = ChartRenderer(output_dir=str(tmp_path / "charts"), artifact_store=ArtifactStore(str(tmp_path), ttl_seconds=None))
+    monthly_pivots = {1: PIVOT_DATA, 2: {"Service | Create account": {"CLOSE": 2}}}
+    pies = renderer.render_year(monthly_pivots, ANNUAL_SUMMARY, 2025)["pies"]
+    mtimes = {month: os.stat(path).st_mtime_ns for month, path in pies.items()}
+
+    assert renderer.render_monthly_pie(PIVOT_DATA, 2025, 1) == pies[1]
+    assert renderer.render_year(monthly_pivots, ANNUAL_SUMMARY, 2025)["pies"] == pies
+    assert {month: os.stat(path).st_mtime_ns for month, path in pies.items()} == mtimes
+
+
+def test_charts_render_concurrently(tmp_path):
+    import threading
+    import matplotlib.pyplot as plt
+
+    errors = []
+
+    def render(name):
+        renderer = ChartRenderer(output_dir=str(tmp_path / name))
+        try:
+            renderer.render_monthly_pie(PIVOT_DATA, 2025, 3)
+            renderer.render_annual_summary(ANNUAL_SUMMARY, 2025)
+        except Exception as e:
+            errors.append(e)
+
+    render("sequential")
+    threads = [threading.Thread(target=render, args=(name,)) for name in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    # Figures are never registered with pyplot (its "current figure" is shared by all threads)
+    assert plt.get_fignums() == []
+    for filename in ("monthly_pie_2025_03.png", "annual_summary_2025.png"):
+        expected = (tmp_path / "sequential" / filename).read_bytes()
+        assert (tmp_path / "a" / filename).read_bytes() == expected
+        assert (tmp_path / "b" / filename).read_bytes() == expected
+
+
+def test_single_and_year_pies_order_slices_the_same(tmp_path):
+    # Data order (Reset password first) differs from the palette order; month 2 adds a category
+    assert [s["label"] for s in ChartRenderer.build_pie_slices(PIVOT_DATA)] == ["Create account", "Reset password"]
+    monthly_pivots = {1: PIVOT_DATA, 2: {"Service | Deactivate account": {"CLOSE": 1}, "Service | Development": {"CLOSE": 2}}}
+
+    pies = ChartRenderer(output_dir=str(tmp_path / "year")).render_year(monthly_pivots, ANNUAL_SUMMARY, 2025)["pies"]
+    single = ChartRenderer(output_dir=str(tmp_path / "single"))
+    for month, pivot_data in monthly_pivots.items():
+        with open(single.render_monthly_pie(pivot_data, 2025, month), "rb") as f, open(pies[month], "rb") as g:
+            assert f.read() == g.read()
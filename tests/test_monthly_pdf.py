@@ -0,0 +1,79 @@
+import os
+
+from app.infra.chart_renderer import ChartRenderer
+from app.infra.monthly_pdf_renderer import get_monthly_styles, render_monthly_report
+from app.services.monthly_pdf_service import (
+    build_dev_efforts_table, build_monthly_sections, build_sla_table, generate_monthly_pdf_service
+)
+
+PIVOT_DATA = {
+    "Incident | Reset password": {"TRANS_NON": 0, "TRANS_WORK": 1, "OPEN": 2, "CLOSE": 3},
+    "Service | Create account": {"TRANS_NON": 1, "TRANS_WORK": 0, "OPEN": 0, "CLOSE": 1},
+}
+ANNUAL_SUMMARY = {
+    "year": 2025,
+    "months": [1, 2, 3],
+    "categories": ["Create account", "Reset password"],
+    "data": {"Create account": [1, 0, 2] + [0] * 9, "Reset password": [5, 3, 10] + [0] * 9},
+}
+MONTHLY_STATS = {"summary": {"total_tickets": 7, "closed_tickets": 4}, "pivot_data": PIVOT_DATA}
+
+
+def test_styles_are_built_once():
+    assert get_monthly_styles() is get_monthly_styles()
+
+
+def test_dev_efforts_table_totals():
+    table = build_dev_efforts_table({1: {"me_hours": 10, "carry_forward": -2}, 2: {"me_hours": 6.5}}, 2025)
+
+    assert table[0][0] == "2025" and table[0][-1] == "Total"
+    assert table[1][:3] == ["ME Hours", "10", "6.5"] and table[1][-1] == "16.5"
+    assert table[2][-1] == "192"
+    assert table[3][1] == "-2" and table[3][-1] == "-2.0"
+    assert build_dev_efforts_table({}, 2025) is None
+
+
+def test_sla_table_rows():
+    table = build_sla_table([{"ticket_no": "INC1", "elapsed_time": "3d", "percentage": 120}], 2025, 3)
+
+    assert table[1][0] == "INC1"
+    assert table[1][3] == "2025/3/27"
+    assert table[1][4] == "3d(120%)"
+    assert build_sla_table([], 2025, 3) is None
+
+
+def test_render_monthly_pdf(tmp_path):
+    renderer = ChartRenderer(output_dir=str(tmp_path / "charts"))
+    path = tmp_path / "Monthly_Report_2025_03.pdf"
+
+    pdf = generate_monthly_pdf_service(
+        MONTHLY_STATS, ANNUAL_SUMMARY, [], {1: {"me_hours": 8}}, 2025, 3,
+        chart_renderer=renderer, path=str(path)
+    )
+
+    assert pdf.startswith(b"%PDF")
+    assert path.read_bytes() == pdf
+    assert b"/Count 3" in pdf
+
+
+def test_compact_profile_downsamples_charts(tmp_path):
+    renderer = ChartRenderer(output_dir=str(tmp_path / "charts"))
+    sections = build_monthly_sections(MONTHLY_STATS, ANNUAL_SUMMARY, [], {}, 2025, 3, renderer)
+
+    standard = render_monthly_report(**sections)
+    compact = render_monthly_report(**sections, profile="compact")
+
+    assert compact.startswith(b"%PDF") and b"/Count 3" in compact
+    assert b"/DCTDecode" in compact and b"/DCTDecode" not in standard
+    assert len(compact) < len(standard) / 2
+
+
+def test_monthly_pdf_charts_do_not_go_through_shared_files(tmp_path):
+    renderer = ChartRenderer(output_dir=str(tmp_path / "charts"))
+    sections = build_monthly_sections(MONTHLY_STATS, ANNUAL_SUMMARY, [], {}, 2025, 3, renderer)
+
+    assert isinstance(sections["annual_chart"], bytes) and sections["annual_chart"].startswith(b"\x89PNG")
+    assert isinstance(sections["pie_chart"], bytes)
+    assert os.listdir(tmp_path / "charts") == []
+    # The same sections render twice (one buffer per render)
+    assert render_monthly_report(**sections) == render_monthly_report(**sections)
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.infra.stage_executor import StageExecutor
+from app.infra.timing import collect, span
+
+
+def not_found(year):
+    raise HTTPException(status_code=404, detail=f"No data found for {year}")
+
+
+def timed_sum(values):
+    with span("aggregate", rows=len(values)):
+        return sum(values)
+
+
+def test_stage_limit_caps_concurrency():
+    executor = StageExecutor(limits={"pdf": 1})
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def render():
+        with executor.stage("pdf"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=render) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 1
+
+
+def test_blocking_work_does_not_stall_event_loop():
+    executor = StageExecutor(max_workers=2)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await executor.run(time.sleep, 0.2)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    executor.shutdown()
+    assert result is None
+    assert ticks >= 5
+
+
+def test_process_pool_keeps_http_errors():
+    executor = StageExecutor(kind="process", max_workers=1)
+    try:
+        assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+
+        async def timed():
+            with collect() as timings:
+                result = await executor.run(timed_sum, [1, 2, 3])
+            return result, timings.spans
+
+        result, spans = asyncio.run(timed())
+        assert result == 6
+        assert [(name, fields) for name, _, fields in spans] == [("aggregate", {"rows": 3})]
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(executor.run(not_found, 2030))
+        assert error.value.status_code == 404
+    finally:
+        executor.shutdown()
@@ -0,0 +1,72 @@
+import os
+import re
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.static_assets import CachedPage, IMMUTABLE_CACHE_CONTROL
+
+client = TestClient(app)
+
+
+def test_index_revalidates_and_versions_static_urls():
+    response = client.get("/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/", headers={"If-Modified-Since": response.headers["last-modified"]}).status_code == 304
+
+    logo = re.search(r'src="(/static/logo\.jpg\?v=[0-9a-f]+)"', response.text).group(1)
+    assert client.get(logo).headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert client.get("/static/logo.jpg").headers["cache-control"] == "no-cache"
+    assert client.get("/static/logo.jpg?v=stale").headers["cache-control"] == "no-cache"
+
+
+def test_cached_page_reloads_when_page_or_asset_changes(tmp_path):
+    (tmp_path / "app.js").write_text("one")
+    page_path = tmp_path / "index.html"
+    page_path.write_text('<script src="/static/app.js"></script>')
+    page = CachedPage(str(page_path), static_dir=str(tmp_path))
+
+    first = page.get().body
+    assert page.get().body is first
+
+    (tmp_path / "app.js").write_text("two!")
+    second = page.get().body
+    assert second != first and b"/static/app.js?v=" in second
+
+    page_path.write_text("<p>new</p>")
+    stat = os.stat(page_path)
+    os.utime(page_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert page.get().body == b"<p>new</p>"
+
+
+def test_static_access_is_recorded_off_the_event_loop(monkeypatch):
+    import asyncio
+    from app import main
+
+    touched = []
+
+    class RecordingStore:
+        def touch(self, path):
+            try:
+                asyncio.get_running_loop()
+                on_loop = True
+            except RuntimeError:
+                on_loop = False
+            touched.append((os.path.basename(path), on_loop))
+            return True
+
+    monkeypatch.setattr(main, "get_artifact_store", lambda: RecordingStore())
+
+    assert client.get("/static/logo.jpg").status_code == 200
+    assert touched == [("logo.jpg", False)]
+
+
+def test_dotfiles_are_not_served():
+    from app.infra.artifact_store import STATIC_DIR, get_artifact_store
+
+    assert not get_artifact_store().index_path.startswith(os.path.join(str(STATIC_DIR), ""))
+    assert client.get("/static/.artifact_index.json").status_code == 404
+    assert client.get("/static/charts/.hidden.png").status_code == 404
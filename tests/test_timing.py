@@ -0,0 +1,51 @@
+import json
+import logging
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.infra.timing import collect, logger, server_timing, span
+from app.main import app
+
+client = TestClient(app)
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+def test_spans_are_collected_and_logged():
+    handler = ListHandler()
+    logger.addHandler(handler)
+    try:
+        with collect() as timings:
+            with span("parse", rows=3) as fields:
+                fields["bytes"] = 10
+    finally:
+        logger.removeHandler(handler)
+
+    (name, duration_ms, fields), = timings.spans
+    assert name == "parse" and fields == {"rows": 3, "bytes": 10}
+    assert handler.records[0]["event"] == "span"
+    assert handler.records[0]["rows"] == 3
+    assert server_timing(timings.spans, 5.0) == f"parse;dur={duration_ms}, total;dur=5.0"
+
+
+def test_generate_returns_server_timing(weekly_workbook):
+    year = datetime.now().year
+    response = client.post(
+        "/generate",
+        data={"begin_date": f"{year}-01-01", "end_date": f"{year}-01-10"},
+        files={"file": ("daily.xlsx", weekly_workbook, XLSX)}
+    )
+
+    assert response.status_code == 200
+    names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    for name in ("parse", "aggregate", "json.encode", "total"):
+        assert name in names
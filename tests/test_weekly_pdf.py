@@ -0,0 +1,145 @@
+import base64
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def pdf_text(pdf: bytes) -> bytes:
+    """Decodes the ASCII85+Flate page streams ReportLab writes."""
+    chunks = []
+    for stream in re.findall(rb"stream\r?\n(.*?)endstream", pdf, re.S):
+        try:
+            chunks.append(zlib.decompress(base64.a85decode(stream.strip(), adobe=True)))
+        except Exception:
+            continue
+    return b"\n".join(chunks)
+
+
+def post_pdf(workbook: bytes, end_date: str):
+    year = datetime.now().year
+    files = {"file": ("daily.xlsx", workbook, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+    data = {"begin_date": f"{year}-01-01", "end_date": end_date}
+    return client.post("/pdf", data=data, files=files)
+
+
+def test_pdf_is_built_in_memory(weekly_workbook):
+    year = datetime.now().year
+    shared_pdf = os.path.join(PROJECT_ROOT, "report.pdf")
+    mtime_before = os.path.getmtime(shared_pdf) if os.path.exists(shared_pdf) else None
+
+    response = post_pdf(weekly_workbook, f"{year}-01-10")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    assert f"alphast_SNOW_report_{year}_01_10.pdf" in response.headers["content-disposition"]
+    mtime_after = os.path.getmtime(shared_pdf) if os.path.exists(shared_pdf) else None
+    assert mtime_before == mtime_after
+
+
+def test_concurrent_pdf_requests_get_their_own_report(weekly_workbook):
+    year = datetime.now().year
+    end_dates = [f"{year}-01-{day:02d}" for day in range(10, 16)]
+    with ThreadPoolExecutor(max_workers=len(end_dates)) as executor:
+        responses = list(executor.map(lambda d: post_pdf(weekly_workbook, d), end_dates))
+
+    for end_date, response in zip(end_dates, responses):
+        assert response.status_code == 200
+        assert end_date.replace("-", "_") in response.headers["content-disposition"]
+        # The period line is rendered into each request's own PDF
+        period_end = datetime.fromisoformat(end_date).strftime("%b %d, %Y").encode()
+        assert period_end in pdf_text(response.content)
+
+
+def test_prepare_table_data_uses_paragraph_only_for_wrapped_cells():
+    import pandas as pd
+    from reportlab.platypus import Paragraph
+    from app.services.pdf_service import prepare_table_data
+
+    df = pd.DataFrame({
+        "Ticket No.": ["TKT-1", "TKT-2", "TKT-3"],
+        "Request Detail": ["short", "a much longer description that cannot fit in a narrow column", None],
+        "Time - Arrive": pd.to_datetime(["2026-01-05", None, "2026-01-07"]),
+    })
+    mapping = [("Ticket #", "Ticket No."), ("Description", "Request Detail"), ("Received", "Time - Arrive")]
+
+    data, styles = prepare_table_data(df, mapping, [72, 72, 72], bold_keys={"TKT-2", "TKT-3"})
+
+    assert data[0] == ["Ticket #", "Description", "Received"]
+    assert data[1] == ["TKT-1", "short", "01/05/2026"]
+    assert isinstance(data[2][1], Paragraph)
+    assert data[2][2] == "" and data[3][1] == ""
+    # Highlighted rows 2-3 are styled with one run of row-level commands
+    assert [cmd[:3] for cmd in styles] == [("FONTNAME", (0, 2), (-1, 3)), ("TEXTCOLOR", (0, 2), (-1, 3))]
+
+
+def test_long_sections_render_as_page_sized_chunks():
+    from app.infra.pdf_renderer import render_workload_report
+
+    rows = [[f"TKT-{i:04d}", "OPEN" if i % 3 == 0 else "CLOSE"] for i in range(300)]
+    section = {
+        "title": "Weekly Workload Details",
+        "data": [["Ticket #", "Status"]] + rows,
+        "styles": [("TEXTCOLOR", (0, 1), (-1, 1), "#1e90ff")],
+        "widths": [200, 200],
+    }
+    pdf = render_workload_report(logo_path="", title="T", subtitle="S", summary_items=[],
+                                 sections=[section], chunk_rows=20)
+
+    text = pdf_text(pdf)
+    pages = pdf.count(b"/Type /Page\n")
+    assert pages > 1
+    for i in range(300):
+        assert text.count(f"TKT-{i:04d}".encode()) == 1
+    # Every page repeats the header
+    assert text.count(b"Ticket #") == pages
+
+
+def test_pdf_etag_and_not_modified(weekly_workbook, isolated_pdf_cache):
+    year = datetime.now().year
+    first = post_pdf(weekly_workbook, f"{year}-01-10")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('"')
+
+    # Served from the artifact cache with the same strong ETag and bytes
+    second = post_pdf(weekly_workbook, f"{year}-01-10")
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+    files = {"file": ("daily.xlsx", weekly_workbook, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+    data = {"begin_date": f"{year}-01-01", "end_date": f"{year}-01-10"}
+    not_modified = client.post("/pdf", data=data, files=files, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # A different period is a different artifact
+    other = post_pdf(weekly_workbook, f"{year}-01-11")
+    assert other.headers["etag"] != etag
+
+
+def test_bold_rows_are_measured_in_bold():
+    import pandas as pd
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.platypus import Paragraph
+    from app.services.pdf_service import CELL_PADDING, CELL_STYLE, prepare_table_data
+
+    text = "Printer on the third floor is offline again after the weekend power outage, please check it"
+    regular = stringWidth(text, "Helvetica", CELL_STYLE.fontSize)
+    bold = stringWidth(text, "Helvetica-Bold", CELL_STYLE.fontSize)
+    width = (regular + bold) / 2 + CELL_PADDING
+    df = pd.DataFrame({"Ticket No.": ["TKT-1", "TKT-2"], "Request Detail": [text, text]})
+    mapping = [("Ticket #", "Ticket No."), ("Description", "Request Detail")]
+
+    data, _ = prepare_table_data(df, mapping, [72, width], bold_keys={"TKT-2"})
+
+    # Fits on one line in the regular weight, not in the bold one it is drawn in
+    assert data[1][1] == text
+    assert isinstance(data[2][1], Paragraph)